@@ -7,12 +7,14 @@ import traceback
 from revvy.firmware_updater import update_firmware_if_needed
 
 from revvy.hardware_dependent.rrrc_transport_i2c import RevvyTransportI2C
+from revvy.mcu.transport_recording import RecordingTransport, TransportRecorder
 from revvy.robot_manager import RobotManager, RevvyStatusCode
 from revvy.bluetooth.ble_revvy import RevvyBLE
 
 from revvy.utils.logger import get_logger
 from revvy.utils.directories import CURRENT_INSTALLATION_PATH
 from revvy.utils.check_manifest import check_manifest
+from revvy.utils.version import VERSION
 
 # Load the error reporter and init the singleton that'll catch system errors.
 from revvy.utils.error_reporter import revvy_error_handler
@@ -46,6 +48,13 @@ if __name__ == "__main__":
         # exiting with integrity error forces the loader to try a previous package
         sys.exit(RevvyStatusCode.INTEGRITY_ERROR)
 
+    # Record the MCU communication, to be replayed by tools/replay.py
+    transport_recorder = None
+    if "--record-transport" in sys.argv:
+        recording_path = sys.argv[sys.argv.index("--record-transport") + 1]
+        transport_recorder = TransportRecorder(recording_path, VERSION.hw)
+        interface = RecordingTransport(interface, transport_recorder)
+
     # Handles robot state
     robot_manager = RobotManager(interface)
 
@@ -83,6 +92,8 @@ if __name__ == "__main__":
     finally:
         log("stopping")
         robot_manager.robot_stop()
+        if transport_recorder:
+            transport_recorder.close()
 
     log("terminated")
     sys.exit(ret_val)
@@ -0,0 +1,159 @@
+"""
+Binary WebSocket sub-protocol for the frequent messages.
+
+Clients that request the BINARY_SUBPROTOCOL sub-protocol may send and receive binary frames in
+addition to the JSON text messages. JSON stays in use for the rare messages (configuration,
+camera, errors, ...), the binary frames carry the messages that are sent many times per second.
+
+Every binary frame starts with a BinaryMessageType byte, followed by the payload:
+    CONTROL             client -> robot: a control message, in the same format as over BLE
+    CONTROL_CONFIRM     robot -> client: 1 byte, the packet id of the processed control message
+    TELEMETRY_INTERVAL  client -> robot: uint16 LE, time between telemetry frames in ms, 0 disables
+    TELEMETRY           robot -> client: a telemetry frame, see revvy.bluetooth.telemetry
+
+While telemetry frames are enabled, the values they contain are not sent as JSON events. Values
+that don't fit into a frame are still sent as JSON events.
+"""
+
+from enum import IntEnum
+import struct
+from typing import Any, Optional, Union
+
+from revvy.bluetooth.data_types import ProgramStatusCollection
+from revvy.bluetooth.telemetry import HEADER, TelemetryField, TelemetryFrameEncoder
+from revvy.robot.robot_events import ProgramStatusChange, RobotEvent
+from revvy.utils.stopwatch import Stopwatch
+
+BINARY_SUBPROTOCOL = "revvy.binary.v1"
+
+TELEMETRY_EVENTS = (
+    RobotEvent.ORIENTATION_CHANGE,
+    RobotEvent.SCRIPT_VARIABLE_CHANGE,
+    RobotEvent.PROGRAM_STATUS_CHANGE,
+    RobotEvent.SENSOR_VALUE_CHANGE,
+)
+
+_TELEMETRY_INTERVAL = struct.Struct("<H")
+
+# WebSocket messages are not limited to the size of a BLE notification, every field fits in a frame
+_MAX_FRAME_SIZE = HEADER.size + len(TelemetryField) * (1 + 255)
+
+
+class BinaryMessageType(IntEnum):
+    CONTROL = 0x01
+    CONTROL_CONFIRM = 0x02
+    TELEMETRY_INTERVAL = 0x03
+    TELEMETRY = 0x04
+
+
+class BinaryMessageError(Exception):
+    pass
+
+
+def encode_message(message_type: BinaryMessageType, payload: bytes) -> bytes:
+    """
+    >>> encode_message(BinaryMessageType.CONTROL_CONFIRM, bytes([5]))
+    b'\\x02\\x05'
+    """
+    return bytes([message_type]) + payload
+
+
+def decode_message(data: Union[bytes, bytearray]) -> tuple[BinaryMessageType, memoryview]:
+    """
+    Splits a binary frame to its type and payload. The payload is not copied.
+
+    >>> message_type, payload = decode_message(b'\\x01\\x00\\x7f')
+    >>> message_type.name, bytes(payload)
+    ('CONTROL', b'\\x00\\x7f')
+    """
+    if not data:
+        raise BinaryMessageError("Empty message")
+
+    try:
+        message_type = BinaryMessageType(data[0])
+    except ValueError as e:
+        raise BinaryMessageError(f"Unknown message type: {data[0]}") from e
+
+    return message_type, memoryview(data)[1:]
+
+
+def decode_telemetry_interval(payload: Union[bytes, memoryview]) -> float:
+    """
+    Returns the requested time between telemetry frames, in seconds.
+
+    >>> decode_telemetry_interval(b'\\xe8\\x03')
+    1.0
+    """
+    if len(payload) != _TELEMETRY_INTERVAL.size:
+        raise BinaryMessageError(f"Invalid telemetry interval length: {len(payload)}")
+
+    (interval_ms,) = _TELEMETRY_INTERVAL.unpack(payload)
+    return interval_ms / 1000
+
+
+class ProgramStatusTracker:
+    """Keeps the state of every button script, the telemetry frames contain all of them."""
+
+    def __init__(self) -> None:
+        self._states = ProgramStatusCollection()
+
+    def update(self, change: ProgramStatusChange) -> bytes:
+        self._states.update_button_value(change.id, change.status.value)
+        return bytes(self._states.__bytes__())
+
+
+def telemetry_value(
+    event: RobotEvent, data: Any, program_status: ProgramStatusTracker
+) -> Optional[tuple[TelemetryField, bytes]]:
+    """
+    Encodes the data of a robot event the same way as the corresponding BLE characteristic.
+    Returns None if the event is not part of the telemetry frames.
+    """
+    if event == RobotEvent.ORIENTATION_CHANGE:
+        return TelemetryField.ORIENTATION, data.__bytes__()
+
+    if event == RobotEvent.SCRIPT_VARIABLE_CHANGE:
+        return TelemetryField.SCRIPT_VARIABLES, data.__bytes__()
+
+    if event == RobotEvent.PROGRAM_STATUS_CHANGE:
+        return TelemetryField.PROGRAM_STATUS, program_status.update(data)
+
+    if event == RobotEvent.SENSOR_VALUE_CHANGE:
+        value = data.__bytes__()
+        return TelemetryField(TelemetryField.SENSOR_1 + data.port_id), bytes([len(value)]) + value
+
+    return None
+
+
+class ClientTelemetry:
+    """Builds the telemetry frames of a single client, at the rate the client requested."""
+
+    def __init__(self) -> None:
+        self._encoder = TelemetryFrameEncoder(max_frame_size=_MAX_FRAME_SIZE)
+        self._interval = 0.0
+        self._stopwatch = Stopwatch()
+
+    @property
+    def enabled(self) -> bool:
+        return self._interval > 0
+
+    def set_interval(self, interval: float) -> None:
+        """Sets the time between telemetry frames in seconds. 0 disables the frames."""
+        self._interval = interval
+        self._encoder.request_keyframe()
+
+    def update(self, field: TelemetryField, value: bytes) -> bool:
+        """Returns False if the value can't be sent in a frame, it needs to be sent as JSON."""
+        return self._encoder.update(field, value)
+
+    def next_frame(self) -> Optional[bytes]:
+        """Returns the next encoded message if it is time to send one and something changed."""
+        if not self.enabled or self._stopwatch.elapsed < self._interval:
+            return None
+
+        self._stopwatch.reset()
+        frame = self._encoder.encode()
+        if frame is None:
+            return None
+
+        return encode_message(BinaryMessageType.TELEMETRY, frame)
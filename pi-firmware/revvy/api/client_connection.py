@@ -0,0 +1,71 @@
+"""
+Outgoing message queue of a single WebSocket client.
+
+Messages are put into a bounded queue and sent by one writer task per client, so a slow client
+neither blocks the robot nor piles up unsent messages. Messages with a key (periodic state
+updates, like the orientation) replace the queued message with the same key. When the queue is
+full, state updates are dropped before the other messages.
+"""
+
+import asyncio
+from typing import Hashable, Optional, Union
+
+from websockets.exceptions import ConnectionClosed
+
+from revvy.api.binary_protocol import ClientTelemetry
+from revvy.api.subscriptions import Subscriptions
+from revvy.utils.message_queue import (
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    MessageQueue,
+    MessageQueueStats,
+)
+
+Message = Union[str, bytes]
+
+
+class ClientConnection:
+    def __init__(self, websocket, max_queued: int = 32):
+        self.websocket = websocket
+        self.telemetry: Optional[ClientTelemetry] = None
+        self.subscriptions: Optional[Subscriptions] = None
+        self._queue: MessageQueue[Message] = MessageQueue(max_queued)
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    @property
+    def stats(self) -> MessageQueueStats:
+        return self._queue.stats
+
+    def enqueue(self, message: Message, key: Optional[Hashable] = None) -> None:
+        """
+        Queues a message for sending. Messages with a key may be replaced or dropped.
+        Must be called from the event loop of the connection.
+        """
+        if self._closed:
+            return
+
+        priority = PRIORITY_HIGH if key is None else PRIORITY_NORMAL
+        self._queue.put(message, key=key, priority=priority)
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Stops the writer task, the queued messages are discarded."""
+        self._closed = True
+        self._wakeup.set()
+
+    async def run_writer(self) -> None:
+        """Sends the queued messages until the connection is closed."""
+        while not self._closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while not self._closed:
+                message = self._queue.get()
+                if message is None:
+                    break
+                try:
+                    await self.websocket.send(message.value)
+                except ConnectionClosed:
+                    # the receiving side notices the disconnection and cleans up the client
+                    self.close()
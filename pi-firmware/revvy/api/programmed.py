@@ -1,4 +1,3 @@
-import copy
 from threading import Event, Lock, Thread, Timer
 import time
 from typing import Optional
@@ -13,9 +12,10 @@ class ProgrammedRobotController:
         self.log = get_logger("ProgrammedRobotController")
         self.robot_manager = robot_manager
         self.robot_manager.needs_interrupting = False
+        self._analog = bytearray(6)
         self.message = RemoteControllerCommand(
-            analog=bytearray([0] * 6),
-            buttons=[False] * 32,
+            analog=bytes(self._analog),
+            buttons=0,
             background_command=BleAutonomousCmd.NONE,
             next_deadline=1,
         )
@@ -35,7 +35,8 @@ class ProgrammedRobotController:
     def _control_thread(self) -> None:
         while not self.exit:
             with self.lock:
-                message = copy.deepcopy(self.message)
+                # the message is replaced, never modified, so it can be passed on without a copy
+                message = self.message
                 self.message_updated.set()
             self.robot_manager.handle_periodic_control_message(message)
             time.sleep(0.1)
@@ -84,7 +85,9 @@ class ProgrammedRobotController:
 
     def set_button_value(self, button: int, value: bool):
         with self.lock:
-            self.message.buttons[button] = value
+            mask = 1 << button
+            buttons = self.message.buttons | mask if value else self.message.buttons & ~mask
+            self.message = self.message._replace(buttons=buttons)
             self._on_input_changed()
         self._wait_for_input_processed()
 
@@ -92,7 +95,8 @@ class ProgrammedRobotController:
         assert value >= 0 and value <= 255
 
         with self.lock:
-            self.message.analog[channel] = value
+            self._analog[channel] = value
+            self.message = self.message._replace(analog=bytes(self._analog))
             self._on_input_changed()
         self._wait_for_input_processed()
 
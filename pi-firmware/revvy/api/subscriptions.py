@@ -0,0 +1,101 @@
+"""
+Per-client event subscriptions of the WebSocket API.
+
+By default, a client receives the default set of events, at the rate they are produced. A client
+may instead subscribe to a set of streams, each with a maximum rate:
+
+    {"type": "subscribe", "body": {"orientation_change": 50, "battery_change": 0.2, "imu": 100}}
+
+The stream names are the RobotEvent values, and the raw streams that are not sent by default
+(RAW_STREAMS). A rate of null means no limit. A body of null restores the default events.
+
+Streams are downsampled separately for each client. A message that arrives too early is held
+back, and replaced by newer ones, until the client is due a message from the stream again. This
+way the last value is always delivered, even if the stream stops changing.
+"""
+
+from typing import Any, Hashable, Iterator, Optional
+
+IMU_STREAM = "imu"
+MOTOR_STATUS_STREAM = "motor_status"
+
+RAW_STREAMS = (IMU_STREAM, MOTOR_STATUS_STREAM)
+
+
+class SubscriptionError(Exception):
+    pass
+
+
+def parse_subscriptions(body: Any, streams: frozenset) -> dict[str, Optional[float]]:
+    """
+    Validates a subscription message body. Returns the stream names and their maximum rates.
+
+    >>> streams = frozenset(["imu", "battery_change"])
+    >>> parse_subscriptions({"imu": 100, "battery_change": None}, streams)
+    {'imu': 100.0, 'battery_change': None}
+    """
+    if not isinstance(body, dict):
+        raise SubscriptionError("Subscriptions must be an object of stream names and rates")
+
+    rates: dict[str, Optional[float]] = {}
+    for name, rate in body.items():
+        if name not in streams:
+            raise SubscriptionError(f"Unknown stream: {name}")
+
+        if rate is None:
+            rates[name] = None
+        elif isinstance(rate, (int, float)) and not isinstance(rate, bool) and rate > 0:
+            rates[name] = float(rate)
+        else:
+            raise SubscriptionError(f"Invalid rate for {name}: {rate}")
+
+    return rates
+
+
+class Subscriptions:
+    """Decides which messages a client receives and downsamples the streams."""
+
+    def __init__(self, rates: dict[str, Optional[float]]):
+        self._intervals = {name: 1 / rate if rate else 0.0 for name, rate in rates.items()}
+        self._last_sent: dict[Hashable, float] = {}
+        self._pending: dict[Hashable, tuple[str, Any]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._intervals
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def interval(self, name: str) -> Optional[float]:
+        """Returns the minimum time between two messages of a stream, None if not subscribed"""
+        return self._intervals.get(name)
+
+    def offer(self, name: str, key: Hashable, message: Any, now: float) -> bool:
+        """
+        Returns True if the message should be sent now. If it is too early, the message is kept
+        until `due_messages` returns it.
+
+        @param name: the stream the message belongs to
+        @param key: identifies the value in the stream, e.g. a sensor port
+        """
+        interval = self._intervals.get(name)
+        if interval is None:
+            return False
+
+        last_sent = self._last_sent.get(key)
+        if last_sent is None or now - last_sent >= interval:
+            self._last_sent[key] = now
+            self._pending.pop(key, None)
+            return True
+
+        self._pending[key] = (name, message)
+        return False
+
+    def due_messages(self, now: float) -> Iterator[tuple[Hashable, Any]]:
+        """Yields the held back messages that can be sent now, with their keys."""
+        for key, (name, message) in list(self._pending.items()):
+            if now - self._last_sent[key] >= self._intervals[name]:
+                del self._pending[key]
+                self._last_sent[key] = now
+                yield key, message
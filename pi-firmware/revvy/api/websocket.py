@@ -3,22 +3,45 @@
 import asyncio
 from enum import Enum
 import json
-import struct
+import os
 import threading
-from time import time
+from time import monotonic, strftime, time
 import traceback
-from typing import Any
+from typing import Any, Hashable, Optional
+from revvy.api.binary_protocol import (
+    BINARY_SUBPROTOCOL,
+    TELEMETRY_EVENTS,
+    BinaryMessageType,
+    ClientTelemetry,
+    ProgramStatusTracker,
+    decode_message,
+    decode_telemetry_interval,
+    encode_message,
+    telemetry_value,
+)
 from revvy.api.camera import Camera
+from revvy.api.client_connection import ClientConnection
+from revvy.api.subscriptions import (
+    IMU_STREAM,
+    MOTOR_STATUS_STREAM,
+    RAW_STREAMS,
+    Subscriptions,
+    parse_subscriptions,
+)
+from revvy.utils.binary_log import dump_binary_log, load_dump
+from revvy.utils.directories import RECORDINGS_DIR
 from revvy.utils.error_reporter import RobotErrorType
 from revvy.utils.version import VERSION
 
 import websockets
+from websockets.typing import Subprotocol
 
-from revvy.robot.robot_events import RobotEvent
+from revvy.robot.robot_events import MotorChangeData, RobotEvent
+from revvy.robot.telemetry_recorder import TelemetryRecorder
 from revvy.robot_manager import RobotManager
 
 
-from revvy.robot.rc_message_parser import parse_control_message
+from revvy.robot.rc_message_parser import json_to_control_message, parse_control_message
 from revvy.robot_config import RobotConfig
 
 from revvy.utils.logger import LogLevel, get_logger
@@ -43,6 +66,12 @@ send_control_events = [
     RobotEvent.ERROR,
 ]
 
+# Clients that subscribe may also receive these
+subscribable_events = [*send_control_events, RobotEvent.TIMER_TICK]
+
+default_streams = frozenset(evt.value for evt in send_control_events)
+subscribable_streams = frozenset(evt.value for evt in subscribable_events) | frozenset(RAW_STREAMS)
+
 ignore_log_events = [
     RobotEvent.ORIENTATION_CHANGE,
     RobotEvent.TIMER_TICK,
@@ -53,6 +82,27 @@ ignore_log_events = [
 ]
 
 
+# Periodic state updates, only the latest one needs to be sent to a slow client
+coalesced_events = [
+    RobotEvent.BATTERY_CHANGE,
+    RobotEvent.ORIENTATION_CHANGE,
+    RobotEvent.SCRIPT_VARIABLE_CHANGE,
+    RobotEvent.PROGRAM_STATUS_CHANGE,
+    RobotEvent.SENSOR_VALUE_CHANGE,
+]
+
+
+def coalesce_key(evt, data) -> Optional[Hashable]:
+    """Messages with the same key replace each other in the outgoing queues."""
+    if evt not in coalesced_events:
+        return None
+    if evt == RobotEvent.SENSOR_VALUE_CHANGE:
+        return evt, data.port_id
+    if evt == RobotEvent.PROGRAM_STATUS_CHANGE:
+        return evt, data.id
+    return evt
+
+
 # Function to check if an object is a named tuple
 def is_namedtuple(obj) -> bool:
     return isinstance(obj, tuple) and hasattr(obj, "_fields")
@@ -79,7 +129,10 @@ def encode_data(data) -> str:
 class RobotWebSocketApi:
     def __init__(self, robot_manager: RobotManager):
         self._robot_manager = robot_manager
-        self._connections = []
+        # Replaced, not modified, so that other threads can iterate over it
+        self._connections: list[ClientConnection] = []
+        self._program_status = ProgramStatusTracker()
+        self._stream_last_sent: dict[str, float] = {}
         self.thread()
         self._event_loop = None
 
@@ -88,19 +141,121 @@ class RobotWebSocketApi:
         # Sends events through robot state!
         self._camera = Camera(robot_manager._robot_state.trigger)
 
+        self._recorder = TelemetryRecorder(robot_manager.robot.status_updater)
+
         robot_manager.on_all(self.all_event_capture)
 
     def all_event_capture(self, object_ref, evt, data=None) -> None:
         if evt not in ignore_log_events:
             log(f"{evt} {str(data)}")
-        if evt in send_control_events:
-            self.send({"event": evt, "data": data})
+        sent_in_telemetry = False
+        if evt in TELEMETRY_EVENTS:
+            sent_in_telemetry = self._update_telemetry(evt, data)
+        elif evt == RobotEvent.MCU_TICK:
+            self._send_telemetry()
+            self._send_subscribed_streams()
+        if evt in subscribable_events:
+            self.send(
+                {"event": evt, "data": data},
+                skip_telemetry_clients=sent_in_telemetry,
+                key=coalesce_key(evt, data),
+                stream=evt.value,
+            )
+
+    def _update_telemetry(self, evt, data) -> bool:
+        """Returns False if the telemetry clients need the event as JSON, too"""
+        value = telemetry_value(evt, data, self._program_status)
+        if value is None:
+            return False
+
+        sent = True
+        for client in self._connections:
+            if client.telemetry and not client.telemetry.update(*value):
+                sent = False
+        return sent
+
+    def _send_telemetry(self) -> None:
+        for client in self._connections:
+            if client.telemetry:
+                frame = client.telemetry.next_frame()
+                if frame:
+                    self.send_binary(client, frame, key="telemetry")
+
+    def _send_subscribed_streams(self) -> None:
+        """Sends the raw streams and the messages that were held back by downsampling"""
+        subscriptions = [c.subscriptions for c in self._connections if c.subscriptions]
+        if not subscriptions:
+            return
+
+        now = monotonic()
+        if self._is_stream_due(IMU_STREAM, subscriptions, now):
+            self.send(
+                {"event": IMU_STREAM, "data": self._imu_data()},
+                key=IMU_STREAM,
+                stream=IMU_STREAM,
+            )
+
+        if self._is_stream_due(MOTOR_STATUS_STREAM, subscriptions, now):
+            self.send(
+                {"event": MOTOR_STATUS_STREAM, "data": self._motor_status_data()},
+                key=MOTOR_STATUS_STREAM,
+                stream=MOTOR_STATUS_STREAM,
+            )
+
+        if any(s.has_pending for s in subscriptions):
+            assert self._event_loop is not None
+            self._event_loop.call_soon_threadsafe(self._send_due_messages)
+
+    def _is_stream_due(self, name: str, subscriptions: list[Subscriptions], now: float) -> bool:
+        """
+        Downsamples a raw stream to the highest rate any client subscribed to, so that the
+        samples that no client would receive are not collected and encoded.
+        """
+        intervals = [i for i in (s.interval(name) for s in subscriptions) if i is not None]
+        if not intervals:
+            return False
+
+        last_sent = self._stream_last_sent.get(name)
+        if last_sent is not None and now - last_sent < min(intervals):
+            return False
+
+        self._stream_last_sent[name] = now
+        return True
+
+    def _imu_data(self) -> dict:
+        imu = self._robot_manager.robot.imu
+        return {
+            "acceleration": imu.acceleration._asdict(),
+            "rotation": imu.rotation._asdict(),
+            "orientation": imu.orientation._asdict(),
+        }
+
+    def _motor_status_data(self) -> list:
+        return [
+            MotorChangeData(
+                id=port.id, power=port.driver.power, speed=port.driver.speed, pos=port.driver.pos
+            )._asdict()
+            for port in self._robot_manager.robot.motors
+            if port.config is not None
+        ]
+
+    def _send_due_messages(self) -> None:
+        now = monotonic()
+        for client in self._connections:
+            if client.subscriptions:
+                for key, data in client.subscriptions.due_messages(now):
+                    client.enqueue(data, key)
 
     def start(self) -> None:
         """Starts separate thread"""
         asyncio.set_event_loop(asyncio.new_event_loop())
         log("Starting WebSocket server")
-        server = websockets.serve(self.incoming_connection, "0.0.0.0", SERVER_PORT)
+        server = websockets.serve(
+            self.incoming_connection,
+            "0.0.0.0",
+            SERVER_PORT,
+            subprotocols=[Subprotocol(BINARY_SUBPROTOCOL)],
+        )
         log(f"Started WebSocket server on {SERVER_PORT}")
         self._event_loop = asyncio.get_event_loop()
         self._event_loop.run_until_complete(server)
@@ -112,13 +267,18 @@ class RobotWebSocketApi:
 
     async def incoming_connection(self, websocket, path) -> None:
         """On new connection, a new this will be ran."""
+        client = ClientConnection(websocket)
+        writer = asyncio.ensure_future(client.run_writer())
         try:
             # Ditch former connections!
             # self._robot_manager.set_communication_interface_callbacks(self)
-            self._connections.append(websocket)
+            self._connections = [*self._connections, client]
 
             # Print a message when a new connection is established
-            log(f"Client connected: '{path}' - {websocket.remote_address}")
+            log(
+                f"Client connected: '{path}' - {websocket.remote_address}"
+                f" protocol: {websocket.subprotocol}"
+            )
 
             # Initial state sends.
             self.send(
@@ -133,6 +293,13 @@ class RobotWebSocketApi:
             async for message_raw in websocket:
                 # log(f"Received message: {message_raw}")
 
+                if isinstance(message_raw, bytes):
+                    try:
+                        self._handle_binary_message(client, message_raw)
+                    except Exception as e:
+                        self._report_message_error("binary", e)
+                    continue
+
                 message = json.loads(message_raw)
 
                 message_type = message["type"]
@@ -154,14 +321,27 @@ class RobotWebSocketApi:
                             {"event": "confirm_success", "data": time() - configure_start_time}
                         )
 
+                    if message_type == "record_start":
+                        self._start_recording(message.get("body"))
+
+                    if message_type == "record_stop":
+                        stats = self._recorder.stop()
+                        self.send(
+                            {
+                                "event": "recording_stopped",
+                                "data": {"path": self._recorder.path, "stats": stats._asdict()},
+                            }
+                        )
+
+                    if message_type == "subscribe":
+                        self._subscribe(client, message["body"])
+
+                    if message_type == "dump_log":
+                        await self._dump_log(client)
+
                     if message_type == "control":
                         json_data = message["body"]
-                        data = bytearray(
-                            struct.pack(
-                                "B" * len(json_data),
-                                *[json_data[str(i)] for i in range(len(json_data))],
-                            )
-                        )
+                        data = json_to_control_message(json_data)
 
                         command = parse_control_message(data)
                         # log(
@@ -172,41 +352,136 @@ class RobotWebSocketApi:
                         # Send back the packet ID to see LAG.
                         self.send({"event": "control_confirm", "data": json_data["0"]})
                 except Exception as e:
-                    log(f"Loop failed: {message_type}: {e}")
-                    stack = traceback.format_exc()
-                    self.send(
-                        {
-                            "event": "error",
-                            "data": {
-                                "stack": f"{stack}\n{message_type}: {e}",
-                                "type": RobotErrorType.SYSTEM,
-                                "ref": 0,
-                            },
-                        }
-                    )
+                    self._report_message_error(message_type, e)
 
         except websockets.exceptions.ConnectionClosedError:
             pass  # Connection closed, ignore the error
             self._robot_manager.robot.play_tune("s_disconnect")
         finally:
+            self._connections = [c for c in self._connections if c is not client]
+            client.close()
+            writer.cancel()
+            log(f"Outgoing messages: {client.stats}")
             # Print a message when a connection is closed
             log(f"Client disconnected: {websocket.remote_address}")
 
-    def send(self, message) -> None:
+    def _handle_binary_message(self, client: ClientConnection, message_raw: bytes) -> None:
+        message_type, payload = decode_message(message_raw)
+
+        if message_type == BinaryMessageType.CONTROL:
+            command = parse_control_message(payload)
+            self._robot_manager.handle_periodic_control_message(command)
+            # Send back the packet ID to see LAG.
+            client.enqueue(encode_message(BinaryMessageType.CONTROL_CONFIRM, bytes(payload[0:1])))
+
+        elif message_type == BinaryMessageType.TELEMETRY_INTERVAL:
+            interval = decode_telemetry_interval(payload)
+            log(f"Telemetry interval: {interval}")
+            if interval > 0:
+                if not client.telemetry:
+                    client.telemetry = ClientTelemetry()
+                client.telemetry.set_interval(interval)
+            else:
+                client.telemetry = None
+
+        else:
+            log(f"Unexpected binary message: {message_type.name}", LogLevel.WARNING)
+
+    def _start_recording(self, body) -> None:
+        """Starts recording the motor and IMU data, see revvy.robot.telemetry_recorder"""
+        name = (body or {}).get("name") or strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RECORDINGS_DIR, f"{os.path.basename(name)}.rec")
+        self._recorder.start(path)
+        self.send({"event": "recording_started", "data": path})
+
+    async def _dump_log(self, client: ClientConnection) -> None:
+        """Dumps the binary log and sends it to the client, see revvy.utils.binary_log"""
+
+        def _dump() -> str:
+            path = dump_binary_log("request")
+            if path is None:
+                raise IOError("Failed to dump the binary log")
+            return encode_data(
+                {"event": "log_dumped", "data": {"path": path, "lines": load_dump(path)}}
+            )
+
+        # formatting thousands of records would block the other clients
+        data = await asyncio.get_running_loop().run_in_executor(None, _dump)
+        client.enqueue(data)
+
+    def _subscribe(self, client: ClientConnection, body) -> None:
+        if body is None:
+            client.subscriptions = None
+        else:
+            client.subscriptions = Subscriptions(parse_subscriptions(body, subscribable_streams))
+        log(f"Subscriptions: {body}")
+        client.enqueue(encode_data({"event": "subscribed", "data": body}))
+
+    def _report_message_error(self, message_type, e: Exception) -> None:
+        log(f"Loop failed: {message_type}: {e}")
+        stack = traceback.format_exc()
+        self.send(
+            {
+                "event": "error",
+                "data": {
+                    "stack": f"{stack}\n{message_type}: {e}",
+                    "type": RobotErrorType.SYSTEM,
+                    "ref": 0,
+                },
+            }
+        )
+
+    def send_binary(self, client: ClientConnection, data: bytes, key=None) -> None:
+        """Sends a binary frame to a single client. Can be called from any thread."""
+        assert self._event_loop is not None
+
+        self._event_loop.call_soon_threadsafe(client.enqueue, data, key)
+
+    def send(self, message, skip_telemetry_clients=False, key=None, stream=None) -> None:
+        """
+        Sends a JSON message to every client. Can be called from any thread.
+
+        The message is encoded once and queued for every client. If `skip_telemetry_clients` is
+        set, the clients that receive the message in telemetry frames are skipped. Messages with
+        a `key` replace the queued message with the same key, see coalesce_key.
+        Messages of a `stream` are only sent to the clients that receive that stream, see
+        revvy.api.subscriptions. Messages without a stream are sent to every client.
+        """
+        if not self._connections:
+            return
+
         assert self._event_loop is not None
 
-        for ws in self._connections:
-            try:
-                # log(f'msg: {message["event"]}')
-                asyncio.run_coroutine_threadsafe(ws.send(encode_data(message)), self._event_loop)
-            except Exception as e:
-                log(f"send error {str(e)}", LogLevel.ERROR)
-                print(message)
-                log(f"{message}")
+        try:
+            # log(f'msg: {message["event"]}')
+            data = encode_data(message)
+        except Exception as e:
+            log(f"send error {str(e)}", LogLevel.ERROR)
+            log(f"{message}")
+            return
+
+        self._event_loop.call_soon_threadsafe(
+            self._broadcast, data, key, stream, skip_telemetry_clients
+        )
+
+    def _broadcast(self, data: str, key, stream, skip_telemetry_clients: bool) -> None:
+        now = monotonic()
+        for client in self._connections:
+            if skip_telemetry_clients and client.telemetry:
+                continue
+
+            subscriptions = client.subscriptions
+            if stream is None:
+                client.enqueue(data, key)
+            elif subscriptions is None:
+                if stream in default_streams:
+                    client.enqueue(data, key)
+            elif subscriptions.offer(stream, stream if key is None else key, data, now):
+                client.enqueue(data, key)
 
     def disconnect(self) -> None:
         """Disconnects all clients"""
-        for ws in self._connections:
-            ws.close()
+        assert self._event_loop is not None
 
-        self._connections = []
+        for client in self._connections:
+            asyncio.run_coroutine_threadsafe(client.websocket.close(), self._event_loop)
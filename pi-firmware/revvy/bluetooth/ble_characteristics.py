@@ -2,8 +2,9 @@
 
 from enum import Enum
 import struct
+import time
 import traceback
-from typing import Generic, TypeVar
+from typing import Callable, Generic, Optional, TypeVar
 
 from pybleno import Characteristic, Descriptor
 from revvy.bluetooth.data_types import (
@@ -119,6 +120,8 @@ DataType = TypeVar("DataType", bound=Serialize)
 class BrainToMobileCharacteristic(Characteristic, Generic[DataType]):
     def __init__(self, uuid, description: bytes) -> None:
         self._value = bytes()
+        # called with the time it took to hand a notification to the Bluetooth stack
+        self.on_notified: Optional[Callable[[float], None]] = None
         super().__init__(
             {
                 "uuid": uuid,
@@ -138,28 +141,41 @@ class BrainToMobileCharacteristic(Characteristic, Generic[DataType]):
         else:
             callback(Characteristic.RESULT_SUCCESS, self._value)
 
-    def updateValue(self, value: DataType) -> None:
+    @property
+    def value(self) -> bytes:
+        return self._value
+
+    def notify(self) -> None:
+        """Notifies the current value"""
+        self._update_value(self._value)
+
+    def updateValue(self, value: DataType, notify: bool = True) -> None:
         if isinstance(value, Serialize):
             value = value.__bytes__()
-        self._update_value(value)
+        self._update_value(value, notify)
 
-    def _update_value(self, value: bytes) -> None:
+    def _update_value(self, value: bytes, notify: bool = True) -> None:
         self._value = value
 
         update_notified_value = self.updateValueCallback
-        if update_notified_value:
+        if notify and update_notified_value:
+            start = time.monotonic()
             update_notified_value(self._value)
 
+            on_notified = self.on_notified
+            if on_notified:
+                on_notified(time.monotonic() - start)
+
 
 class StateControlCharacteristic(BackgroundProgramControlCharacteristic):
     pass
 
 
 class SensorCharacteristic(BrainToMobileCharacteristic):
-    def updateValue(self, value: Serialize) -> None:
+    def updateValue(self, value: Serialize, notify: bool = True) -> None:
         valueBytes = value.__bytes__()
         # FIXME: prefix with data length is probably unnecessary
-        super().updateValue(bytes([len(valueBytes), *valueBytes]))
+        super().updateValue(bytes([len(valueBytes), *valueBytes]), notify)
 
 
 class GyroCharacteristic(BrainToMobileCharacteristic[GyroData]):
@@ -185,9 +201,40 @@ class ProgramStatusCharacteristic(BrainToMobileCharacteristic[ProgramStatusColle
         self._data = ProgramStatusCollection()
         self.updateValue(self._data)
 
-    def updateButtonStatus(self, button_id: int, status: int) -> None:
+    def updateButtonStatus(self, button_id: int, status: int, notify: bool = True) -> None:
         self._data.update_button_value(button_id, status)
-        self.updateValue(self._data)
+        self.updateValue(self._data, notify)
+
+
+class TelemetryCharacteristic(BrainToMobileCharacteristic):
+    """
+    Sends combined telemetry frames, see revvy.bluetooth.telemetry.
+
+    The mobile enables the frames by writing the requested interval between frames in
+    milliseconds as an uint16, or disables them by writing 0.
+
+    `on_subscribed` is called with the maximum notification size of the link.
+    """
+
+    def __init__(self, uuid, description: bytes, callback, on_subscribed) -> None:
+        super().__init__(uuid, description)
+        self["properties"].append("write")
+        self._on_interval_changed = callback
+        self._on_subscribed = on_subscribed
+
+    def onSubscribe(self, maxValueSize, updateValueCallback) -> None:
+        super().onSubscribe(maxValueSize, updateValueCallback)
+        self._on_subscribed(maxValueSize)
+
+    def onWriteRequest(self, data, offset, withoutResponse, callback) -> None:
+        if offset:
+            callback(Characteristic.RESULT_ATTR_NOT_LONG)
+        elif len(data) != 2:
+            callback(Characteristic.RESULT_INVALID_ATTRIBUTE_LENGTH)
+        else:
+            (interval_ms,) = struct.unpack("<H", data)
+            self._on_interval_changed(interval_ms / 1000)
+            callback(Characteristic.RESULT_SUCCESS)
 
 
 # Device Information Service
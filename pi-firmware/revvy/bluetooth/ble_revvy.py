@@ -2,6 +2,7 @@
 
 import os
 import subprocess
+from threading import Thread
 from typing import Callable
 from pybleno import Bleno, BlenoPrimaryService
 
@@ -11,16 +12,18 @@ from revvy.bluetooth.services.long_message import LongMessageService
 from revvy.robot.robot_events import RobotEvent
 
 from revvy.utils.device_name import get_device_name
-from revvy.utils.directories import BLE_STORAGE_DIR, WRITEABLE_ASSETS_DIR
+from revvy.utils.directories import BLE_STORAGE_DIR, CONFIG_CACHE_DIR, WRITEABLE_ASSETS_DIR
 from revvy.utils.logger import get_logger
 from revvy.utils.file_storage import FileStorage, MemoryStorage
 
 from revvy.robot_manager import RobotManager
 
+from revvy.bluetooth.config_cache import ConfigurationCache
 from revvy.bluetooth.longmessage import LongMessageHandler, LongMessageStorage
 from revvy.bluetooth.longmessage import extract_asset_longmessage, LongMessageImplementation
 
 from revvy.bluetooth.live_message_service import LiveMessageService
+from revvy.bluetooth.rate_governor import NotificationRateGovernor
 
 from revvy.utils.error_reporter import revvy_error_handler
 from revvy.utils.stopwatch import Stopwatch
@@ -46,8 +49,19 @@ class RevvyBLE:
 
         ble_storage = FileStorage(BLE_STORAGE_DIR)
 
-        long_message_storage = LongMessageStorage(ble_storage, MemoryStorage())
-        extract_asset_longmessage(long_message_storage, WRITEABLE_ASSETS_DIR)
+        config_cache = ConfigurationCache(FileStorage(CONFIG_CACHE_DIR))
+
+        long_message_storage = LongMessageStorage(ble_storage, MemoryStorage(), config_cache)
+        # Extracting the assets may take a while, don't delay the startup with it
+        Thread(
+            target=extract_asset_longmessage,
+            args=(
+                long_message_storage,
+                WRITEABLE_ASSETS_DIR,
+                robot_manager.robot.sound.reload_assets,
+            ),
+            name="AssetSync",
+        ).start()
         long_message_handler = LongMessageHandler(long_message_storage)
 
         lmi = LongMessageImplementation(robot_manager, long_message_storage, WRITEABLE_ASSETS_DIR)
@@ -64,7 +78,8 @@ class RevvyBLE:
 
         self._dis = DeviceInformationService()
         self._bas = CustomBatteryService(initial_battery_state)
-        self._live = LiveMessageService(robot_manager)
+        self._rate_governor = NotificationRateGovernor(robot_manager.telemetry_throttle)
+        self._live = LiveMessageService(robot_manager, self._rate_governor)
         self._long = LongMessageService(long_message_handler)
 
         self._named_services = {
@@ -111,6 +126,8 @@ class RevvyBLE:
             RobotEvent.BACKGROUND_CONTROL_STATE_CHANGE, self._live.update_state_control
         )
         self._robot_manager.on(RobotEvent.TIMER_TICK, self._live.update_timer)
+        self._robot_manager.on(RobotEvent.MCU_TICK, self._live.send_telemetry)
+        self._robot_manager.on(RobotEvent.MCU_TICK, self._rate_governor.update)
         self._robot_manager.on(RobotEvent.ERROR, self.report_errors_in_queue)
         self._robot_manager.on(RobotEvent.SESSION_ID_CHANGE, self._live.reset)
 
@@ -118,6 +135,7 @@ class RevvyBLE:
         """On new INCOMING connection, update the callback interfaces."""
         self._log(f"BLE interface connected! {c}")
         self._robot_manager.on_connected(c)
+        self._rate_governor.reset()
         self.report_errors_in_queue()
 
     def _on_disconnect(self, *args) -> None:
@@ -0,0 +1,112 @@
+"""
+Content-addressed cache of received robot configurations.
+
+The app sends the same configuration again and again, e.g. every time it reconnects. The cache
+stores the configuration messages on the disk by their md5 checksum, and keeps the most recently
+used ones parsed in memory. Parsed configurations hold the compiled scripts, too.
+"""
+
+from collections import OrderedDict
+import json
+from threading import Lock
+
+from revvy.robot_config import RobotConfig
+from revvy.utils.file_storage import StorageError, StorageInterface
+from revvy.utils.logger import get_logger
+
+INDEX_FILE = "index"
+
+
+class ConfigurationCache:
+    """Least recently used cache of configuration messages, indexed by their md5 checksum."""
+
+    def __init__(self, storage: StorageInterface, capacity: int = 8, parsed_capacity: int = 2):
+        self._storage = storage
+        self._capacity = capacity
+        self._parsed_capacity = parsed_capacity
+        self._parsed: OrderedDict[str, RobotConfig] = OrderedDict()
+        self._lock = Lock()
+        self._log = get_logger("ConfigurationCache")
+
+        # most recently used entry is the last one
+        try:
+            self._index: list[str] = json.loads(self._storage.read(INDEX_FILE))
+        except (StorageError, ValueError):
+            self._index = []
+
+    def __contains__(self, md5: str) -> bool:
+        return md5 in self._index
+
+    @property
+    def most_recent(self) -> str:
+        """The md5 checksum of the most recently used configuration, or an empty string."""
+        return self._index[-1] if self._index else ""
+
+    def length(self, md5: str) -> int:
+        return self._storage.read_metadata(md5)["length"]
+
+    def add(self, md5: str, data: bytes) -> None:
+        with self._lock:
+            if md5 not in self._index:
+                self._storage.write(md5, data, md5=md5)
+            self._use(md5)
+
+    def read(self, md5: str) -> bytes:
+        """Returns a cached configuration message. Raises StorageError if it is not cached."""
+        with self._lock:
+            if md5 not in self._index:
+                raise StorageError(f"Configuration {md5} is not cached")
+
+            try:
+                data = self._storage.read(md5)
+            except StorageError:
+                self._remove(md5)
+                raise
+
+            self._use(md5)
+            return data
+
+    def get_config(self, md5: str) -> RobotConfig:
+        """
+        Returns the parsed configuration. Raises StorageError if the configuration is not cached,
+        and ConfigError if it is invalid.
+        """
+        with self._lock:
+            config = self._parsed.get(md5)
+            if config is not None:
+                self._parsed.move_to_end(md5)
+                self._use(md5)
+                return config
+
+        config = RobotConfig.from_string(self.read(md5).decode())
+
+        with self._lock:
+            self._parsed[md5] = config
+            while len(self._parsed) > self._parsed_capacity:
+                self._parsed.popitem(last=False)
+
+        return config
+
+    def _use(self, md5: str) -> None:
+        if md5 in self._index:
+            if self._index[-1] == md5:
+                return
+            self._index.remove(md5)
+        self._index.append(md5)
+
+        while len(self._index) > self._capacity:
+            evicted = self._index.pop(0)
+            self._log(f"Evicting {evicted}")
+            self._parsed.pop(evicted, None)
+            self._storage.delete(evicted)
+
+        self._save_index()
+
+    def _remove(self, md5: str) -> None:
+        self._index.remove(md5)
+        self._parsed.pop(md5, None)
+        self._storage.delete(md5)
+        self._save_index()
+
+    def _save_index(self) -> None:
+        self._storage.write(INDEX_FILE, json.dumps(self._index).encode())
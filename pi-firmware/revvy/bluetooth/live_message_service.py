@@ -5,17 +5,21 @@ from typing import Callable, Optional
 
 from pybleno import BlenoPrimaryService
 from revvy.bluetooth.ble_characteristics import (
+    BrainToMobileCharacteristic,
     GyroCharacteristic,
     MobileToBrainFunctionCharacteristic,
     ProgramStatusCharacteristic,
     ReadVariableCharacteristic,
     BackgroundProgramControlCharacteristic,
     SensorCharacteristic,
+    TelemetryCharacteristic,
     TimerCharacteristic,
     ValidateConfigCharacteristic,
     ValidateState,
 )
 from revvy.bluetooth.queue_characteristic import QueueCharacteristic
+from revvy.bluetooth.rate_governor import NotificationRateGovernor
+from revvy.bluetooth.telemetry import TelemetryField, TelemetryFrameEncoder
 from revvy.bluetooth.data_types import (
     BackgroundControlState,
     GyroData,
@@ -28,8 +32,10 @@ from revvy.robot.robot_events import ProgramStatusChange
 from revvy.robot_manager import RobotManager
 from revvy.scripting.runtime import ScriptEvent
 
-from revvy.utils.error_reporter import RobotError
+from revvy.utils.error_reporter import RobotError, RobotErrorType
 from revvy.utils.logger import get_logger
+from revvy.utils.message_queue import PRIORITY_HIGH, PRIORITY_NORMAL
+from revvy.utils.stopwatch import Stopwatch
 
 from revvy.robot.remote_controller import BleAutonomousCmd, RemoteControllerCommand
 
@@ -42,8 +48,11 @@ log = get_logger("Live Message Service")
 class LiveMessageService(BlenoPrimaryService):
     """Handles short messages on the Bluetooth interface"""
 
-    def __init__(self, robot_manager: RobotManager):
+    def __init__(
+        self, robot_manager: RobotManager, governor: Optional[NotificationRateGovernor] = None
+    ):
         self._message_handler = None
+        self._governor = governor
 
         self._robot_manager = robot_manager
 
@@ -68,6 +77,17 @@ class LiveMessageService(BlenoPrimaryService):
         self._error_reporting_characteristic = QueueCharacteristic(
             "0a0a8fa3-4c8f-44eb-892f-2bb8a6e163ca", b"Error Reporting"
         )
+        self._telemetry_characteristic = TelemetryCharacteristic(
+            "61c6a4bc-9b26-45cf-b195-28785fb8471d",
+            b"Telemetry",
+            self.set_telemetry_interval,
+            self.set_max_telemetry_frame_size,
+        )
+
+        # Telemetry frames are disabled until the mobile requests them
+        self._telemetry = TelemetryFrameEncoder()
+        self._telemetry_interval = 0.0
+        self._telemetry_stopwatch = Stopwatch()
 
         self._sensor_characteristics = [
             SensorCharacteristic("135032e6-3e86-404f-b0a9-953fd46dcb17", b"Sensor 1"),
@@ -90,6 +110,18 @@ class LiveMessageService(BlenoPrimaryService):
             self.validate_config_callback,
         )
 
+        if governor:
+            for characteristic in (
+                *self._sensor_characteristics,
+                self._gyro_characteristic,
+                self._orientation_characteristic,
+                self._read_variable_characteristic,
+                self._timer_characteristic,
+                self._program_status_characteristic,
+                self._telemetry_characteristic,
+            ):
+                characteristic.on_notified = governor.record_notify
+
         super().__init__(
             {
                 "uuid": "d2d5558c-5b9d-11e9-8647-d663bd873d93",
@@ -104,6 +136,7 @@ class LiveMessageService(BlenoPrimaryService):
                     self._timer_characteristic,
                     self._program_status_characteristic,
                     self._error_reporting_characteristic,
+                    self._telemetry_characteristic,
                 ],
             }
         )
@@ -115,6 +148,44 @@ class LiveMessageService(BlenoPrimaryService):
         self._program_status_characteristic.resetValue()
         for sensor in self._sensor_characteristics:
             sensor.resetValue()
+        self._telemetry_interval = 0.0
+        self._telemetry.reset()
+
+    def set_telemetry_interval(self, interval: float) -> None:
+        """Sets the time between telemetry frames in seconds. 0 disables the frames."""
+        log(f"Telemetry interval: {interval}")
+        self._telemetry_interval = interval
+        self._telemetry.request_keyframe()
+
+    def set_max_telemetry_frame_size(self, size: int) -> None:
+        log(f"Maximum telemetry frame size: {size}")
+        self._telemetry.max_frame_size = size
+        self._telemetry.request_keyframe()
+
+    @property
+    def _notify_values(self) -> bool:
+        """Values are notified on their own characteristics, unless telemetry frames are used."""
+        return self._telemetry_interval == 0
+
+    def _update_telemetry_field(
+        self, field: TelemetryField, characteristic: BrainToMobileCharacteristic
+    ) -> None:
+        """Values that don't fit into a telemetry frame are notified on their own characteristic."""
+        if not self._telemetry.update(field, characteristic.value) and not self._notify_values:
+            characteristic.notify()
+
+    def send_telemetry(self, *args) -> None:
+        """Sends the changed values, if it is time for the next telemetry frame."""
+        interval = self._telemetry_interval
+        if self._governor:
+            interval *= self._governor.scale
+        if interval == 0 or self._telemetry_stopwatch.elapsed < interval:
+            return
+
+        self._telemetry_stopwatch.reset()
+        frame = self._telemetry.encode()
+        if frame:
+            self._telemetry_characteristic.updateValue(frame)
 
     def validate_config_callback(self, data: bytes) -> bool:
         # FIXME: Currently unused
@@ -174,6 +245,9 @@ class LiveMessageService(BlenoPrimaryService):
         is the middle value representing joystick axis in neutral state.
         """
 
+        if self._governor:
+            self._governor.record_control_message()
+
         command = parse_control_message(data)
         self._robot_manager.handle_periodic_control_message(command)
         return True
@@ -185,7 +259,7 @@ class LiveMessageService(BlenoPrimaryService):
         self._robot_manager.handle_periodic_control_message(
             RemoteControllerCommand(
                 analog=bytearray(b"\x7f\x7f\x00\x00\x00\x00\x00\x00\x00\x00"),
-                buttons=[False] * 32,
+                buttons=0,
                 background_command=BleAutonomousCmd(int.from_bytes(data[2:], byteorder="big")),
                 next_deadline=None,
             )
@@ -194,14 +268,20 @@ class LiveMessageService(BlenoPrimaryService):
     def update_sensor(self, emitter, sensor_data: SensorData):
         """Send back sensor value to mobile."""
         try:
-            self._sensor_characteristics[sensor_data.port_id].updateValue(sensor_data)
+            characteristic = self._sensor_characteristics[sensor_data.port_id]
+            characteristic.updateValue(sensor_data, self._notify_values)
+            self._update_telemetry_field(
+                TelemetryField(TelemetryField.SENSOR_1 + sensor_data.port_id), characteristic
+            )
         except IndexError as e:
             log(f"Sensor data update failed: {e}")
 
     def update_program_status(self, emitter, change: ProgramStatusChange):
         """Update the status of a button-triggered script"""
 
-        self._program_status_characteristic.updateButtonStatus(change.id, change.status.value)
+        characteristic = self._program_status_characteristic
+        characteristic.updateButtonStatus(change.id, change.status.value, self._notify_values)
+        self._update_telemetry_field(TelemetryField.PROGRAM_STATUS, characteristic)
 
     def update_session_id(self, emitter, value: int):
         """Send back session_id to mobile."""
@@ -217,22 +297,36 @@ class LiveMessageService(BlenoPrimaryService):
 
     def update_orientation(self, emitter, data: GyroData):
         """Send back orientation to mobile. Used to display the yaw of the robot"""
-        self._orientation_characteristic.updateValue(data)
+        self._orientation_characteristic.updateValue(data, self._notify_values)
+        self._update_telemetry_field(TelemetryField.ORIENTATION, self._orientation_characteristic)
 
     def update_timer(self, emitter, data: TimerData):
         """Send back timer tick to mobile."""
-        self._timer_characteristic.updateValue(data)
+        self._timer_characteristic.updateValue(data, self._notify_values)
+        self._update_telemetry_field(TelemetryField.TIMER, self._timer_characteristic)
 
     def report_error(self, data: RobotError, on_ready: Optional[Callable[[], None]] = None):
         log(f"Sending Error: {data}")
-        self._error_reporting_characteristic.sendQueued(data.__bytes__(), on_ready)
+        # Script errors can come in storms, don't let them push out the system errors
+        is_script_error = data.error_type in (
+            RobotErrorType.BLOCKLY_BUTTON,
+            RobotErrorType.BLOCKLY_BACKGROUND,
+        )
+        self._error_reporting_characteristic.sendQueued(
+            data.__bytes__(),
+            on_ready,
+            key=data.hash(),
+            priority=PRIORITY_NORMAL if is_script_error else PRIORITY_HIGH,
+        )
 
     def update_script_variables(self, emitter, script_variables: ScriptVariables):
         """
         In the mobile app, this data shows up when we track variables.
         By characteristic protocol - maximum slots in BLE message is 4.
         """
-        self._read_variable_characteristic.updateValue(script_variables)
+        characteristic = self._read_variable_characteristic
+        characteristic.updateValue(script_variables, self._notify_values)
+        self._update_telemetry_field(TelemetryField.SCRIPT_VARIABLES, characteristic)
 
     def update_state_control(self, emitter, state: BackgroundControlState):
         """Send back the background programs' state."""
@@ -5,19 +5,20 @@ from enum import Enum
 import io
 from math import ceil
 import os
-import tarfile
-import shutil
 import threading
 import traceback
 import hashlib
 import struct
+import zlib
 
 from contextlib import suppress
 from json import JSONDecodeError
-from typing import NamedTuple, Optional
+from typing import Callable, NamedTuple, Optional
 
+from revvy.bluetooth.config_cache import ConfigurationCache
 from revvy.utils.emitter import SimpleEventEmitter
-from revvy.utils.file_storage import StorageInterface, StorageError
+from revvy.utils.asset_sync import HASH_FILE, sync_tar_archive
+from revvy.utils.file_storage import StorageInterface, StorageError, StorageWriter
 from revvy.utils.functions import split
 from revvy.utils.logger import LogLevel, get_logger
 from revvy.utils.progress_indicator import ProgressIndicator
@@ -89,6 +90,19 @@ class LongMessageType(Enum):
     def filename(self) -> str:
         return str(self.value)
 
+    @property
+    def max_size(self) -> int:
+        """Largest accepted message. Uploads must not be able to exhaust the memory or storage."""
+        return MAX_MESSAGE_SIZES[self]
+
+
+MAX_MESSAGE_SIZES = {
+    LongMessageType.FIRMWARE_DATA: 1024 * 1024,
+    LongMessageType.FRAMEWORK_DATA: 64 * 1024 * 1024,
+    LongMessageType.CONFIGURATION_DATA: 4 * 1024 * 1024,
+    LongMessageType.TEST_KIT: 1024 * 1024,
+    LongMessageType.ASSET_DATA: 64 * 1024 * 1024,
+}
 
 PERSISTED_MESSAGES = [
     LongMessageType.FIRMWARE_DATA,
@@ -102,37 +116,229 @@ class MessageType(Enum):
     INIT_TRANSFER = 1
     UPLOAD_MESSAGE = 2
     FINALIZE_MESSAGE = 3
+    RESUME_TRANSFER = 4
+    UPLOAD_MESSAGE_AT_OFFSET = 5
 
 
 class LongMessageError(Exception):
     pass
 
 
+# Flags of INIT_TRANSFER and RESUME_TRANSFER
+# The message is compressed using zlib. The checksum refers to the decompressed data.
+TRANSFER_FLAG_ZLIB = 0x01
+
+# Received data is made persistent after this many bytes, so that uploads can be resumed after a
+# restart, too.
+CHECKPOINT_INTERVAL = 16 * 1024
+
+# Compressed data is decompressed in pieces of at most this size
+DECOMPRESSED_CHUNK_SIZE = 64 * 1024
+
+
+def add_range(ranges: list[list[int]], start: int, end: int) -> None:
+    """
+    Adds the [start, end) range to a sorted list of disjoint ranges, merging touching ones.
+
+    >>> ranges = []
+    >>> add_range(ranges, 10, 20)
+    >>> add_range(ranges, 0, 5)
+    >>> ranges
+    [[0, 5], [10, 20]]
+    >>> add_range(ranges, 5, 10)
+    >>> ranges
+    [[0, 20]]
+    >>> add_range(ranges, 15, 30)
+    >>> ranges
+    [[0, 30]]
+    """
+    merged = []
+    for current in ranges:
+        if current[1] < start or end < current[0]:
+            merged.append(current)
+        else:
+            start = min(start, current[0])
+            end = max(end, current[1])
+
+    merged.append([start, end])
+    merged.sort()
+    ranges[:] = merged
+
+
 class ReceivedLongMessage:
-    """Helper class for building long messages"""
+    """
+    Helper class for building long messages.
+
+    The received data is not kept in memory, it is streamed into `sink`. Once the message is
+    stored, its contents can be read from the LongMessageStorage.
 
-    def __init__(self, message_type: LongMessageType, md5: str, size=0):
+    Chunks can be received in any order. `length` is the number of bytes received without a gap
+    from the start of the message, which is where an interrupted upload should be resumed.
+
+    Compressed messages are decompressed as they arrive, so their chunks must be uploaded in order.
+    `length` counts the compressed bytes, while the checksum is calculated from the decompressed
+    data.
+    """
+
+    def __init__(
+        self,
+        message_type: LongMessageType,
+        md5: str,
+        size=0,
+        sink: Optional[StorageWriter] = None,
+        compressed: bool = False,
+    ):
         self.message_type = message_type
         self.md5 = md5
         self.total_chunks = size
         self.received_chunks = 0
-        self.data = bytearray()
+        self.length = 0
+        self.sink = sink
+        self._received_ranges: list[list[int]] = []
+        # Only usable while the data arrives in order, otherwise the checksum is calculated from
+        # the written data.
         self._md5calc = hashlib.md5()
+        self._in_order = True
         self._size_known = size != 0
+        self._unsaved_bytes = 0
+        self.compressed = compressed
+        self._decompressor = zlib.decompressobj() if compressed else None
+        self._decoded_length = 0
+        self._decoding_failed = False
+        # validity calculated by `finish`, checking it may need to read the whole message
+        self._is_valid: Optional[bool] = None
+
+    @property
+    def state(self) -> dict:
+        """State that is needed to resume receiving the message."""
+        return {
+            "md5": self.md5,
+            "ranges": self._received_ranges,
+            "received_chunks": self.received_chunks,
+        }
+
+    def restore(self, state: dict) -> None:
+        """Continue receiving a message that was suspended with the given state."""
+        self.received_chunks = state["received_chunks"]
+        self._received_ranges = state["ranges"]
+        if self._received_ranges:
+            self._in_order = False
+        self._update_length()
 
     def append_data(self, data: bytes):
+        self.write_data(self.length, data)
+
+    def write_data(self, offset: int, data: bytes):
+        if offset + len(data) > self.message_type.max_size:
+            raise LongMessageError(
+                f"{self.message_type.name} must not be larger than {self.message_type.max_size}"
+            )
+
+        self._is_valid = None
+        if self._decompressor:
+            self._write_compressed(offset, data)
+            return
+
+        self.received_chunks += 1
+        if self._in_order and offset == self.length:
+            self._md5calc.update(data)
+        else:
+            self._in_order = False
+
+        add_range(self._received_ranges, offset, offset + len(data))
+        self._update_length()
+
+        if self.sink:
+            self.sink.write_at(offset, data)
+
+            self._unsaved_bytes += len(data)
+            if self._unsaved_bytes >= CHECKPOINT_INTERVAL:
+                self._unsaved_bytes = 0
+                self.sink.checkpoint(self.state)
+
+    def _write_compressed(self, offset: int, data: bytes) -> None:
+        assert self._decompressor is not None
+
+        if offset != self.length:
+            raise LongMessageError("Compressed messages must be uploaded in order")
+
         self.received_chunks += 1
-        self.data += data
+        self.length += len(data)
+        if self._decoding_failed:
+            return
+
+        try:
+            # a few KB of input may decompress into hundreds of MB, so the output is limited
+            while data and not self._decoding_failed:
+                self._write_decoded(self._decompressor.decompress(data, DECOMPRESSED_CHUNK_SIZE))
+                data = self._decompressor.unconsumed_tail
+        except zlib.error:
+            self._decoding_failed = True
+
+    def _write_decoded(self, data: bytes) -> None:
+        self._decoded_length += len(data)
+        if self._decoded_length > self.message_type.max_size:
+            self._decoding_failed = True
+            return
+
         self._md5calc.update(data)
+        if self.sink:
+            self.sink.write(data)
+
+    def finish(self) -> None:
+        """Called when all chunks are received."""
+        decompressor, self._decompressor = self._decompressor, None
+        if decompressor and not self._decoding_failed:
+            try:
+                self._write_decoded(decompressor.flush())
+                if not decompressor.eof:
+                    self._decoding_failed = True
+            except zlib.error:
+                self._decoding_failed = True
+
+        self._is_valid = self._check_valid()
+
+    def _update_length(self) -> None:
+        ranges = self._received_ranges
+        self.length = ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+    def suspend(self) -> None:
+        """Keeps the received data, so that receiving the message can be resumed later."""
+        if self.compressed:
+            # the state of the decompressor can not be saved
+            self.discard()
+        elif self.sink:
+            self.sink.suspend(self.state)
+            self.sink = None
+
+    def discard(self) -> None:
+        """Throws away the received data."""
+        if self.sink:
+            self.sink.abort()
+            self.sink = None
 
     @property
     def is_valid(self) -> bool:
         """Returns true if the uploaded data matches the predefined md5 checksum."""
-        if self._size_known:
-            if self.received_chunks != self.total_chunks:
+        if self._is_valid is None:
+            return self._check_valid()
+        return self._is_valid
+
+    def _check_valid(self) -> bool:
+        if self._decoding_failed:
+            return False
+
+        if self._in_order:
+            if self._size_known and self.received_chunks != self.total_chunks:
+                return False
+
+            md5computed = self._md5calc.hexdigest()
+        else:
+            # Chunks may have been sent more than once, the chunk count is meaningless
+            if len(self._received_ranges) != 1 or not self.sink:
                 return False
 
-        md5computed = self._md5calc.hexdigest()
+            md5computed = self.sink.md5()
 
         return md5computed == self.md5
 
@@ -140,9 +346,15 @@ class ReceivedLongMessage:
 class LongMessageStorage:
     """Store long messages using the given storage class, with extra validation"""
 
-    def __init__(self, storage: StorageInterface, temp_storage: StorageInterface):
+    def __init__(
+        self,
+        storage: StorageInterface,
+        temp_storage: StorageInterface,
+        config_cache: Optional[ConfigurationCache] = None,
+    ):
         self._storage = storage
         self._temp_storage = temp_storage
+        self._config_cache = config_cache
         self._log = get_logger("LongMessageStorage")
 
     def _get_storage(self, message_type: LongMessageType) -> StorageInterface:
@@ -159,13 +371,88 @@ class LongMessageStorage:
             )
 
         except (StorageError, JSONDecodeError):
-            return UnusedLongMessageStatusInfo
+            pass
+
+        cached = self._cached_configuration(long_message_type)
+        if cached:
+            assert self._config_cache is not None
+            # the last configuration is also available after a restart
+            try:
+                length = self._config_cache.length(cached)
+                return LongMessageStatusInfo(
+                    LongMessageStatus.READY, hexdigest2bytes(cached), length
+                )
+            except (StorageError, JSONDecodeError):
+                pass
+
+        return UnusedLongMessageStatusInfo
+
+    def _cached_configuration(self, long_message_type: LongMessageType) -> str:
+        if self._config_cache is None or long_message_type != LongMessageType.CONFIGURATION_DATA:
+            return ""
+        return self._config_cache.most_recent
+
+    def open_long_message(self, long_message_type: LongMessageType) -> StorageWriter:
+        """Returns a sink for a new message. The stored message is kept until the new one is set."""
+        storage = self._get_storage(long_message_type)
+        return storage.open_writer(long_message_type.filename)
+
+    def resume_long_message(
+        self, long_message_type: LongMessageType, md5: str, size: int = 0
+    ) -> Optional[ReceivedLongMessage]:
+        """Returns the suspended upload of the given message, if there is one."""
+        storage = self._get_storage(long_message_type)
+        suspended = storage.resume_writer(long_message_type.filename)
+        if suspended is None:
+            return self._load_cached_configuration(long_message_type, md5)
+
+        sink, state = suspended
+        if state.get("md5") != md5:
+            self._log("Suspended upload is for a different message")
+            sink.abort()
+            return None
+
+        message = ReceivedLongMessage(long_message_type, md5, size, sink)
+        message.restore(state)
+        return message
+
+    def _load_cached_configuration(
+        self, long_message_type: LongMessageType, md5: str
+    ) -> Optional[ReceivedLongMessage]:
+        """Returns a complete message if the configuration was received before."""
+        if self._config_cache is None or long_message_type != LongMessageType.CONFIGURATION_DATA:
+            return None
+
+        if md5 not in self._config_cache:
+            return None
+
+        try:
+            data = self._config_cache.read(md5)
+            sink = self.open_long_message(long_message_type)
+        except StorageError:
+            return None
+
+        self._log(f"Configuration {md5} is cached")
+        message = ReceivedLongMessage(long_message_type, md5, sink=sink)
+        message.append_data(data)
+        return message
 
     def set_long_message(self, message: ReceivedLongMessage):
         self._log("set_long_message")
 
-        storage = self._get_storage(message.message_type)
-        storage.write(message.message_type.filename, message.data, md5=message.md5)
+        assert message.sink is not None
+        message.sink.commit(message.md5)
+        message.sink = None
+
+        if self._config_cache is not None:
+            if message.message_type == LongMessageType.CONFIGURATION_DATA:
+                try:
+                    data = self._get_storage(message.message_type).read(
+                        message.message_type.filename
+                    )
+                    self._config_cache.add(message.md5, data)
+                except StorageError as e:
+                    self._log(f"Failed to cache configuration: {e}")
 
     def get_long_message(self, long_message_type: LongMessageType):
         try:
@@ -173,9 +460,37 @@ class LongMessageStorage:
             storage = self._get_storage(long_message_type)
             return storage.read(long_message_type.filename)
         except Exception as e:
+            cached = self._cached_configuration(long_message_type)
+            if cached:
+                assert self._config_cache is not None
+                with suppress(StorageError):
+                    return self._config_cache.read(cached)
             self._log(f"get_long_message failed: {e}")
             return bytes()
 
+    def get_configuration(self, md5: str) -> RobotConfig:
+        """
+        Returns the parsed configuration message. Raises ConfigError if the message is invalid.
+
+        Configurations that were parsed recently are returned from the cache, together with their
+        already compiled scripts.
+        """
+        if self._config_cache is not None and md5 in self._config_cache:
+            with suppress(StorageError):
+                return self._config_cache.get_config(md5)
+
+        message_data = self.get_long_message(LongMessageType.CONFIGURATION_DATA).decode()
+        return RobotConfig.from_string(message_data)
+
+    def get_long_message_path(self, long_message_type: LongMessageType) -> Optional[str]:
+        """
+        Returns the path of a stored message, or None if the message is not stored in a file.
+
+        Large messages should be read using the path, instead of loading them into memory.
+        """
+        storage = self._get_storage(long_message_type)
+        return storage.path(long_message_type.filename)
+
 
 class LongMessageHandlerStatus(Enum):
     STATUS_IDLE = 0
@@ -216,7 +531,7 @@ class LongMessageHandler:
         return LongMessageStatusInfo(
             LongMessageStatus.UPLOAD,
             hexdigest2bytes(self._current_message.md5),
-            len(self._current_message.data),
+            self._current_message.length,
         )
 
     def select_long_message_type(self, raw_long_message_type: int):
@@ -226,7 +541,10 @@ class LongMessageHandler:
             raise LongMessageError("Invalid long message type") from e
 
         if self._status == LongMessageHandlerStatus.STATUS_WRITE:
+            assert self._current_message is not None
             self.on_upload_finished.trigger(self._current_message)
+            # the connection may have been lost, allow resuming the upload
+            self._current_message.suspend()
 
         self._log(f"select_long_message_type: {long_message_type.name}")
 
@@ -235,11 +553,13 @@ class LongMessageHandler:
 
         self._current_message = None
 
-    def init_transfer(self, md5: str, size: int = 0):
+    def init_transfer(self, md5: str, size: int = 0, compressed: bool = False):
         self._log("init_transfer")
 
         if self._status == LongMessageHandlerStatus.STATUS_WRITE:
+            assert self._current_message is not None
             self.on_upload_finished.trigger(self._current_message)
+            self._current_message.discard()
 
         if self._status == LongMessageHandlerStatus.STATUS_IDLE:
             raise LongMessageError(
@@ -248,12 +568,67 @@ class LongMessageHandler:
 
         assert self._long_message_type is not None
 
+        try:
+            sink = self._long_message_storage.open_long_message(self._long_message_type)
+        except StorageError as e:
+            raise LongMessageError("Can not store long message") from e
+
         self._status = LongMessageHandlerStatus.STATUS_WRITE
-        self._current_message = ReceivedLongMessage(self._long_message_type, md5, size)
+        self._current_message = ReceivedLongMessage(
+            self._long_message_type, md5, size, sink, compressed
+        )
 
         self.on_upload_started.trigger(self._current_message)
 
-    def upload_message(self, data: bytes):
+    def resume_transfer(self, md5: str, size: int = 0, compressed: bool = False):
+        """
+        Continues an interrupted upload of the message with the given checksum.
+
+        Starts a new upload if there is nothing to resume. Read the status to get the offset where
+        the upload should continue. Compressed uploads can only be resumed while the message type
+        is not changed.
+        """
+        self._log("resume_transfer")
+
+        if self._status == LongMessageHandlerStatus.STATUS_IDLE:
+            raise LongMessageError(
+                "resume-transfer needs to be called after select_long_message_type"
+            )
+
+        assert self._long_message_type is not None
+
+        current = self._current_message
+        if (
+            self._status == LongMessageHandlerStatus.STATUS_WRITE
+            and current is not None
+            and current.md5 == md5
+            and current.compressed == compressed
+        ):
+            self._log(f"Resuming upload at {current.length}")
+            return
+
+        message = None
+        if not compressed:
+            message = self._long_message_storage.resume_long_message(
+                self._long_message_type, md5, size
+            )
+        if message is None:
+            self.init_transfer(md5, size, compressed)
+            return
+
+        if self._status == LongMessageHandlerStatus.STATUS_WRITE:
+            assert current is not None
+            self.on_upload_finished.trigger(current)
+            current.discard()
+
+        self._log(f"Resuming suspended upload at {message.length}")
+        self._status = LongMessageHandlerStatus.STATUS_WRITE
+        self._current_message = message
+
+        self.on_upload_started.trigger(self._current_message)
+
+    def upload_message(self, data: bytes, offset: Optional[int] = None):
+        """Receives a chunk of the message. Without an offset, the chunk is appended to the data."""
         self._log(f"upload_message ({len(data)} bytes)")
 
         if self._status != LongMessageHandlerStatus.STATUS_WRITE:
@@ -261,7 +636,10 @@ class LongMessageHandler:
 
         assert self._current_message is not None
 
-        self._current_message.append_data(data)
+        if offset is None:
+            self._current_message.append_data(data)
+        else:
+            self._current_message.write_data(offset, data)
         self.on_upload_progress.trigger(self._current_message)
 
     def finalize_message(self) -> None:
@@ -276,27 +654,28 @@ class LongMessageHandler:
             # observer must take care of verifying that there is actually a message
             if self._current_message is None:
                 assert self._long_message_type is not None
-                # load the stored message contents
-                message = self._long_message_storage.get_long_message(self._long_message_type)
+                # the contents are read from the storage by the observer, when needed
                 info = self._long_message_storage.read_status(self._long_message_type)
                 self._current_message = ReceivedLongMessage(
                     self._long_message_type, bytes2hexdigest(info.md5), info.length
                 )
-                self._current_message.append_data(message)
+                self._current_message.length = info.length
 
             self.on_message_updated.trigger(self._current_message)
 
         elif self._status == LongMessageHandlerStatus.STATUS_WRITE:
-            self.on_upload_finished.trigger(self._current_message)
-
             assert self._current_message is not None
 
+            self._current_message.finish()
+            self.on_upload_finished.trigger(self._current_message)
+
             if self._current_message.is_valid:
                 self._long_message_storage.set_long_message(self._current_message)
                 self.on_message_updated.trigger(self._current_message)
                 self._status = LongMessageHandlerStatus.STATUS_READ
             else:
                 self._log("read_status_invalid!")
+                self._current_message.discard()
                 self._status = LongMessageHandlerStatus.STATUS_INVALID
 
         else:
@@ -342,15 +721,23 @@ class LongMessageProtocol:
             else:
                 result = LongMessageProtocolResult.RESULT_INVALID_ATTRIBUTE_LENGTH
 
-        elif header == MessageType.INIT_TRANSFER:
-            if len(data) == 16:
-                self._handler.init_transfer(bytes2hexdigest(data), 0)
-                result = LongMessageProtocolResult.RESULT_SUCCESS
-            elif len(data) == 20:
-                self._handler.init_transfer(
-                    bytes2hexdigest(data[0:16]), int.from_bytes(data[16:20], byteorder="big")
-                )
-                result = LongMessageProtocolResult.RESULT_SUCCESS
+        elif header in (MessageType.INIT_TRANSFER, MessageType.RESUME_TRANSFER):
+            start = (
+                self._handler.init_transfer
+                if header == MessageType.INIT_TRANSFER
+                else self._handler.resume_transfer
+            )
+            # 16 byte md5, optionally followed by a 4 byte big endian size and a flags byte
+            if len(data) in (16, 20, 21):
+                md5 = bytes2hexdigest(data[0:16])
+                size = int.from_bytes(data[16:20], byteorder="big")
+                flags = data[20] if len(data) == 21 else 0
+                if flags & ~TRANSFER_FLAG_ZLIB:
+                    self.log(f"Unsupported transfer flags: {flags}", LogLevel.ERROR)
+                    result = LongMessageProtocolResult.RESULT_UNLIKELY_ERROR
+                else:
+                    start(md5, size, bool(flags & TRANSFER_FLAG_ZLIB))
+                    result = LongMessageProtocolResult.RESULT_SUCCESS
             else:
                 result = LongMessageProtocolResult.RESULT_INVALID_ATTRIBUTE_LENGTH
 
@@ -361,6 +748,15 @@ class LongMessageProtocol:
             else:
                 result = LongMessageProtocolResult.RESULT_INVALID_ATTRIBUTE_LENGTH
 
+        elif header == MessageType.UPLOAD_MESSAGE_AT_OFFSET:
+            # 4 byte big endian offset, followed by the data
+            if len(data) > 4:
+                offset = int.from_bytes(data[0:4], byteorder="big")
+                self._handler.upload_message(data[4:], offset)
+                result = LongMessageProtocolResult.RESULT_SUCCESS
+            else:
+                result = LongMessageProtocolResult.RESULT_INVALID_ATTRIBUTE_LENGTH
+
         elif header == MessageType.FINALIZE_MESSAGE:
             if len(data) == 0:
                 self._handler.finalize_message()
@@ -374,38 +770,52 @@ class LongMessageProtocol:
         return result
 
 
-def extract_asset_longmessage(storage: LongMessageStorage, asset_dir: str):
+# the assets may be extracted at startup and after an upload at the same time
+_asset_extraction_lock = threading.Lock()
+
+
+def extract_asset_longmessage(
+    storage: LongMessageStorage, asset_dir: str, on_updated: Optional[Callable[[], None]] = None
+):
     """
     Extract the ASSET_DATA long message into a folder.
 
     After successfully extracting, store the checksum of the asset message in the .hash file.
     Skip extracting if the long message has the same checksum as stored in the folder.
-    The folder will be deleted if exists before decompression.
+    Only the files that changed since the previous extraction are written, see sync_tar_archive.
 
     @param storage: the source where the asset data message is stored
     @param asset_dir: the destination directory
+    @param on_updated: called when the contents of the folder changed
     """
 
-    asset_status = storage.read_status(LongMessageType.ASSET_DATA)
+    with _asset_extraction_lock:
+        asset_status = storage.read_status(LongMessageType.ASSET_DATA)
+        if asset_status.status != LongMessageStatus.READY:
+            return
 
-    if asset_status.status == LongMessageStatus.READY:
         with suppress(Exception):
-            with open(os.path.join(asset_dir, ".hash"), "r") as asset_hash_file:
+            with open(os.path.join(asset_dir, HASH_FILE), "r") as asset_hash_file:
                 stored_hash = hexdigest2bytes(asset_hash_file.read())
 
             if stored_hash == asset_status.md5:
                 return
 
-        if os.path.isdir(asset_dir):
-            shutil.rmtree(asset_dir)
-
-        message_data = storage.get_long_message(LongMessageType.ASSET_DATA)
-        with tarfile.open(fileobj=io.BytesIO(message_data), mode="r|gz") as tar:
-            tar.extractall(path=asset_dir)
+        message_path = storage.get_long_message_path(LongMessageType.ASSET_DATA)
+        if message_path:
+            # stream the archive from the disk instead of loading it into memory
+            with open(message_path, "rb") as archive:
+                result = sync_tar_archive(archive, asset_dir)
+        else:
+            message_data = storage.get_long_message(LongMessageType.ASSET_DATA)
+            result = sync_tar_archive(io.BytesIO(message_data), asset_dir)
 
-        with open(os.path.join(asset_dir, ".hash"), "w") as asset_hash_file:
+        with open(os.path.join(asset_dir, HASH_FILE), "w") as asset_hash_file:
             asset_hash_file.write(bytes2hexdigest(asset_status.md5))
 
+        if result.changed and on_updated:
+            on_updated()
+
 
 # Moved from main file, cleanup pending.
 class LongMessageImplementation:
@@ -440,7 +850,7 @@ class LongMessageImplementation:
             if message.total_chunks == 0:
                 # calculate approximate chunk count
                 expected_size = 250000
-                chunk_size = len(message.data) / message.received_chunks
+                chunk_size = message.length / message.received_chunks
                 message.total_chunks = ceil(expected_size / chunk_size)
                 self._progress.end = message.total_chunks
 
@@ -490,7 +900,7 @@ class LongMessageImplementation:
 
         if message_type == LongMessageType.TEST_KIT:
 
-            test_script_source = message.data.decode()
+            test_script_source = self._storage.get_long_message(message_type).decode()
             self._log(f"Running test script: \n{test_script_source}")
 
             script_descriptor = ScriptDescriptor.from_string("test_kit", test_script_source, 0)
@@ -518,10 +928,8 @@ class LongMessageImplementation:
         # background scripts, then starting the remote!
         # Start the remote after!
         if message_type == LongMessageType.CONFIGURATION_DATA:
-            message_data = message.data.decode()
-
             try:
-                parsed_config = RobotConfig.from_string(message_data)
+                parsed_config = self._storage.get_configuration(message.md5)
                 self._robot_manager.robot_configure(parsed_config)
             except ConfigError:
                 self._log(traceback.format_exc())
@@ -540,6 +948,8 @@ class LongMessageImplementation:
             timer.start()
 
         elif message_type == LongMessageType.ASSET_DATA:
-            extract_asset_longmessage(self._storage, self._asset_dir)
+            extract_asset_longmessage(
+                self._storage, self._asset_dir, self._robot_manager.robot.sound.reload_assets
+            )
 
         self._log(f"Message {message_type.name} updated")
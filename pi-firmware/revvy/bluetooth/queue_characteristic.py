@@ -5,13 +5,18 @@
 
    Requires the mobile side to update the content of the attribute
    to OK when received a new message.
+
+   The queue is bounded, see MessageQueue for how messages are coalesced
+   and dropped when the mobile can not keep up.
 """
 
-from functools import partial
-from typing import Callable, Optional
+import time
+from threading import Lock
+from typing import Callable, Hashable, NamedTuple, Optional
 from pybleno import Characteristic, Descriptor
 
 from revvy.utils.logger import get_logger
+from revvy.utils.message_queue import PRIORITY_NORMAL, MessageQueue, MessageQueueStats
 
 # When the queue ends but the mobile reads, we send this token to the mobile
 # to indicate that the queue is empty.
@@ -23,10 +28,22 @@ CONFIRM_TOKEN = b"OK"
 log = get_logger("BLE Queue")
 
 
+class QueueCharacteristicStats(NamedTuple):
+    queue: MessageQueueStats
+
+    sent: int
+    """Number of messages confirmed by the mobile"""
+
+    last_confirm_latency: float
+    """Seconds between sending the last message and its confirmation"""
+
+    max_confirm_latency: float
+
+
 class QueueCharacteristic(Characteristic):
     """Makes sure the proper sending speed is ok by managing a queue of messages."""
 
-    def __init__(self, uuid: str, description: bytes):
+    def __init__(self, uuid: str, description: bytes, max_queue_size: int = 16):
         super().__init__(
             {
                 "uuid": uuid,
@@ -39,17 +56,37 @@ class QueueCharacteristic(Characteristic):
 
         self._on_ready_callback: Optional[Callable] = None
         self._value = END_TOKEN
-        self._queue = []
+        self._queue: MessageQueue[bytes] = MessageQueue(max_queue_size)
+        self._lock = Lock()
 
         self.is_sending = False
 
+        self._sent_at = 0.0
+        self._sent = 0
+        self._last_confirm_latency = 0.0
+        self._max_confirm_latency = 0.0
+
+    @property
+    def stats(self) -> QueueCharacteristicStats:
+        return QueueCharacteristicStats(
+            self._queue.stats, self._sent, self._last_confirm_latency, self._max_confirm_latency
+        )
+
     def onWriteRequest(self, data, offset, withoutResponse, callback) -> None:
         """Mobile sends a confirmation that it got the latest pocket by overwriting the value to confirm."""
         if data == CONFIRM_TOKEN:
-            self.is_sending = False
-            on_ready_callback = self._on_ready_callback
+            with self._lock:
+                if self.is_sending:
+                    self._sent += 1
+                    self._last_confirm_latency = time.monotonic() - self._sent_at
+                    self._max_confirm_latency = max(
+                        self._max_confirm_latency, self._last_confirm_latency
+                    )
+                self.is_sending = False
+                on_ready_callback, self._on_ready_callback = self._on_ready_callback, None
             if on_ready_callback:
                 on_ready_callback()
+            self._process_queue()
         callback(Characteristic.RESULT_SUCCESS)
 
     def onReadRequest(self, offset, callback) -> None:
@@ -63,8 +100,6 @@ class QueueCharacteristic(Characteristic):
 
         log(f"Sending: {value}")
 
-        self.is_sending = True
-
         self._on_ready_callback = on_ready_callback
 
         # Notify the pybleno lib that the value has changed.
@@ -73,22 +108,35 @@ class QueueCharacteristic(Characteristic):
         if on_value_update_notify_pybleno:
             on_value_update_notify_pybleno(value)
 
-    def _on_one_ready(self, on_ready_callback: Callable):
-        if on_ready_callback:
-            on_ready_callback()
-        self._process_queue()
-
     def _process_queue(self) -> None:
-        if len(self._queue) > 0:
-            if not self.is_sending:
-                (next_value, on_ready_callback) = self._queue.pop()
-                self._send(next_value, partial(self._on_one_ready, on_ready_callback))
-        else:
-            self._send(END_TOKEN)
+        with self._lock:
+            if self.is_sending:
+                return
+
+            message = self._queue.get()
+            if message is None:
+                if self._value == END_TOKEN:
+                    return
+                self._send(END_TOKEN)
+                return
+
+            self.is_sending = True
+            self._sent_at = time.monotonic()
+            self._send(message.value, message.on_done)
 
     def sendQueued(
-        self, value: bytes, on_ready_callback: Optional[Callable[[], None]] = None
+        self,
+        value: bytes,
+        on_ready_callback: Optional[Callable[[], None]] = None,
+        key: Optional[Hashable] = None,
+        priority: int = PRIORITY_NORMAL,
     ) -> None:
-        """Send packet to the mobile."""
-        self._queue.append((value, on_ready_callback))
+        """
+        Send packet to the mobile.
+
+        A queued packet with the same `key` is replaced by this one. Packets with a lower
+        `priority` value are sent first.
+        """
+        if not self._queue.put(value, on_ready_callback, key, priority):
+            log("Queue is full, message dropped")
         self._process_queue()
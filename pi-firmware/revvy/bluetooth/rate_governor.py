@@ -0,0 +1,124 @@
+"""
+Adapts the rate of BLE notifications to what the connection can carry.
+
+Notifications are queued by the Bluetooth stack. When the link degrades, the queue grows, and
+everything sent over the link (including the responses to the control messages of the mobile)
+arrives late. The governor measures
+- how much time is spent handing notifications to the Bluetooth stack (it blocks when its
+  buffers are full),
+- the gaps between the control messages written by the mobile,
+and lowers the rate of the telemetry notifications while the link looks congested. The rate is
+raised again slowly when the link recovers, so the control messages get priority.
+"""
+
+import time
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from revvy.utils.logger import get_logger
+from revvy.utils.observable import ThrottleGroup
+
+log = get_logger("NotificationRateGovernor")
+
+
+class GovernorStats(NamedTuple):
+    notifications: int
+    """Number of notifications in the last measurement window"""
+
+    notify_busy: float
+    """Share of the last measurement window spent sending notifications"""
+
+    max_control_gap: float
+    """Longest time between control messages in the last measurement window, in seconds"""
+
+    scale: float
+    """Current multiplier of the telemetry throttle intervals"""
+
+
+class NotificationRateGovernor:
+    def __init__(
+        self,
+        throttle: ThrottleGroup,
+        window: float = 1.0,
+        max_notify_busy: float = 0.1,
+        max_control_gap: float = 0.3,
+        max_scale: float = 8.0,
+    ):
+        self._throttle = throttle
+        self._window = window
+        self._max_notify_busy = max_notify_busy
+        self._max_control_gap = max_control_gap
+        self._max_scale = max_scale
+
+        self._lock = Lock()
+        self._window_start = time.monotonic()
+        self._notifications = 0
+        self._notify_time = 0.0
+        self._last_control_message: Optional[float] = None
+        self._control_gap = 0.0
+
+        self._stats = GovernorStats(0, 0.0, 0.0, throttle.scale)
+
+    @property
+    def scale(self) -> float:
+        """Multiplier of the intervals between telemetry notifications."""
+        return self._throttle.scale
+
+    @property
+    def stats(self) -> GovernorStats:
+        return self._stats
+
+    def record_notify(self, duration: float) -> None:
+        """Called after a notification was handed to the Bluetooth stack."""
+        with self._lock:
+            self._notifications += 1
+            self._notify_time += duration
+
+    def record_control_message(self) -> None:
+        """Called when a control message arrives from the mobile."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_control_message is not None:
+                gap = now - self._last_control_message
+                # longer pauses mean that the mobile stopped sending control messages for a while
+                if gap <= self._window:
+                    self._control_gap = max(self._control_gap, gap)
+            self._last_control_message = now
+
+    def reset(self) -> None:
+        """Forget the measurements, e.g. when a new connection is made."""
+        with self._lock:
+            self._last_control_message = None
+            self._control_gap = 0.0
+        self._throttle.scale = 1.0
+
+    def update(self, *args) -> None:
+        """Evaluates the measurements at the end of each window. Call it periodically."""
+        now = time.monotonic()
+        with self._lock:
+            elapsed = now - self._window_start
+            if elapsed < self._window:
+                return
+
+            notify_busy = self._notify_time / elapsed
+            control_gap = self._control_gap
+
+            self._window_start = now
+            notifications = self._notifications
+            self._notifications = 0
+            self._notify_time = 0.0
+            self._control_gap = 0.0
+
+        congested = notify_busy > self._max_notify_busy or control_gap > self._max_control_gap
+
+        scale = self._throttle.scale
+        if congested:
+            new_scale = min(scale * 2, self._max_scale)
+        else:
+            new_scale = max(scale - 0.5, 1.0)
+
+        if new_scale != scale:
+            log(f"Notification interval scale: {new_scale} (busy: {notify_busy:.0%})")
+            self._throttle.scale = new_scale
+
+        self._stats = GovernorStats(notifications, notify_busy, control_gap, new_scale)
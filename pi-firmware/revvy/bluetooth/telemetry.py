@@ -0,0 +1,145 @@
+"""
+Combined live telemetry frames.
+
+Instead of notifying every value on its own characteristic, the values can be collected and sent
+in a single notification, at a rate requested by the mobile. A frame only contains the values
+that changed since the previous frame. Every `keyframe_interval`th frame contains every known
+value, so that a lost notification is corrected.
+
+Frame format (little endian):
+    offset  size  content
+    0       1     version, currently TELEMETRY_VERSION
+    1       1     flags, see FLAG_KEYFRAME
+    2       1     sequence number, wraps around at 255
+    3       2     bitmask of the fields in the frame, bit n is TelemetryField(n)
+    5       ...   for each field in the mask in increasing order: 1 byte length + field data
+
+Fields are encoded the same way as on their own characteristics.
+
+A frame is never longer than the notification size of the BLE link (`max_frame_size`). Fields
+that don't fit are sent in the next frames. A keyframe that had to be split is not flagged as a
+keyframe, its remaining fields follow in the next frames. Values that can't fit into a frame even
+on their own are not sent in frames at all, see `TelemetryFrameEncoder.update`.
+"""
+
+from enum import IntEnum
+import struct
+from threading import Lock
+from typing import Optional
+
+TELEMETRY_VERSION = 1
+
+FLAG_KEYFRAME = 0x01
+
+HEADER = struct.Struct("<BBBH")
+
+# The ATT MTU every BLE device supports is 23 bytes, 3 of which are taken by the notification
+DEFAULT_MAX_FRAME_SIZE = 20
+
+
+class TelemetryField(IntEnum):
+    SENSOR_1 = 0
+    SENSOR_2 = 1
+    SENSOR_3 = 2
+    SENSOR_4 = 3
+    ORIENTATION = 4
+    SCRIPT_VARIABLES = 5
+    TIMER = 6
+    PROGRAM_STATUS = 7
+
+
+class TelemetryFrameEncoder:
+    """Collects the latest value of each field and encodes the changes into frames."""
+
+    def __init__(self, keyframe_interval: int = 50, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE):
+        self._keyframe_interval = keyframe_interval
+        self.max_frame_size = max_frame_size
+        self._lock = Lock()
+        self._values: dict[TelemetryField, bytes] = {}
+        self._changed = 0
+        self._sequence = 0
+        self._frames_since_keyframe = 0
+        self._keyframe_requested = True
+
+    def fits(self, value: bytes) -> bool:
+        """True if the value can be sent in a frame on its own."""
+        return HEADER.size + 1 + len(value) <= self.max_frame_size
+
+    def update(self, field: TelemetryField, value: bytes) -> bool:
+        """
+        Stores the latest value of a field. Returns False if the value is too long to be sent in a
+        frame, the caller needs to send it in some other way.
+        """
+        assert len(value) <= 255
+        with self._lock:
+            if not self.fits(value):
+                self._forget(field)
+                return False
+
+            if self._values.get(field) != value:
+                self._values[field] = value
+                self._changed |= 1 << field
+
+            return True
+
+    def _forget(self, field: TelemetryField) -> None:
+        self._values.pop(field, None)
+        self._changed &= ~(1 << field)
+
+    def request_keyframe(self) -> None:
+        """The next frame will contain every known value."""
+        with self._lock:
+            self._keyframe_requested = True
+
+    def reset(self) -> None:
+        """Forget the known values, e.g. at the start of a new session."""
+        with self._lock:
+            self._values.clear()
+            self._changed = 0
+            self._keyframe_requested = True
+
+    def encode(self) -> Optional[bytes]:
+        """
+        Returns the next frame, or None if nothing has changed since the last one. Fields that don't
+        fit into the frame are left for the next one.
+        """
+        with self._lock:
+            keyframe = (
+                self._keyframe_requested or self._frames_since_keyframe >= self._keyframe_interval
+            )
+            if keyframe:
+                pending = 0
+                for field in self._values:
+                    pending |= 1 << field
+            else:
+                pending = self._changed
+
+            if pending == 0 and not keyframe:
+                return None
+
+            frame = bytearray(HEADER.size)
+            mask = 0
+            for field in TelemetryField:
+                if pending & (1 << field):
+                    value = self._values[field]
+                    if not self.fits(value):
+                        # the frame size decreased since the value was stored
+                        self._forget(field)
+                        pending &= ~(1 << field)
+                    elif len(frame) + 1 + len(value) <= self.max_frame_size:
+                        frame.append(len(value))
+                        frame += value
+                        mask |= 1 << field
+
+            self._changed = pending & ~mask
+            flags = FLAG_KEYFRAME if keyframe and self._changed == 0 else 0
+            HEADER.pack_into(frame, 0, TELEMETRY_VERSION, flags, self._sequence, mask)
+
+            self._sequence = (self._sequence + 1) & 0xFF
+            if keyframe:
+                self._keyframe_requested = False
+                self._frames_since_keyframe = 0
+            else:
+                self._frames_since_keyframe += 1
+
+            return bytes(frame)
@@ -3,8 +3,8 @@ from revvy.utils.logger import get_logger, LogLevel
 # ignore reason: raspberry-specific import
 from smbus2 import i2c_msg, SMBus  # pyright: ignore[reportMissingImports]
 
-from revvy.mcu.rrrc_control import RevvyTransportBase, RevvyControl, BootloaderControl
-from revvy.mcu.rrrc_transport import RevvyTransportInterface, RevvyTransport, TransportException
+from revvy.mcu.rrrc_control import DeviceTransportBase
+from revvy.mcu.rrrc_transport import RevvyTransportInterface, TransportException
 
 
 class RevvyTransportI2CDevice(RevvyTransportInterface):
@@ -43,23 +43,17 @@ class RevvyTransportI2CDevice(RevvyTransportInterface):
             raise ex
 
 
-class RevvyTransportI2C(RevvyTransportBase):
-    BOOTLOADER_I2C_ADDRESS = 0x2B
-    ROBOT_I2C_ADDRESS = 0x2D
+class RevvyTransportI2C(DeviceTransportBase):
+    BOOTLOADER_I2C_ADDRESS = DeviceTransportBase.BOOTLOADER_ADDRESS
+    ROBOT_I2C_ADDRESS = DeviceTransportBase.APPLICATION_ADDRESS
 
     def __init__(self, bus: int):
         self.log = get_logger(f"rrrc_transport_i2c bus")
         self.log(f"Opening I2C bus: {bus}", LogLevel.DEBUG)
         self._bus = SMBus(bus)
 
-    def _bind(self, address: int) -> RevvyTransport:
-        return RevvyTransport(RevvyTransportI2CDevice(address, self))
-
-    def create_bootloader_control(self) -> BootloaderControl:
-        return BootloaderControl(self._bind(self.BOOTLOADER_I2C_ADDRESS))
-
-    def create_application_control(self) -> RevvyControl:
-        return RevvyControl(self._bind(self.ROBOT_I2C_ADDRESS))
+    def create_device(self, address: int) -> RevvyTransportI2CDevice:
+        return RevvyTransportI2CDevice(address, self)
 
     def __del__(self) -> None:
         self.log("Closing I2C bus", LogLevel.DEBUG)
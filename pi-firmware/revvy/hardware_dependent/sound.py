@@ -111,3 +111,19 @@ class SoundControlV2(SoundControlBase):
 
     def _disable_amp(self) -> None:
         self._run_command(["gpio", "write", "3", "1"]).wait()
+
+
+class SoundControlNull(SoundControlBase):
+    """Plays nothing. Used to run the robot on machines without the sound hardware."""
+
+    def _init_amp(self) -> None:
+        pass
+
+    def _play_sound(self, sound: str, cb: Callable) -> Thread:
+        return self._run_command_with_callback([], cb)
+
+    def _disable_amp(self) -> None:
+        pass
+
+    def set_volume(self, volume: int):
+        pass
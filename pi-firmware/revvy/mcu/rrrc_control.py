@@ -1,5 +1,5 @@
 from revvy.mcu.commands import *
-from revvy.mcu.rrrc_transport import RevvyTransport
+from revvy.mcu.rrrc_transport import RevvyTransport, RevvyTransportInterface
 
 
 class RevvyTransportBase(ABC):
@@ -12,6 +12,23 @@ class RevvyTransportBase(ABC):
         pass
 
 
+class DeviceTransportBase(RevvyTransportBase):
+    """A transport that reaches the bootloader and the application at different device addresses"""
+
+    BOOTLOADER_ADDRESS = 0x2B
+    APPLICATION_ADDRESS = 0x2D
+
+    @abstractmethod
+    def create_device(self, address: int) -> RevvyTransportInterface:
+        pass
+
+    def create_bootloader_control(self) -> "BootloaderControl":
+        return BootloaderControl(RevvyTransport(self.create_device(self.BOOTLOADER_ADDRESS)))
+
+    def create_application_control(self) -> "RevvyControl":
+        return RevvyControl(RevvyTransport(self.create_device(self.APPLICATION_ADDRESS)))
+
+
 class BootloaderControl:
     def __init__(self, transport: RevvyTransport):
         # These commands map to mcu-bootloader/rrrc/runtime/comm_handlers.c
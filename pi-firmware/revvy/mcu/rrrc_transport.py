@@ -6,6 +6,7 @@ from threading import Lock
 import time
 from typing import NamedTuple
 
+from revvy.utils.binary_log import get_binary_logger
 from revvy.utils.functions import retry
 from revvy.utils.logger import LogLevel, get_logger
 from revvy.utils.stopwatch import Stopwatch
@@ -414,6 +415,7 @@ class RevvyTransport:
         self._transport = transport
         self._stopwatch = Stopwatch()
         self.log = get_logger("rrrc_transport")
+        self.trace = get_binary_logger("[rrrc_transport]")
 
     def send_command(
         self, command: int, payload: bytes = b"", exec_timeout: float = 5.0
@@ -480,11 +482,13 @@ class RevvyTransport:
                 break
             except Exception as e:
                 exception = e
+                self.trace("header read failed, attempt %d", i)
                 # if we're struggling to read the header, allow some time for the MCU to catch up.
                 if i > self.retry_sleep_threshold:
                     time.sleep(0.01)
 
         if not response_header:
+            self.trace("header read failed, retry limit reached", level=LogLevel.ERROR)
             self.log("Error reading response header: retry limit reached!", LogLevel.ERROR)
             raise BrokenPipeError(f"Read response header error: {exception}")
 
@@ -528,6 +532,7 @@ class RevvyTransport:
         payload = retry(_read_payload_once, self.retry)
 
         if not payload:
+            self.trace("payload read failed, %d bytes", header.payload_length, level=LogLevel.ERROR)
             self.log("Error reading response payload: retry limit reached!", LogLevel.ERROR)
             raise BrokenPipeError("Read payload: Retry limit reached")
 
@@ -559,11 +564,17 @@ class RevvyTransport:
                     response = self._read_response()
                     # Busy means the MCU is not ready for this command yet and we should retry later.
                     if response.status == ResponseStatus.Busy:
+                        self.trace("command 0x%02X: busy", command[1])
                         continue  # retry reading the header
                     elif (
                         response.status == ResponseStatus.Error_CommandIntegrityError
                         or response.status == ResponseStatus.Error_PayloadIntegrityError
                     ):
+                        self.trace(
+                            "command 0x%02X: status %d, resending",
+                            command[1],
+                            response.status.value,
+                        )
                         resend_command = True
                         break  # exit reading loop to retry sending the command
                     else:
@@ -572,4 +583,5 @@ class RevvyTransport:
                             self.log(f"response.status: {response.status}", LogLevel.DEBUG)
 
                         return response
+        self.trace("command 0x%02X: timeout", command[1], level=LogLevel.ERROR)
         raise TimeoutError
@@ -0,0 +1,742 @@
+"""
+Software model of the MCU firmware, to run the Python side of the robot without hardware.
+
+SimulatedMcu implements the command set of mcu-firmware/rrrc/runtime/comm_handlers.c that
+RevvyControl uses, on the same frame format as the real MCU: command header and payload checksums,
+Start/GetResult operations and status codes. Motors are simulated by a simple DC motor and encoder
+model, driven by the power, speed and position requests of the DcMotor library.
+
+SimulatorTransport plugs the model in place of the I2C transport. It can add processing latency,
+Busy responses, Pending results of the asynchronous commands and bit errors, to test the
+retry logic of RevvyTransport and the timing sensitive parts of the robot under bad conditions.
+Like on the MCU, a command with a corrupted length field is answered with PayloadLengthError.
+"""
+
+import binascii
+import random
+import struct
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from revvy.mcu.rrrc_control import DeviceTransportBase
+from revvy.mcu.rrrc_transport import (
+    Command,
+    ResponseStatus,
+    RevvyTransportInterface,
+    TransportException,
+    crc7,
+    response_header,
+)
+from revvy.robot.mcu_error import ErrorType
+from revvy.robot.status_updater import StatusSlot
+from revvy.utils.functions import clip
+
+CommandResult = tuple[ResponseStatus, bytes]
+CommandHandler = Callable[[bytes], CommandResult]
+
+# op, command, payload length, payload checksum, header checksum
+_command_header = struct.Struct("<BBBHB")
+
+# status, power, pos, speed, current task, see BaseDcMotorDriver.update_status
+_motor_status = struct.Struct("<bblfB")
+
+# error id, hardware version, firmware version, data
+_error_entry = struct.Struct("<BII54s")
+
+_float = struct.Struct("<f")
+_pos = struct.Struct("<l")
+
+MOTOR_CONFIG_SIZE = 81
+MOTOR_CONTROL_CYCLE = 0.01  # [s] the DcMotor library runs every 10ms
+
+REQUEST_POWER = 0
+REQUEST_SPEED = 1
+REQUEST_POSITION = 2
+REQUEST_POSITION_RELATIVE = 3
+
+MOTOR_STATUS_NORMAL = 0
+MOTOR_STATUS_BLOCKED = 1
+MOTOR_STATUS_GOAL_REACHED = 2
+
+STATUS_SLOT_RESET_DATA = b"\x5a"
+
+
+def create_response(status: ResponseStatus, payload: bytes = b"") -> bytes:
+    """
+    Builds a response frame, the same way as Comm_Protect in the MCU firmware.
+
+    >>> create_response(ResponseStatus.Busy)
+    b'\\x01\\x00\\xff\\xffv'
+    """
+    header = response_header.pack(status.value, len(payload), binascii.crc_hqx(payload, 0xFFFF))
+    return header + bytes([crc7(header)]) + payload
+
+
+def encode_string_list(names: tuple[str, ...]) -> bytes:
+    """
+    Encodes names the way the MCU reports the port types. Empty names are skipped.
+
+    >>> encode_string_list(("NotConfigured", "", "DcMotor"))
+    b'\\x00\\rNotConfigured\\x02\\x07DcMotor'
+    """
+    data = bytearray()
+    for idx, name in enumerate(names):
+        if name:
+            encoded = name.encode("utf-8")
+            data += bytes([idx, len(encoded)]) + encoded
+    return bytes(data)
+
+
+class SimulatedMotor:
+    """
+    A DC motor with an encoder, and the control modes of the DcMotor library.
+
+    The motor speed follows the requested power with a first order lag. The controllers are
+    simplified versions of the ones on the MCU, they ignore the PID parameters of the
+    configuration.
+    """
+
+    MAX_SPEED = 150.0  # [rpm] at full power, without load
+    TIME_CONSTANT = 0.05  # [s]
+    SPEED_GAIN = 0.5  # [%/rpm]
+    POSITION_GAIN = 4.0  # [rpm/degree]
+    POSITION_TOLERANCE = 1.0  # [degrees]
+    BLOCKED_TIMEOUT = 0.5  # [s]
+
+    def __init__(self) -> None:
+        self.configured = False
+        self.blocked = False
+        """Set to simulate a stalled motor"""
+
+        self._last_version = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.pos = 0.0  # [degrees]
+        self.speed = 0.0  # [rpm]
+        self.power = 0  # [%]
+        self.status = MOTOR_STATUS_NORMAL
+        self.version = self._last_version
+        self._request = REQUEST_POWER
+        self._target = 0.0
+        self._speed_limit: Optional[float] = None
+        self._power_limit: Optional[float] = None
+        self._blocked_time = 0.0
+
+    def configure(self, config: bytes) -> bool:
+        if len(config) < MOTOR_CONFIG_SIZE or (len(config) - MOTOR_CONFIG_SIZE) % 8 != 0:
+            return False
+
+        self.configured = True
+        self.reset()
+        return True
+
+    def deconfigure(self) -> None:
+        self.configured = False
+        self.reset()
+
+    def request(self, data: bytes) -> bool:
+        """Applies a drive request, in the format of MotorCommand. Returns False if invalid."""
+        if not self.configured or not data:
+            return False
+
+        self._last_version = (self._last_version + 1) & 0xFF
+
+        request_type, body = data[0], data[1:]
+        speed_limit = power_limit = None
+        if request_type == REQUEST_POWER:
+            if len(body) != 1:
+                return False
+            target = struct.unpack("b", body)[0]
+            if not -100 <= target <= 100:
+                return False
+
+        elif request_type == REQUEST_SPEED:
+            if len(body) == 4:
+                (target,) = _float.unpack(body)
+            elif len(body) == 8:
+                target, power_limit = struct.unpack("<2f", body)
+            else:
+                return False
+
+        elif request_type in (REQUEST_POSITION, REQUEST_POSITION_RELATIVE):
+            if len(body) == 4:
+                (target,) = _pos.unpack(body)
+            elif len(body) == 9:
+                target, limit_kind, limit = struct.unpack("<lbf", body)
+                if limit_kind == 0:
+                    power_limit = limit
+                elif limit_kind == 1:
+                    speed_limit = limit
+                else:
+                    return False
+            elif len(body) == 12:
+                target, speed_limit, power_limit = struct.unpack("<lff", body)
+            else:
+                return False
+
+            if request_type == REQUEST_POSITION_RELATIVE:
+                target += self.pos
+                request_type = REQUEST_POSITION
+        else:
+            return False
+
+        self._request = request_type
+        self._target = float(target)
+        self._speed_limit = speed_limit or None
+        self._power_limit = power_limit or None
+        self.version = self._last_version
+        self.status = MOTOR_STATUS_NORMAL
+        self._blocked_time = 0.0
+        return True
+
+    def step(self, dt: float) -> None:
+        """Advances the simulation by dt seconds"""
+        if not self.configured:
+            return
+
+        if self._request == REQUEST_POWER:
+            power = self._target
+        else:
+            if self._request == REQUEST_SPEED:
+                speed = self._target
+            else:
+                error = self._target - self.pos
+                if abs(error) < self.POSITION_TOLERANCE and abs(self.speed) < 1:
+                    self.status = MOTOR_STATUS_GOAL_REACHED
+
+                speed_limit = self._speed_limit or self.MAX_SPEED
+                speed = clip(error * self.POSITION_GAIN, -speed_limit, speed_limit)
+
+            power = speed / self.MAX_SPEED * 100 + (speed - self.speed) * self.SPEED_GAIN
+
+        power_limit = self._power_limit or 100
+        self.power = round(clip(power, -power_limit, power_limit))
+
+        if self.blocked:
+            self.speed = 0.0
+            if self.power != 0 and self.status != MOTOR_STATUS_GOAL_REACHED:
+                self._blocked_time += dt
+                if self._blocked_time >= self.BLOCKED_TIMEOUT:
+                    self.status = MOTOR_STATUS_BLOCKED
+        else:
+            self._blocked_time = 0.0
+            free_speed = self.power / 100 * self.MAX_SPEED
+            self.speed += (free_speed - self.speed) * min(1.0, dt / self.TIME_CONSTANT)
+
+        # rpm to degrees per second
+        self.pos += self.speed * 6 * dt
+
+    def __bytes__(self) -> bytes:
+        return _motor_status.pack(
+            self.status, self.power, round(self.pos), self.speed, self.version
+        )
+
+
+class SimulatorStats(NamedTuple):
+    commands: int
+    """Number of command frames the MCU received"""
+
+    busy_responses: int
+    """Number of reads answered with Busy"""
+
+    corrupted_frames: int
+    """Number of written or read frames with injected bit errors"""
+
+
+class SimulatedMcu:
+    """
+    The command handlers of the MCU firmware.
+
+    @param clock: time source of the motor simulation, in seconds
+    @param pending_polls: number of times the asynchronous commands answer GetResult with Pending
+    """
+
+    MOTOR_PORT_TYPES = ("NotConfigured", "DcMotor", "DcMotorEmulator")
+    SENSOR_PORT_TYPES = ("NotConfigured", "BumperSwitch", "HC_SR04", "RGB", "DebugRTC")
+    RING_LED_SCENARIOS = (
+        "RingLedOff",
+        "UserFrame",
+        "ColorWheel",
+        "RainbowFade",
+        "BusyRing",
+        "BreathingGreen",
+        "",
+        "",
+        "",
+    )
+
+    def __init__(
+        self,
+        motor_port_count: int = 6,
+        sensor_port_count: int = 4,
+        ring_led_count: int = 12,
+        hardware_version: str = "2.0.0",
+        firmware_version: str = "0.0.0",
+        clock: Callable[[], float] = time.monotonic,
+        pending_polls: int = 0,
+    ):
+        self.motors = [SimulatedMotor() for _ in range(motor_port_count)]
+        self.motor_port_types = [0] * motor_port_count
+        self.sensor_port_types = [0] * sensor_port_count
+        self.sensor_port_config: list[bytes] = [b""] * sensor_port_count
+        self.connected_sensors = set(range(sensor_port_count))
+
+        self.ring_led_count = ring_led_count
+        self.ring_led_scenario = 0
+        self.ring_led_frame: list[int] = [0] * ring_led_count
+
+        self.master_status = 0
+        self.bluetooth_status = 0
+        self.battery = bytes([0, 100, 1, 100])
+        self.errors: list[bytes] = []
+
+        self.hardware_version = hardware_version
+        self.firmware_version = firmware_version
+        self.pending_polls = pending_polls
+
+        self._clock = clock
+        self._last_update = clock()
+        self._remaining_time = 0.0
+
+        # slot data and version, and the version the host has seen
+        self._slots: dict[int, tuple[int, bytes]] = {}
+        self._read_versions: dict[int, int] = {}
+        self._enabled_slots: set[int] = set()
+        self._update_slot(StatusSlot.RESET, STATUS_SLOT_RESET_DATA)
+
+        # command id -> (remaining polls, result)
+        self._in_progress: dict[int, tuple[int, CommandResult]] = {}
+
+        self._handlers: dict[int, CommandHandler] = {
+            0x00: self._ping,
+            0x01: lambda payload: self._read_string(payload, self.hardware_version),
+            0x02: lambda payload: self._read_string(payload, self.firmware_version),
+            0x04: self._set_master_status,
+            0x05: self._set_bluetooth_status,
+            0x07: self._read_firmware_crc,
+            0x0B: self._ping,
+            0x10: lambda payload: self._read_byte(payload, len(self.motors)),
+            0x11: lambda payload: self._read_names(payload, self.MOTOR_PORT_TYPES),
+            0x12: self._set_motor_port_type,
+            0x13: self._set_motor_port_config,
+            0x14: self._set_motor_control,
+            0x15: self._test_motor_on_port,
+            0x20: lambda payload: self._read_byte(payload, len(self.sensor_port_types)),
+            0x21: lambda payload: self._read_names(payload, self.SENSOR_PORT_TYPES),
+            0x22: self._set_sensor_port_type,
+            0x23: self._set_sensor_port_config,
+            0x24: self._read_sensor_info,
+            0x25: self._test_sensor_on_port,
+            0x30: lambda payload: self._read_names(payload, self.RING_LED_SCENARIOS),
+            0x31: self._set_ring_led_scenario,
+            0x32: lambda payload: self._read_byte(payload, self.ring_led_count),
+            0x33: self._set_ring_led_frame,
+            0x3A: self._reset_status_slots,
+            0x3B: self._control_status_slot,
+            0x3C: self._read_status,
+            0x3D: self._read_error_count,
+            0x3E: self._read_errors,
+            0x3F: self._clear_errors,
+            0x40: self._store_test_error,
+            0x41: self._ping,
+        }
+        self._async_commands = frozenset([0x12, 0x13, 0x15, 0x22, 0x23, 0x25])
+
+    def handle(self, frame: bytes) -> bytes:
+        """Processes a command frame and returns the response frame"""
+        self.update()
+
+        if len(frame) < _command_header.size:
+            return create_response(ResponseStatus.Error_PayloadLengthError)
+
+        op, command, payload_length, payload_checksum, header_checksum = (
+            _command_header.unpack_from(frame)
+        )
+        payload = bytes(frame[_command_header.size :])
+
+        if _command_header.size + payload_length != len(frame):
+            return create_response(ResponseStatus.Error_PayloadLengthError)
+        if crc7(frame[0:5]) != header_checksum:
+            return create_response(ResponseStatus.Error_CommandIntegrityError)
+        if binascii.crc_hqx(payload, 0xFFFF) != payload_checksum:
+            return create_response(ResponseStatus.Error_PayloadIntegrityError)
+
+        handler = self._handlers.get(command)
+        if handler is None:
+            return create_response(ResponseStatus.Error_UnknownCommand)
+
+        if op == Command.OpStart:
+            if command in self._in_progress:
+                status, response = ResponseStatus.Error_InvalidOperation, b""
+            else:
+                status, response = handler(payload)
+                if command in self._async_commands and status == ResponseStatus.Ok:
+                    self._in_progress[command] = (self.pending_polls, (status, response))
+                    status, response = self._get_result(command)
+        elif op == Command.OpGetResult:
+            status, response = self._get_result(command)
+        else:
+            status, response = ResponseStatus.Error_UnknownOperation, b""
+
+        # only certain responses may contain a payload
+        if status not in (ResponseStatus.Ok, ResponseStatus.Error_CommandError):
+            response = b""
+
+        return create_response(status, response)
+
+    def update(self) -> None:
+        """Runs the motor simulation up to the current time"""
+        now = self._clock()
+        # don't try to catch up after long pauses
+        self._remaining_time += min(now - self._last_update, 1.0)
+        self._last_update = now
+
+        while self._remaining_time >= MOTOR_CONTROL_CYCLE:
+            self._remaining_time -= MOTOR_CONTROL_CYCLE
+            for motor in self.motors:
+                motor.step(MOTOR_CONTROL_CYCLE)
+
+        for idx, motor in enumerate(self.motors):
+            if motor.configured:
+                self._update_slot(StatusSlot.motor_slot(idx), motor.__bytes__())
+
+        self._update_slot(StatusSlot.BATTERY, self.battery)
+        self._update_slot(StatusSlot.ACCELEROMETER, bytes(6))
+        self._update_slot(StatusSlot.GYROSCOPE, bytes(6))
+        self._update_slot(StatusSlot.ORIENTATION, bytes(12))
+
+    def record_error(self, error_type: ErrorType, data: bytes = b"") -> None:
+        self.errors.append(_error_entry.pack(error_type.value, 0, 0, data))
+
+    def _update_slot(self, slot: int, data: bytes) -> None:
+        version, current = self._slots.get(slot, (-1, None))
+        if data != current:
+            self._slots[slot] = ((version + 1) & 0x7F, data)
+
+    def _clear_slot(self, slot: int) -> None:
+        self._slots.pop(slot, None)
+
+    def _get_result(self, command: int) -> CommandResult:
+        if command not in self._in_progress:
+            return ResponseStatus.Error_InvalidOperation, b""
+
+        remaining, result = self._in_progress[command]
+        if remaining > 0:
+            self._in_progress[command] = (remaining - 1, result)
+            return ResponseStatus.Pending, b""
+
+        del self._in_progress[command]
+        return result
+
+    def _ping(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, b""
+
+    def _read_byte(self, payload: bytes, value: int) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, bytes([value])
+
+    def _read_string(self, payload: bytes, value: str) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, value.encode("utf-8")
+
+    def _read_names(self, payload: bytes, names: tuple[str, ...]) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, encode_string_list(names)
+
+    def _read_firmware_crc(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, bytes(4)
+
+    def _set_master_status(self, payload: bytes) -> CommandResult:
+        if len(payload) != 1:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        self.master_status = payload[0]
+        return ResponseStatus.Ok, b""
+
+    def _set_bluetooth_status(self, payload: bytes) -> CommandResult:
+        if len(payload) != 1:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        self.bluetooth_status = payload[0]
+        return ResponseStatus.Ok, b""
+
+    def _set_motor_port_type(self, payload: bytes) -> CommandResult:
+        if len(payload) != 2:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        port, port_type = payload
+        if port >= len(self.motors) or port_type >= len(self.MOTOR_PORT_TYPES):
+            return ResponseStatus.Ok, b"\x00"
+
+        self.motor_port_types[port] = port_type
+        self.motors[port].deconfigure()
+        self._clear_slot(StatusSlot.motor_slot(port))
+        return ResponseStatus.Ok, b"\x01"
+
+    def _set_motor_port_config(self, payload: bytes) -> CommandResult:
+        if not payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        port = payload[0]
+        if port >= len(self.motors) or self.motor_port_types[port] == 0:
+            return ResponseStatus.Error_CommandError, b""
+
+        if not self.motors[port].configure(payload[1:]):
+            return ResponseStatus.Error_CommandError, b""
+
+        return ResponseStatus.Ok, b""
+
+    def _set_motor_control(self, payload: bytes) -> CommandResult:
+        versions = bytearray()
+        idx = 0
+        while idx < len(payload):
+            header = payload[idx]
+            length = (header & 0xF8) >> 3
+            port = header & 0x07
+            idx += 1
+
+            if port >= len(self.motors):
+                return ResponseStatus.Error_CommandError, b""
+            if idx + length > len(payload):
+                return ResponseStatus.Error_PayloadLengthError, b""
+
+            motor = self.motors[port]
+            if not motor.request(payload[idx : idx + length]):
+                return ResponseStatus.Error_CommandError, b"\x01"
+            idx += length
+
+            versions.append(motor.version)
+
+        return ResponseStatus.Ok, bytes(versions)
+
+    def _test_motor_on_port(self, payload: bytes) -> CommandResult:
+        if len(payload) != 3:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, bytes([payload[0] < len(self.motors)])
+
+    def _set_sensor_port_type(self, payload: bytes) -> CommandResult:
+        if len(payload) != 2:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        port, port_type = payload
+        if port >= len(self.sensor_port_types) or port_type >= len(self.SENSOR_PORT_TYPES):
+            return ResponseStatus.Ok, b"\x00"
+
+        self.sensor_port_types[port] = port_type
+        self.sensor_port_config[port] = b""
+        self._clear_slot(StatusSlot.sensor_slot(port))
+        return ResponseStatus.Ok, b"\x01"
+
+    def _set_sensor_port_config(self, payload: bytes) -> CommandResult:
+        if not payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        port = payload[0]
+        if port >= len(self.sensor_port_types):
+            return ResponseStatus.Error_CommandError, b""
+
+        self.sensor_port_config[port] = payload[1:]
+        return ResponseStatus.Ok, b""
+
+    def _read_sensor_info(self, payload: bytes) -> CommandResult:
+        if len(payload) not in (1, 2):
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, b""
+
+    def _test_sensor_on_port(self, payload: bytes) -> CommandResult:
+        if len(payload) != 2:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, bytes([payload[0] in self.connected_sensors])
+
+    def _set_ring_led_scenario(self, payload: bytes) -> CommandResult:
+        if len(payload) != 1:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        if payload[0] >= len(self.RING_LED_SCENARIOS):
+            return ResponseStatus.Error_CommandError, b""
+
+        self.ring_led_scenario = payload[0]
+        return ResponseStatus.Ok, b""
+
+    def _set_ring_led_frame(self, payload: bytes) -> CommandResult:
+        if len(payload) != 2 * self.ring_led_count:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        self.ring_led_frame = list(struct.unpack(f"<{self.ring_led_count}H", payload))
+        return ResponseStatus.Ok, b""
+
+    def _reset_status_slots(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        self._enabled_slots.clear()
+        self._read_versions.clear()
+        return ResponseStatus.Ok, b""
+
+    def _control_status_slot(self, payload: bytes) -> CommandResult:
+        if len(payload) != 2:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        slot, state = payload
+        if slot > 31 or state > 1:
+            return ResponseStatus.Error_CommandError, b""
+
+        if state:
+            self._enabled_slots.add(slot)
+        else:
+            self._enabled_slots.discard(slot)
+        return ResponseStatus.Ok, b""
+
+    def _read_status(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        data = bytearray()
+        for slot in sorted(self._enabled_slots):
+            if slot not in self._slots:
+                continue
+
+            version, slot_data = self._slots[slot]
+            if self._read_versions.get(slot) == version:
+                continue
+
+            # slots that don't fit are sent in the next read
+            if len(data) + 2 + len(slot_data) > 255:
+                break
+
+            data += bytes([slot, len(slot_data)]) + slot_data
+            self._read_versions[slot] = version
+
+        return ResponseStatus.Ok, bytes(data)
+
+    def _read_error_count(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        return ResponseStatus.Ok, len(self.errors).to_bytes(4, byteorder="little")
+
+    def _read_errors(self, payload: bytes) -> CommandResult:
+        if len(payload) != 4:
+            return ResponseStatus.Error_PayloadLengthError, b""
+
+        start = int.from_bytes(payload, byteorder="little")
+        entries_per_response = 255 // _error_entry.size
+        return ResponseStatus.Ok, b"".join(self.errors[start : start + entries_per_response])
+
+    def _clear_errors(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        self.errors.clear()
+        return ResponseStatus.Ok, b""
+
+    def _store_test_error(self, payload: bytes) -> CommandResult:
+        if payload:
+            return ResponseStatus.Error_PayloadLengthError, b""
+        self.record_error(ErrorType.TestError)
+        return ResponseStatus.Ok, b""
+
+
+BUSY_RESPONSE = create_response(ResponseStatus.Busy)
+
+
+class SimulatedDevice(RevvyTransportInterface):
+    """The MCU as seen over I2C: the response to the last written command can be read repeatedly"""
+
+    def __init__(self, transport: "SimulatorTransport"):
+        self._transport = transport
+        self._response = BUSY_RESPONSE
+        self._ready_at = 0.0
+
+    def write(self, data: bytes) -> None:
+        transport = self._transport
+        transport.transfer(len(data))
+        frame = transport.corrupt(bytes(data))
+        with transport.lock:
+            self._response = transport.mcu.handle(frame)
+            transport.commands += 1
+        self._ready_at = time.monotonic() + transport.latency
+
+    def read(self, length: int) -> bytes:
+        transport = self._transport
+        transport.transfer(length)
+        if time.monotonic() < self._ready_at or transport.random() < transport.busy_probability:
+            transport.busy_responses += 1
+            response = BUSY_RESPONSE
+        else:
+            response = self._response
+
+        # reading past the end of the response returns the rest of the buffer
+        data = response[:length].ljust(length, b"\xff")
+        return transport.corrupt(data)
+
+
+class SimulatorTransport(DeviceTransportBase):
+    """
+    Connects RevvyControl to a SimulatedMcu. The bootloader is not simulated.
+
+    @param latency: [s] time the MCU needs to process a command, reads answer Busy until then
+    @param busy_probability: probability of a read being answered with Busy
+    @param bit_error_rate: probability of a bit being flipped in every written or read frame
+    @param byte_time: [s] transfer time of a byte, e.g. 90e-6 for a 100kHz I2C bus
+    @param seed: makes the injected errors reproducible
+    """
+
+    def __init__(
+        self,
+        mcu: Optional[SimulatedMcu] = None,
+        latency: float = 0.0,
+        busy_probability: float = 0.0,
+        bit_error_rate: float = 0.0,
+        byte_time: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.mcu = mcu or SimulatedMcu()
+        self.latency = latency
+        self.busy_probability = busy_probability
+        self.bit_error_rate = bit_error_rate
+        self.byte_time = byte_time
+        self.lock = threading.Lock()
+
+        self.commands = 0
+        self.busy_responses = 0
+        self.corrupted_frames = 0
+
+        self._random = random.Random(seed)
+
+    @property
+    def stats(self) -> SimulatorStats:
+        return SimulatorStats(self.commands, self.busy_responses, self.corrupted_frames)
+
+    def create_device(self, address: int) -> RevvyTransportInterface:
+        if address != self.APPLICATION_ADDRESS:
+            raise TransportException(f"No simulated device at address {hex(address)}")
+        return SimulatedDevice(self)
+
+    def random(self) -> float:
+        with self.lock:
+            return self._random.random()
+
+    def transfer(self, length: int) -> None:
+        if self.byte_time:
+            time.sleep(length * self.byte_time)
+
+    def corrupt(self, data: bytes) -> bytes:
+        """Flips random bits of the data, according to the bit error rate"""
+        if not self.bit_error_rate:
+            return data
+
+        corrupted = bytearray(data)
+        with self.lock:
+            for bit in range(len(corrupted) * 8):
+                if self._random.random() < self.bit_error_rate:
+                    corrupted[bit // 8] ^= 1 << (bit % 8)
+
+            if corrupted != data:
+                self.corrupted_frames += 1
+
+        return bytes(corrupted)
@@ -0,0 +1,227 @@
+"""
+Recording and replaying the raw communication between the Raspberry Pi and the MCU.
+
+RecordingTransport wraps a real transport and saves every read and write frame with a timestamp.
+ReplayTransport plays a recording back, so the Python side of the robot (status decoding,
+controllers, filters, ...) can run, and be benchmarked, without a robot.
+
+The replay does not depend on thread timing: the frames are grouped into exchanges (a written
+command and the frames read until the next write), and a written command receives the responses
+recorded for the same command bytes, in the recorded order. When the recorded responses of a
+command run out, the last one is repeated and the replay is considered finished.
+
+File format (little endian): HEADER, the hardware version of the robot (ASCII), then frames of
+FRAME_HEADER followed by the data. The hardware version is stored because it is read by the
+firmware updater, before the communication is recorded.
+"""
+
+from collections import defaultdict, deque
+import struct
+import threading
+import time
+from typing import IO, NamedTuple, Optional
+
+from revvy.mcu.rrrc_control import DeviceTransportBase
+from revvy.mcu.rrrc_transport import RevvyTransportInterface, TransportException
+from revvy.utils.logger import get_logger
+from revvy.utils.version import Version
+
+RECORDING_MAGIC = b"RVYI2C02"
+
+# magic, length of the hardware version
+HEADER = struct.Struct("<8sB")
+
+# timestamp, frame kind, device address, data length
+FRAME_HEADER = struct.Struct("<dBBH")
+
+FRAME_READ = 0
+FRAME_WRITE = 1
+
+log = get_logger("TransportRecording")
+
+
+class Frame(NamedTuple):
+    timestamp: float
+    kind: int
+    address: int
+    data: bytes
+
+
+class Exchange(NamedTuple):
+    timestamp: float
+    reads: list[bytes]
+
+
+class Recording(NamedTuple):
+    hw_version: Optional[Version]
+    frames: list[Frame]
+
+
+def read_recording(path: str) -> Recording:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < HEADER.size or data[: len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+        raise ValueError(f"{path} is not a transport recording")
+
+    _, version_length = HEADER.unpack_from(data)
+    offset = HEADER.size + version_length
+    hw_version = data[HEADER.size : offset].decode("ascii")
+
+    frames = []
+    while offset + FRAME_HEADER.size <= len(data):
+        timestamp, kind, address, length = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        frames.append(Frame(timestamp, kind, address, data[offset : offset + length]))
+        offset += length
+
+    return Recording(Version(hw_version) if hw_version else None, frames)
+
+
+def read_frames(path: str) -> list[Frame]:
+    return read_recording(path).frames
+
+
+class TransportRecorder:
+    """Writes the frames into a file. Can be shared between devices and threads."""
+
+    def __init__(self, path: str, hw_version: Optional[Version]):
+        version = str(hw_version).encode("ascii") if hw_version else b""
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = open(path, "wb")
+        self._file.write(HEADER.pack(RECORDING_MAGIC, len(version)))
+        self._file.write(version)
+        self._start = time.monotonic()
+        self._frames = 0
+
+    def add(self, kind: int, address: int, data: bytes) -> None:
+        header = FRAME_HEADER.pack(time.monotonic() - self._start, kind, address, len(data))
+        with self._lock:
+            if self._file:
+                self._file.write(header)
+                self._file.write(data)
+                self._frames += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        log(f"Recorded {self._frames} frames")
+
+
+class RecordingDevice(RevvyTransportInterface):
+    def __init__(self, device: RevvyTransportInterface, address: int, recorder: TransportRecorder):
+        self._device = device
+        self._address = address
+        self._recorder = recorder
+
+    def read(self, length: int) -> bytes:
+        data = self._device.read(length)
+        self._recorder.add(FRAME_READ, self._address, bytes(data))
+        return data
+
+    def write(self, data: bytes) -> None:
+        self._device.write(data)
+        self._recorder.add(FRAME_WRITE, self._address, bytes(data))
+
+
+class RecordingTransport(DeviceTransportBase):
+    """Records the communication of an other transport"""
+
+    def __init__(self, transport: DeviceTransportBase, recorder: TransportRecorder):
+        self._transport = transport
+        self._recorder = recorder
+
+    def create_device(self, address: int) -> RevvyTransportInterface:
+        return RecordingDevice(self._transport.create_device(address), address, self._recorder)
+
+
+class ReplayDevice(RevvyTransportInterface):
+    def __init__(self, transport: "ReplayTransport", address: int):
+        self._transport = transport
+        self._address = address
+        self._reads: list[bytes] = []
+        self._next_read = 0
+
+    def write(self, data: bytes) -> None:
+        exchange = self._transport.next_exchange(self._address, bytes(data))
+        self._reads = exchange.reads
+        self._next_read = 0
+
+    def read(self, length: int) -> bytes:
+        if not self._reads:
+            raise TransportException("No response was recorded")
+
+        # reads that were not recorded (e.g. extra retries) get the last recorded response
+        data = self._reads[min(self._next_read, len(self._reads) - 1)]
+        self._next_read += 1
+        return data
+
+
+class ReplayTransport(DeviceTransportBase):
+    """
+    Plays back a recording made by RecordingTransport.
+
+    @param path: the recording
+    @param realtime: if set, responses are not returned sooner than they were recorded. Otherwise
+                     the recording is replayed as fast as possible.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        self._realtime = realtime
+        self._lock = threading.Lock()
+        self._exchanges: dict[int, dict[bytes, deque[Exchange]]] = defaultdict(dict)
+        self._last_exchange: dict[tuple[int, bytes], Exchange] = {}
+        self._replayed = 0
+        self._start: Optional[float] = None
+        self.finished = threading.Event()
+
+        self.hw_version, frames = read_recording(path)
+        self._first_timestamp = frames[0].timestamp if frames else 0.0
+
+        current: dict[int, Exchange] = {}
+        for frame in frames:
+            if frame.kind == FRAME_WRITE:
+                exchange = Exchange(frame.timestamp, [])
+                self._exchanges[frame.address].setdefault(frame.data, deque()).append(exchange)
+                current[frame.address] = exchange
+            elif frame.address in current:
+                current[frame.address].reads.append(frame.data)
+
+        self._recorded = sum(
+            len(queue) for commands in self._exchanges.values() for queue in commands.values()
+        )
+        log(f"Loaded {len(frames)} frames, {self._recorded} exchanges")
+
+    @property
+    def progress(self) -> tuple[int, int]:
+        """Number of replayed and recorded exchanges"""
+        return self._replayed, self._recorded
+
+    def create_device(self, address: int) -> RevvyTransportInterface:
+        return ReplayDevice(self, address)
+
+    def next_exchange(self, address: int, command: bytes) -> Exchange:
+        with self._lock:
+            queue = self._exchanges[address].get(command)
+            if queue:
+                exchange = queue.popleft()
+                self._last_exchange[(address, command)] = exchange
+                self._replayed += 1
+            else:
+                exchange = self._last_exchange.get((address, command))
+                if exchange is None:
+                    raise TransportException(f"Command was not recorded: {list(command)}")
+                self.finished.set()
+
+            if self._start is None:
+                self._start = time.monotonic() - (exchange.timestamp - self._first_timestamp)
+            start = self._start
+
+        if self._realtime:
+            delay = start + exchange.timestamp - self._first_timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        return exchange
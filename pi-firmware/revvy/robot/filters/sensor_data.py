@@ -25,6 +25,10 @@ class SensorDataFilter(Generic[Driver]):
         self._value = value
         self._value.subscribe(on_data_update)
 
+    @property
+    def observable(self) -> Observable:
+        return self._value
+
     @abstractmethod
     def update(self, port: PortInstance[Driver]): ...
 
@@ -14,7 +14,7 @@ the MCU reads new data from a particular port.
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Set
+from collections.abc import Collection, Set
 from typing import Generic, Iterator, NamedTuple, Optional, TypeVar
 
 from revvy.mcu.rrrc_control import RevvyControl
@@ -117,9 +117,11 @@ class PortHandler(Generic[DriverType]):
     def port_count(self) -> int:
         return self._port_count
 
-    def reset(self) -> None:
+    def reset(self, preserved: Collection["PortInstance[DriverType]"] = ()) -> None:
+        """Sets every port to not configured, except the ones in `preserved`."""
         for port in self:
-            port.uninitialize()
+            if port not in preserved:
+                port.uninitialize()
 
 
 class PortInstance(Generic[DriverType]):
@@ -153,6 +155,7 @@ class PortInstance(Generic[DriverType]):
         self._supported = supported
         self._default_driver = default_driver
         self._set_port_type = set_port_type
+        self._config: Optional[DriverConfig] = None
         self._driver: DriverType = default_driver.create(self)
 
     @property
@@ -172,6 +175,11 @@ class PortInstance(Generic[DriverType]):
     def driver(self) -> DriverType:
         return self._driver
 
+    @property
+    def config(self) -> Optional[DriverConfig]:
+        """The configuration the port was last configured with, or None if not configured."""
+        return self._config
+
     def configure(self, config: Optional["DriverConfig"]) -> DriverType:
         """
         Configures the port with the given driver and configuration.
@@ -187,7 +195,10 @@ class PortInstance(Generic[DriverType]):
             self._driver.uninitialize()
 
             driver_config = config or self._default_driver
+            # if creating the driver fails, the port should not look configured
+            self._config = None
             self._driver = driver_config.create(self)
+            self._config = config
             self.log(f"set to {self.driver.driver_name}")
 
             self._config_changed_callbacks.trigger(self, config)
@@ -12,10 +12,13 @@ from revvy.robot.ports.motors.base import (
     MotorPortDriver,
 )
 from revvy.utils.awaiter import Awaiter
+from revvy.utils.binary_log import get_binary_logger
 from revvy.utils.functions import clip
 from revvy.utils.logger import LogLevel
 from revvy.utils.serialize import Serialize
 
+trace = get_binary_logger("[DcMotor]")
+
 MOTOR_PACKET_SIZE_BYTES = 11
 
 
@@ -303,12 +306,14 @@ class BaseDcMotorDriver(MotorPortDriver):
     def set_power(self, power: int) -> None:
         self._cancel_awaiter()
         self.log("set_power")
+        trace("port %d: set_power %d", self._port.id, power)
 
         self._port.interface.set_motor_port_control_value(self.create_set_power_command(power))
 
     def set_speed(self, speed: float, power_limit: Optional[float] = None) -> None:
         self._cancel_awaiter()
         self.log("set_speed")
+        trace("port %d: set_speed %.1f", self._port.id, speed)
 
         self._port.interface.set_motor_port_control_value(
             self.create_set_speed_command(speed, power_limit)
@@ -349,7 +354,14 @@ class BaseDcMotorDriver(MotorPortDriver):
             self._awaiter = awaiter
             response = self._port.interface.set_motor_port_control_value(command)
             self._current_position_request = response[0]
-        self.log(f"set_position request id: {self._current_position_request}")
+        self.log(lambda: f"set_position request id: {self._current_position_request}")
+        trace(
+            "port %d: set_position %d (kind %d), request id %d",
+            self._port.id,
+            position,
+            pos_type.value,
+            self._current_position_request,
+        )
 
         return awaiter
 
@@ -370,16 +382,18 @@ class BaseDcMotorDriver(MotorPortDriver):
             if awaiter:
                 if self._current_position_request is not None:
                     if request_id != self._current_position_request:
-                        self.log(f"unexpected request id: {request_id}", LogLevel.DEBUG)
+                        self.log(lambda: f"unexpected request id: {request_id}", LogLevel.DEBUG)
                         return
 
                 if status == MotorStatus.NORMAL:
                     return
                 elif status == MotorStatus.GOAL_REACHED:
-                    self.log(f"goal reached: {request_id}", LogLevel.DEBUG)
+                    self.log(lambda: f"goal reached: {request_id}", LogLevel.DEBUG)
+                    trace("port %d: goal reached, request id %d", self._port.id, request_id)
                     awaiter.finish()
                 elif status == MotorStatus.BLOCKED:
-                    self.log(f"blocked: {request_id}", LogLevel.DEBUG)
+                    self.log(lambda: f"blocked: {request_id}", LogLevel.DEBUG)
+                    trace("port %d: blocked, request id %d", self._port.id, request_id)
                     awaiter.cancel()
 
     def update_status(self, data) -> None:
@@ -3,21 +3,55 @@
 # Documentation of control messages here:
 # https://docs.google.com/document/d/10fSZSteEr80KhezFd8z21VvdrG8Kk38ko8qecDbktcM/edit
 
+import struct
+from typing import Union
 
 from revvy.robot.remote_controller import BleAutonomousCmd, RemoteControllerCommand
-from revvy.utils.functions import bits_to_bool_list
 
+# offset 0: packet id, 1-6: analog values, 7-10: next deadline, 11-14: button bits
+ANALOG_VALUES = slice(1, 7)
+DEADLINE_AND_BUTTONS = struct.Struct("<II")
+DEADLINE_OFFSET = 7
+MESSAGE_LENGTH = DEADLINE_OFFSET + DEADLINE_AND_BUTTONS.size
 
-def parse_control_message(data: bytearray) -> RemoteControllerCommand:
-    """From a control message, parse out analog values, deadlines, and button values"""
-    analog_values = data[1:7]
-    deadline_packed = data[7:11]
-    next_deadline = int.from_bytes(deadline_packed, byteorder="little")
-    button_values = bits_to_bool_list(data[11:15])
+# JSON control messages are objects with the byte index (as a string) as key
+JSON_MESSAGE_KEYS = tuple(str(i) for i in range(256))
+
+
+def parse_control_message(data: Union[bytes, bytearray, memoryview]) -> RemoteControllerCommand:
+    """
+    From a control message, parse out analog values, deadlines, and button values.
+
+    The analog values are not copied, they are a view into `data`. Older apps may send shorter
+    messages, the missing deadline and button bytes are treated as zeros.
+
+    >>> command = parse_control_message(bytes([0, 1, 2, 3, 4, 5, 6, 200, 0, 0, 0, 5, 0, 0, 0x80]))
+    >>> bytes(command.analog), command.next_deadline, hex(command.buttons)
+    (b'\\x01\\x02\\x03\\x04\\x05\\x06', 200, '0x80000005')
+
+    >>> command = parse_control_message(bytes([0, 1, 2, 3, 4, 5, 6, 200]))
+    >>> bytes(command.analog), command.next_deadline, hex(command.buttons)
+    (b'\\x01\\x02\\x03\\x04\\x05\\x06', 200, '0x0')
+    """
+    if len(data) >= MESSAGE_LENGTH:
+        next_deadline, buttons = DEADLINE_AND_BUTTONS.unpack_from(data, DEADLINE_OFFSET)
+    else:
+        padded = bytes(data[DEADLINE_OFFSET:MESSAGE_LENGTH]).ljust(DEADLINE_AND_BUTTONS.size, b"\0")
+        next_deadline, buttons = DEADLINE_AND_BUTTONS.unpack(padded)
 
     return RemoteControllerCommand(
-        analog=analog_values,
-        buttons=button_values,
+        analog=memoryview(data)[ANALOG_VALUES],
+        buttons=buttons,
         background_command=BleAutonomousCmd.NONE,
         next_deadline=next_deadline,
     )
+
+
+def json_to_control_message(json_data: dict) -> bytes:
+    """
+    Converts a JSON control message to the binary message format.
+
+    >>> json_to_control_message({"0": 1, "1": 127, "2": 255})
+    b'\\x01\\x7f\\xff'
+    """
+    return bytes([json_data[key] for key in JSON_MESSAGE_KEYS[: len(json_data)]])
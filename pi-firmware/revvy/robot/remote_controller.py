@@ -1,10 +1,12 @@
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
+import itertools
 import time
 
 from threading import Event
 import traceback
-from typing import Callable, NamedTuple, Optional, Tuple
+from typing import Callable, NamedTuple, Optional, Tuple, Union
 from revvy.bluetooth.data_types import BackgroundControlState, TimerData
 from revvy.scripting.runtime import ScriptHandle
 from revvy.utils import error_reporter
@@ -28,15 +30,19 @@ class BleAutonomousCmd(Enum):
 class RemoteControllerCommand(NamedTuple):
     """Raw message coming through the ble interface"""
 
-    analog: bytearray
-    buttons: list[bool]
+    analog: Union[bytes, bytearray, memoryview]
+    """Analog channel values. May be a view into the received message."""
+
+    buttons: int
+    """Button states, bit n is set if button n is pressed"""
+
     background_command: BleAutonomousCmd
     next_deadline: Optional[int]
 
 
 EMPTY_REMOTE_CONTROLLER_COMMAND = RemoteControllerCommand(
     analog=bytearray(),
-    buttons=[False] * 32,
+    buttons=0,
     background_command=BleAutonomousCmd.NONE,
     next_deadline=None,
 )
@@ -70,9 +76,12 @@ class RemoteController:
 
         self._analogActions: list[AnalogAction] = []
         # the last analog values, used to compare if a callback needs to be fired
-        self._analogStates = bytearray()
+        self._analogStates = bytes()
 
-        self._button_handlers: list[ButtonHandler] = []
+        self._button_handlers: dict[int, list[ButtonHandler]] = {}
+        # bit n is set if there is a handler for button n
+        self._handled_buttons = 0
+        self._last_buttons = 0
 
         self._global_timer_running = False
         self._global_timer = 0.0
@@ -97,8 +106,10 @@ class RemoteController:
 
     def reset(self) -> None:
         self._analogActions.clear()
-        self._analogStates.clear()
+        self._analogStates = bytes()
         self._button_handlers.clear()
+        self._handled_buttons = 0
+        self._last_buttons = 0
 
         self._global_timer_running = False
         self._global_timer = 0.0
@@ -137,7 +148,7 @@ class RemoteController:
             self._global_timer = 0.0
             self._previous_global_timer_value = None
 
-    def process_analog_command(self, analog_cmd: bytearray):
+    def process_analog_command(self, analog_cmd: Union[bytes, bytearray, memoryview]):
         """
         Handles joystick movement and triggers change (action)
         if any of the values changed
@@ -146,7 +157,8 @@ class RemoteController:
             return
 
         previous_analog_states = self._analogStates
-        self._analogStates = analog_cmd
+        # copy, because the command may be a view into a buffer we don't own
+        self._analogStates = bytes(analog_cmd)
         for channels, action in self._analogActions:
             try:
                 try:
@@ -160,48 +172,60 @@ class RemoteController:
                 # looks like an action was registered for an analog channel that we didn't receive
                 log(f'Skip analog handler for channels {", ".join(map(str, channels))}')
 
-    def run_button_script(self, button_pressed_list: list[bool]):
+    def run_button_script(self, buttons: int):
         """
         On the controller user binds blockly programs to the buttons.
-        Here we iterate over the handlers and the button states, and if the button is pressed
-        run the program.
+        Here we iterate over the handlers of the buttons that are pressed or just released,
+        and if the button is pressed run the program.
         We also send a message about it being started.
         """
 
-        for button in self._button_handlers:
-            button_is_pressed = button_pressed_list[button.id]
-            is_button_pressed_change = button.last_button_value != button_is_pressed
-            button.last_button_value = button_is_pressed
-
-            if is_button_pressed_change:
-                button.last_press_stopped_it = False
-
-            if button_is_pressed:
-                if button.script.is_running:
-                    # Button pressed, script is running, there are two options:
-                    # if the user tapped the button and did not release it
-                    # OR
-                    # if the edge detector detects change again, it means that
-                    # the user let it go and tapped again, which means thy means
-                    # to stop it from running.
-
-                    if is_button_pressed_change:
-                        # Pushed the second time, STOP it!
-                        log(f"stopping: {button.script.name}")
-                        button.script.stop()
-                        button.last_press_stopped_it = True
-                    else:
-                        # Just keeps on pushing.
-                        pass
+        changed = buttons ^ self._last_buttons
+        self._last_buttons = buttons
+
+        # Buttons that are not pressed and did not change have nothing to do
+        visited = (buttons | changed) & self._handled_buttons
+        while visited:
+            lowest = visited & -visited
+            visited ^= lowest
+            button_is_pressed = bool(buttons & lowest)
+
+            for button in self._button_handlers[lowest.bit_length() - 1]:
+                self._handle_button(button, button_is_pressed)
+
+    def _handle_button(self, button: ButtonHandler, button_is_pressed: bool):
+        is_button_pressed_change = button.last_button_value != button_is_pressed
+        button.last_button_value = button_is_pressed
+
+        if is_button_pressed_change:
+            button.last_press_stopped_it = False
+
+        if button_is_pressed:
+            if button.script.is_running:
+                # Button pressed, script is running, there are two options:
+                # if the user tapped the button and did not release it
+                # OR
+                # if the edge detector detects change again, it means that
+                # the user let it go and tapped again, which means thy means
+                # to stop it from running.
+
+                if is_button_pressed_change:
+                    # Pushed the second time, STOP it!
+                    log(f"stopping: {button.script.name}")
+                    button.script.stop()
+                    button.last_press_stopped_it = True
+                else:
+                    # Just keeps on pushing.
+                    pass
+            else:
+                # If the user is holding the button, restart the program
+                if not button.last_press_stopped_it:
+                    # it's not running, we need to start it!
+                    log(f"starting program: {button.script.name}")
+                    button.script.start()
                 else:
-                    # If the user is holding the button, restart the program
-                    if not button.last_press_stopped_it:
-                        # it's not running, we need to start it!
-                        log(f"starting program: {button.script.name}")
-                        button.script.start()
-                    else:
-                        # The user is holding the button but that button press stopped the last run.
-                        pass
+                    # The user is holding the button but that button press stopped the last run.
+                    pass
 
     def process_control_message(self, msg: RemoteControllerCommand):
         """
@@ -228,7 +252,7 @@ class RemoteController:
         # Currently hardcoded for the joystick X and Y middle position.
         # FIXME: generalize if we support more input methods
         joystick_xy_action = msg.analog[0] != 127 or msg.analog[1] != 127
-        joystick_button_action = any(msg.buttons)
+        joystick_button_action = msg.buttons != 0
 
         if joystick_xy_action or joystick_button_action:
             # This is a one shot action to detect first joystick input
@@ -241,7 +265,7 @@ class RemoteController:
     def link_button_to_runner(self, button_id, script_handle: ScriptHandle):
         log(f"registering callbacks for Button: {button_id}")
         log(script_handle.descriptor.source, LogLevel.DEBUG)
-        self._button_handlers.append(
+        self._button_handlers.setdefault(button_id, []).append(
             ButtonHandler(
                 id=button_id,
                 script=script_handle,
@@ -249,6 +273,7 @@ class RemoteController:
                 last_press_stopped_it=False,
             )
         )
+        self._handled_buttons |= 1 << button_id
 
     def on_analog_values(self, channels, action: ScriptHandle) -> None:
         self._analogActions.append((channels, action))
@@ -276,6 +301,122 @@ class RemoteController:
 FIRST_MESSAGE_TIMEOUT = 5
 DEFAULT_MESSAGE_DEADLINE = 1
 
+# The app sends control messages more often than this. Longer gaps mean a bad connection.
+LATE_MESSAGE_INTERVAL = 0.2
+
+
+class ControlMessageStats(NamedTuple):
+    received: int
+    """Number of control messages received"""
+
+    merged: int
+    """Number of messages that were merged into a later one, because they arrived together"""
+
+    dropped: int
+    """Number of messages lost because the queue was full"""
+
+    late: int
+    """Number of messages that arrived later than LATE_MESSAGE_INTERVAL after the previous one"""
+
+
+class ControlMessageQueue:
+    """
+    Queue of control messages between the interface that receives them and the controller thread.
+
+    Messages are numbered as they arrive, so lost messages can be counted. Messages that are
+    waiting together are merged into one: the latest analog values are kept, and a button is
+    pressed if it was pressed in any of the messages. This way, short button taps are not lost.
+
+    One thread puts the messages, an other one gets them. The queue relies on the atomic
+    operations of deque, it does not use locks.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._messages: deque[tuple[int, RemoteControllerCommand]] = deque(maxlen=capacity)
+        self._data_ready = Event()
+        self._sequence = itertools.count()
+        self._last_sequence = -1
+        self._last_arrival: Optional[float] = None
+
+        self._received = 0
+        self._merged = 0
+        self._dropped = 0
+        self._late = 0
+
+    @property
+    def stats(self) -> ControlMessageStats:
+        return ControlMessageStats(self._received, self._merged, self._dropped, self._late)
+
+    def put(self, message: RemoteControllerCommand) -> None:
+        now = time.monotonic()
+        if self._last_arrival is not None and now - self._last_arrival > LATE_MESSAGE_INTERVAL:
+            self._late += 1
+        self._last_arrival = now
+        self._received += 1
+
+        self._messages.append((next(self._sequence), message))
+        self._data_ready.set()
+
+    def wake(self) -> None:
+        """Wakes up the thread that waits in `get`, so that it can check if it needs to stop."""
+        self._data_ready.set()
+
+    def clear(self) -> None:
+        """Discards the waiting messages. The next message is expected to arrive after a pause."""
+        self._take_all()
+        self._last_arrival = None
+        self._data_ready.clear()
+
+    def get(
+        self, timeout: float, is_cancelled: Callable[[], bool] = lambda: False
+    ) -> Optional[RemoteControllerCommand]:
+        """
+        Waits for messages and returns them merged into one. Returns None if no message arrived in
+        `timeout` seconds, or `is_cancelled` returned True.
+        """
+        deadline = time.monotonic() + timeout
+        while not is_cancelled():
+            messages = self._take_all()
+            if messages:
+                return self._merge(messages)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._data_ready.wait(remaining):
+                messages = self._take_all()
+                return self._merge(messages) if messages else None
+
+            self._data_ready.clear()
+
+        return None
+
+    def _take_all(self) -> list[RemoteControllerCommand]:
+        messages = []
+        while True:
+            try:
+                sequence, message = self._messages.popleft()
+            except IndexError:
+                return messages
+
+            self._dropped += sequence - self._last_sequence - 1
+            self._last_sequence = sequence
+            messages.append(message)
+
+    def _merge(self, messages: list[RemoteControllerCommand]) -> RemoteControllerCommand:
+        latest = messages[-1]
+        if len(messages) == 1:
+            return latest
+
+        self._merged += len(messages) - 1
+
+        buttons = 0
+        background_command = BleAutonomousCmd.NONE
+        for message in messages:
+            buttons |= message.buttons
+            if message.background_command != BleAutonomousCmd.NONE:
+                background_command = message.background_command
+
+        return latest._replace(buttons=buttons, background_command=background_command)
+
 
 class RemoteControllerScheduler:
     """Receive remote controller control messages, and pass them to the controller.
@@ -284,21 +425,24 @@ class RemoteControllerScheduler:
 
     def __init__(self, rc: RemoteController):
         self._controller = rc
-        self._data_ready_event = Event()
+        self._messages = ControlMessageQueue()
         self._controller_detected_callback = None
         self._controller_lost_callback = None
-        self._message = EMPTY_REMOTE_CONTROLLER_COMMAND
+
+    @property
+    def stats(self) -> ControlMessageStats:
+        """Counters that describe the quality of the connection to the controller."""
+        return self._messages.stats
 
     def periodic_control_message_handler(self, message: RemoteControllerCommand):
         """This function is called by the ble interface to pass the received control message."""
 
         # We want to block the BLE thread as little as possible. Therefore in this function we
-        # only swap the message and signal the controller thread that new data is available.
-        # The controller thread is waiting for the event to be set in `_wait_for_message`.
+        # only queue the message and signal the controller thread that new data is available.
+        # The controller thread is waiting for the message in `_wait_for_message`.
         # Blocking the BLE thread may cause the Raspberry Pi Zero W2 to drop connection and the
         # BLE interface to stop working.
-        self._message = message
-        self._data_ready_event.set()
+        self._messages.put(message)
 
     def _wait_for_message(
         self, ctx: ThreadContext, timeout_sec: float
@@ -310,26 +454,20 @@ class RemoteControllerScheduler:
         - a stop request was received, which is mostly interesting during development and testing
         - the timeout was reached, and we assume that the remote controller disconnected
         """
-        timeout = not self._data_ready_event.wait(timeout_sec)
-        self._data_ready_event.clear()
+        message = self._messages.get(timeout_sec, lambda: ctx.stop_requested)
 
-        if timeout or ctx.stop_requested:
+        if ctx.stop_requested:
             return None
 
-        # swap out the message with an empty one
-        # if we wanted to be 100% correct here, we should use a 1-element queue. However,
-        # the swap is atomic, so in the worst case we just miss messages for a short time.
-        message, self._message = self._message, EMPTY_REMOTE_CONTROLLER_COMMAND
-
         return message
 
     def handle_controller(self, ctx: ThreadContext):
         try:
             log("Waiting for controller")
 
-            self._data_ready_event.clear()
+            self._messages.clear()
 
-            ctx.on_stopped(self._data_ready_event.set)
+            ctx.on_stopped(self._messages.wake)
 
             # wait for first message
             stopwatch = Stopwatch()
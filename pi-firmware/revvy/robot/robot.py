@@ -1,9 +1,10 @@
+from collections.abc import Collection
 from functools import partial
 from typing import NamedTuple, Optional
 import time
 
 from ..mcu.rrrc_control import RevvyControl
-from revvy.hardware_dependent.sound import SoundControlV1, SoundControlV2
+from revvy.hardware_dependent.sound import SoundControlBase, SoundControlV1, SoundControlV2
 from revvy.mcu.commands import TestSensorOnPortResult
 from revvy.mcu.rrrc_control import RevvyTransportBase
 from revvy.robot.drivetrain import DifferentialDrivetrain
@@ -47,7 +48,9 @@ class BatteryStatus(NamedTuple):
 
 
 class Robot:
-    def __init__(self, interface: RevvyTransportBase):
+    def __init__(
+        self, interface: RevvyTransportBase, sound_control: Optional[SoundControlBase] = None
+    ):
         self._comm_interface = interface
 
         self._log = get_logger("Robot")
@@ -60,15 +63,17 @@ class Robot:
 
         self._stopwatch = Stopwatch()
 
-        setup = {
+        setup: dict[Version, type[SoundControlBase]] = {
             Version("1.0"): SoundControlV1,
             Version("1.1"): SoundControlV1,
             Version("2.0"): SoundControlV2,
         }
 
         self._ring_led = RingLed(self._robot_control)
-        assert VERSION.hw is not None
-        self._sound = Sound(setup[VERSION.hw]())
+        if sound_control is None:
+            assert VERSION.hw is not None
+            sound_control = setup[VERSION.hw]()
+        self._sound = Sound(sound_control)
 
         self._status = RobotStatusIndicator(self._robot_control)
         self._status_updater = McuStatusUpdater(self._robot_control)
@@ -132,6 +137,10 @@ class Robot:
     def robot_control(self) -> RevvyControl:
         return self._robot_control
 
+    @property
+    def status_updater(self) -> McuStatusUpdater:
+        return self._status_updater
+
     @property
     def battery(self) -> BatteryStatus:
         return self._battery
@@ -188,7 +197,16 @@ class Robot:
 
         return SENSOR_ON_PORT_UNKNOWN
 
-    def reset(self) -> None:
+    def reset(
+        self,
+        preserved_motors: Collection[PortInstance] = (),
+        preserved_sensors: Collection[PortInstance] = (),
+    ) -> None:
+        """
+        Resets the robot to its unconfigured state.
+
+        Preserved ports keep their drivers and configuration, only their motors are stopped.
+        """
         self._log("reset()")
         self._ring_led.start_animation(RingLed.BreathingGreen)
         self._status_updater.reset()
@@ -215,8 +233,22 @@ class Robot:
         )
 
         self._drivetrain.reset()
-        self._motor_ports.reset()
-        self._sensor_ports.reset()
+        self._motor_ports.reset(preserved_motors)
+        self._sensor_ports.reset(preserved_sensors)
+
+        # The status updater reset disabled the slots of the preserved ports, too
+        for motor in preserved_motors:
+            motor.driver.stop()
+            if motor.config is not None:
+                self._status_updater.enable_slot(
+                    StatusSlot.motor_slot(motor.id), motor.driver.update_status
+                )
+
+        for sensor in preserved_sensors:
+            if sensor.config is not None:
+                self._status_updater.enable_slot(
+                    StatusSlot.sensor_slot(sensor.id), sensor.driver.update_status
+                )
         self._sound.reset_volume()
         self._robot_control.orientation_reset()
         self._script_variables.reset()
@@ -50,5 +50,5 @@ class MotorChangeData(NamedTuple):
 
     id: int
     power: int
-    speed: int
+    speed: float
     pos: int
@@ -17,7 +17,7 @@ from revvy.robot.robot_events import RobotEvent
 from revvy.robot.filters.battery import BatteryState
 from revvy.utils.emitter import Emitter
 from revvy.utils.logger import LogLevel, get_logger
-from revvy.utils.observable import Observable
+from revvy.utils.observable import Observable, ThrottleGroup
 from revvy.utils.thread_wrapper import ThreadWrapper, periodic
 from revvy.utils import error_reporter
 
@@ -29,6 +29,9 @@ if TYPE_CHECKING:
 
 log = get_logger("RobotStatePoller")
 
+# Time between two status reads [s]
+STATUS_POLL_INTERVAL = 0.005
+
 
 class RobotStatePoller(Emitter[RobotEvent]):
     """Maintain a consistent event driven state of the robot"""
@@ -47,9 +50,17 @@ class RobotStatePoller(Emitter[RobotEvent]):
         )
         self._timer = Observable(TimerData(0), throttle_interval=1)
 
-    def start_polling_mcu(self) -> None:
-        """Starts a new thread that runs every 5ms to check on MCU status."""
-        self._status_update_thread = periodic(self._update, 0.005, "RobotStatusUpdaterThread")
+        # Values that are sent to the mobile often. Their rate is lowered when the link is slow.
+        self.telemetry_throttle = ThrottleGroup()
+        self.telemetry_throttle.add(self._orientation)
+        self.telemetry_throttle.add(self._script_variables)
+
+    def start_polling_mcu(self, interval: float = STATUS_POLL_INTERVAL) -> None:
+        """
+        Starts a new thread that runs every 5ms to check on MCU status.
+        An interval of 0 reads the status as fast as the MCU responds.
+        """
+        self._status_update_thread = periodic(self._update, interval, "RobotStatusUpdaterThread")
 
         self._battery.subscribe(lambda data: self.trigger(RobotEvent.BATTERY_CHANGE, data))
         self._orientation.subscribe(lambda data: self.trigger(RobotEvent.ORIENTATION_CHANGE, data))
@@ -25,7 +25,6 @@ class Sound:
         # Users can upload their own sounds in the writeable assets folder.
         self._assets.add_source(WRITEABLE_ASSETS_DIR)
 
-        self._sounds = self._assets.category("sounds")
         self.set_volume = sound_interface.set_volume
         self.reset_volume = sound_interface.reset_volume
 
@@ -56,7 +55,8 @@ class Sound:
 
             # TODO: we should return a less ad-hoc sound handle here. Working with the thread
             # and the finished callback directly is not ideal.
-            player_thread = self._sound.play_sound(self._sounds[name], partial(self._finished, key))
+            sounds = self._assets.category("sounds")
+            player_thread = self._sound.play_sound(sounds[name], partial(self._finished, key))
             if player_thread:
                 self._playing[key] = (player_thread, callback)
                 return True
@@ -64,6 +64,11 @@ class Sound:
             self._log(f"Sound not found: {name}")
         return False
 
+    def reload_assets(self) -> None:
+        """Loads the sounds again, called when new assets were uploaded."""
+        self._log("Reloading sounds")
+        self._assets.reload()
+
     def play_tune_blocking(self, name: str):
         """Play a tune and wait for it to finish."""
         finished = Event()
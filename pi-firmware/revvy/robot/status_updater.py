@@ -1,10 +1,11 @@
 from enum import IntEnum
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 from revvy.mcu.rrrc_control import RevvyControl
 from revvy.utils.logger import get_logger
 
 
 StatusUpdater = Callable[[bytes], None]
+StatusTap = Callable[[bytes], None]
 
 
 class StatusSlot(IntEnum):
@@ -33,6 +34,22 @@ class StatusSlot(IntEnum):
         return StatusSlot(StatusSlot.SENSOR_1 + sensor_idx)
 
 
+def iter_slots(data: bytes) -> Iterator[tuple[int, bytes]]:
+    """
+    Splits the data read from the MCU into (slot, slot data) pairs.
+
+    >>> list(iter_slots(bytes([10, 2, 1, 2, 13, 0])))
+    [(10, b'\\x01\\x02'), (13, b'')]
+    """
+    idx = 0
+    while idx < len(data):
+        data_start = idx + 2
+        slot, slot_length = data[idx:data_start]
+        idx = data_start + slot_length
+
+        yield slot, data[data_start:idx]
+
+
 class McuStatusUpdater:
     """Class to read status from the MCU.
 
@@ -48,6 +65,7 @@ class McuStatusUpdater:
         self._is_enabled = [False] * len(StatusSlot)
         self._is_enabled[StatusSlot.RESET.value] = True
         self._handlers: list[Optional[StatusUpdater]] = [None] * len(StatusSlot)
+        self._tap: Optional[StatusTap] = None
         self._log = get_logger("McuStatusUpdater")
 
     def reset(self) -> None:
@@ -73,15 +91,18 @@ class McuStatusUpdater:
             self._interface.status_updater_control(slot_idx, False)
         self._handlers[slot_idx] = None
 
+    def set_tap(self, tap: Optional[StatusTap]) -> None:
+        """Sets a function that receives the raw data of every read, after the slots are handled"""
+        self._tap = tap
+
     def read(self) -> None:
         data = self._interface.status_updater_read()
 
-        idx = 0
-        while idx < len(data):
-            data_start = idx + 2
-            slot, slot_length = data[idx:data_start]
-            idx = data_start + slot_length
-
+        for slot, slot_data in iter_slots(data):
             handler = self._handlers[slot]
             if handler:
-                handler(data[data_start:idx])
+                handler(slot_data)
+
+        tap = self._tap
+        if tap:
+            tap(data)
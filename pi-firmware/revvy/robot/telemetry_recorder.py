@@ -0,0 +1,240 @@
+"""
+Records the motor and IMU data read from the MCU, to help tuning the motor and drivetrain
+controllers.
+
+Every status read (every 5ms) is stored as a fixed width record in a ring buffer. A background
+thread copies the records from the ring buffer into a preallocated, memory mapped file, so the
+status thread never waits for the disk.
+
+File format (little endian):
+    offset  size         content
+    0       HEADER.size  magic (RECORDING_MAGIC), record size, number of records
+    16      ...          records, see RECORD and RECORD_DTYPE
+
+A record is a snapshot of the latest known values. The `slots` field has a bit set for every
+StatusSlot that was updated by that read. The recording can be loaded with numpy:
+    numpy.fromfile(path, dtype=numpy.dtype(RECORD_DTYPE), count=count, offset=HEADER.size)
+See tools/recording.py.
+"""
+
+import mmap
+import os
+import struct
+import time
+from threading import Lock
+from typing import IO, NamedTuple, Optional
+
+from revvy.robot.imu import orientation3d_format, vec3d_format
+from revvy.robot.status_updater import McuStatusUpdater, StatusSlot, iter_slots
+from revvy.utils.logger import LogLevel, get_logger
+from revvy.utils.thread_wrapper import ThreadWrapper, periodic
+
+MOTOR_COUNT = 6
+
+RECORDING_MAGIC = b"RVYREC01"
+
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<dH6b6l6f3f3h3h")
+
+# numpy compatible description of RECORD
+RECORD_DTYPE = [
+    ("time", "<f8"),
+    ("slots", "<u2"),
+    ("motor_power", "i1", (MOTOR_COUNT,)),
+    ("motor_pos", "<i4", (MOTOR_COUNT,)),
+    ("motor_speed", "<f4", (MOTOR_COUNT,)),
+    ("orientation", "<f4", (3,)),
+    ("gyro", "<i2", (3,)),
+    ("acceleration", "<i2", (3,)),
+]
+
+# status, power, pos, speed, current task, see BaseDcMotorDriver.update_status
+_motor_status = struct.Struct("<bblfB")
+
+log = get_logger("TelemetryRecorder")
+
+
+class RecorderError(Exception):
+    pass
+
+
+class RecorderStats(NamedTuple):
+    recorded: int
+    """Number of records in the file"""
+
+    dropped: int
+    """Number of records lost because the file was full or the ring buffer overflowed"""
+
+
+class TelemetryRecorder:
+    def __init__(
+        self, status_updater: McuStatusUpdater, ring_size: int = 256, flush_interval: float = 0.1
+    ):
+        self._status_updater = status_updater
+        self._ring_size = ring_size
+        self._flush_interval = flush_interval
+
+        self._lock = Lock()
+        self._ring = bytearray(ring_size * RECORD.size)
+        self._written = 0
+        self._flushed = 0
+        self._dropped = 0
+
+        self._file: Optional[IO[bytes]] = None
+        self._map: Optional[mmap.mmap] = None
+        self._path: Optional[str] = None
+        self._capacity = 0
+        self._recorded = 0
+        self._full = False
+        self._flush_thread: Optional[ThreadWrapper] = None
+        self._start_time = 0.0
+
+        self._power = [0] * MOTOR_COUNT
+        self._pos = [0] * MOTOR_COUNT
+        self._speed = [0.0] * MOTOR_COUNT
+        self._orientation = (0.0, 0.0, 0.0)
+        self._gyro = (0, 0, 0)
+        self._acceleration = (0, 0, 0)
+
+    @property
+    def is_recording(self) -> bool:
+        return self._map is not None
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    @property
+    def stats(self) -> RecorderStats:
+        return RecorderStats(self._recorded, self._dropped)
+
+    def start(self, path: str, max_records: int = 200 * 60 * 5) -> None:
+        """
+        Starts recording into a new file.
+
+        @param path: the file to create
+        @param max_records: size of the file, recording stops when it is full
+        """
+        if self.is_recording:
+            raise RecorderError(f"Already recording into {self._path}")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        size = HEADER.size + max_records * RECORD.size
+        self._file = open(path, "w+b")
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._map, 0, RECORDING_MAGIC, RECORD.size, 0)
+
+        self._path = path
+        self._capacity = max_records
+        self._recorded = 0
+        self._full = False
+        self._written = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._start_time = time.monotonic()
+
+        self._flush_thread = periodic(self._flush, self._flush_interval, "TelemetryRecorder")
+        self._flush_thread.start()
+        self._status_updater.set_tap(self._record)
+
+        log(f"Recording into {path}")
+
+    def stop(self) -> RecorderStats:
+        """Stops recording, and shrinks the file to the recorded data."""
+        if not self.is_recording:
+            raise RecorderError("Not recording")
+
+        self._status_updater.set_tap(None)
+        assert self._flush_thread is not None
+        self._flush_thread.exit()
+        self._flush_thread = None
+        self._flush()
+
+        assert self._map is not None
+        assert self._file is not None
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._file.truncate(HEADER.size + self._recorded * RECORD.size)
+        self._file.close()
+        self._file = None
+
+        stats = self.stats
+        log(f"Recording stopped: {stats}")
+        return stats
+
+    def _record(self, data: bytes) -> None:
+        """Called by the status updater after every read"""
+        slots = 0
+        for slot, slot_data in iter_slots(data):
+            if slot <= StatusSlot.MOTOR_6:
+                if len(slot_data) != _motor_status.size:
+                    continue
+                _, power, pos, speed, _ = _motor_status.unpack(slot_data)
+                self._power[slot] = power
+                self._pos[slot] = pos
+                self._speed[slot] = speed
+            elif slot == StatusSlot.ORIENTATION:
+                self._orientation = orientation3d_format.unpack(slot_data)
+            elif slot == StatusSlot.GYROSCOPE:
+                self._gyro = vec3d_format.unpack(slot_data)
+            elif slot == StatusSlot.ACCELEROMETER:
+                self._acceleration = vec3d_format.unpack(slot_data)
+            else:
+                continue
+            slots |= 1 << slot
+
+        with self._lock:
+            offset = (self._written % self._ring_size) * RECORD.size
+            RECORD.pack_into(
+                self._ring,
+                offset,
+                time.monotonic() - self._start_time,
+                slots,
+                *self._power,
+                *self._pos,
+                *self._speed,
+                *self._orientation,
+                *self._gyro,
+                *self._acceleration,
+            )
+            self._written += 1
+
+    def _flush(self) -> None:
+        """Copies the records from the ring buffer into the file"""
+        mapped = self._map
+        if mapped is None:
+            return
+
+        with self._lock:
+            pending = self._written - self._flushed
+            if pending > self._ring_size:
+                # the oldest records were overwritten before they could be saved
+                self._dropped += pending - self._ring_size
+                pending = self._ring_size
+
+            # only copy in memory while the status thread may be waiting
+            start = (self._written - pending) % self._ring_size * RECORD.size
+            end = start + pending * RECORD.size
+            if end <= len(self._ring):
+                records = self._ring[start:end]
+            else:
+                records = self._ring[start:] + self._ring[: end - len(self._ring)]
+            self._flushed = self._written
+
+        count = min(pending, self._capacity - self._recorded)
+        self._dropped += pending - count
+
+        file_offset = HEADER.size + self._recorded * RECORD.size
+        mapped[file_offset : file_offset + count * RECORD.size] = records[: count * RECORD.size]
+        self._recorded += count
+
+        # keep the header up to date, so a recording is usable even if the robot crashes
+        HEADER.pack_into(mapped, 0, RECORDING_MAGIC, RECORD.size, self._recorded)
+
+        if self._recorded == self._capacity and not self._full:
+            self._full = True
+            self._status_updater.set_tap(None)
+            log("Recording file is full", LogLevel.WARNING)
@@ -321,3 +321,41 @@ class RobotConfig:
 
 
 empty_robot_config = RobotConfig()
+
+
+class ConfigDiff(NamedTuple):
+    """
+    Differences between two robot configurations.
+
+    Ports are not compared here. The ports may have been reset since the old configuration was
+    applied (e.g. by RobotManager.reset_configuration), so the robot manager compares the new
+    configuration with the one the ports currently have.
+    """
+
+    unchanged_scripts: set[str]
+    """Names of scripts that are bound the same way and run the same code in both configs."""
+
+
+def _script_bindings(config: RobotConfig) -> dict[str, tuple]:
+    scripts: list[ScriptDescriptor] = [analog["script"] for analog in config.controller.analog]
+    scripts += [script for script in config.controller.buttons if script]
+    scripts += config.background_scripts
+
+    # Analog channels and button indices are part of the script name
+    return {script.name: (script.source_hash, script.priority, script.ref_id) for script in scripts}
+
+
+def diff_configs(old: RobotConfig, new: RobotConfig) -> ConfigDiff:
+    """Compares two configurations, so that only the differences need to be applied."""
+    old_scripts = _script_bindings(old)
+    new_scripts = _script_bindings(new)
+
+    if old.motors.names == new.motors.names and old.sensors.names == new.sensors.names:
+        unchanged_scripts = {
+            name for name, binding in new_scripts.items() if old_scripts.get(name) == binding
+        }
+    else:
+        # Scripts refer to ports by name, they need to be rebuilt when the names change
+        unchanged_scripts = set()
+
+    return ConfigDiff(unchanged_scripts=unchanged_scripts)
@@ -7,11 +7,13 @@
 import enum
 import os
 import signal
-import traceback
 import time
-from threading import Event
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
 from typing import Optional
 
+from revvy.hardware_dependent.sound import SoundControlBase
 from revvy.mcu.rrrc_control import RevvyTransportBase
 from revvy.robot.ports.common import PortInstance
 from revvy.robot.ports.sensors.simple import BumperSwitch, ColorSensor, Hcsr04
@@ -25,7 +27,7 @@ from revvy.robot.remote_controller import (
 from revvy.robot.remote_controller import create_remote_controller_thread
 from revvy.robot.led_ring import RingLed
 from revvy.robot.robot_events import ProgramStatusChange, RobotEvent
-from revvy.robot.robot_state import RobotStatePoller
+from revvy.robot.robot_state import STATUS_POLL_INTERVAL, RobotStatePoller
 from revvy.robot.filters.sensor_data import (
     ButtonSensorDataFilter,
     ColorSensorDataFilter,
@@ -33,10 +35,14 @@ from revvy.robot.filters.sensor_data import (
     UltrasonicSensorDataFilter,
 )
 from revvy.robot.status import RobotStatus, RemoteControllerStatus
-from revvy.robot_config import RobotConfig, empty_robot_config
+from revvy.robot_config import RobotConfig, diff_configs, empty_robot_config
 from revvy.scripting.robot_interface import MotorConstants
 from revvy.scripting.runtime import ScriptEvent, ScriptHandle, ScriptManager
-from revvy.utils.logger import LogLevel, get_logger
+from revvy.scripting.script_errors import ScriptErrorFilter
+from revvy.scripting.watchdog import ScriptBudget, ScriptWatchdog
+from revvy.utils.binary_log import dump_binary_log
+from revvy.utils.logger import LogLevel, flush_logs, get_logger
+from revvy.utils.observable import ThrottleGroup
 from revvy.utils.stopwatch import Stopwatch
 from revvy.utils.error_reporter import RobotErrorType, revvy_error_handler
 from revvy.bluetooth.data_types import (
@@ -63,15 +69,28 @@ class RevvyStatusCode(enum.IntEnum):
     UPDATE_REQUEST = 3
 
 
+# CPU budgets of the user scripts by priority, 0 is the highest. Scripts that stay over their
+# budget are throttled, then interrupted with ScriptBudgetExceededError.
+SCRIPT_BUDGETS = {
+    0: ScriptBudget(cpu_share=0.5, raise_after=30.0),
+}
+LOW_PRIORITY_SCRIPT_BUDGET = ScriptBudget(cpu_share=0.3, raise_after=10.0)
+
+# Minimum time between two script error signals (LED animation and sound) [s]
+SCRIPT_ERROR_FEEDBACK_INTERVAL = 5
+
+
 class RobotManager:
     """High level class to manage robot state and configuration"""
 
-    def __init__(self, interface: RevvyTransportBase) -> None:
+    def __init__(
+        self, interface: RevvyTransportBase, sound_control: Optional[SoundControlBase] = None
+    ) -> None:
         self._log = get_logger("RobotManager")
         self.needs_interrupting = True
 
         self._configuring = False
-        self._robot = Robot(interface)
+        self._robot = Robot(interface, sound_control)
 
         rc = RemoteController()
         rcs = RemoteControllerScheduler(rc)
@@ -84,17 +103,27 @@ class RobotManager:
 
         self._robot_state = RobotStatePoller(self._robot, self.remote_controller)
 
-        self._scripts = ScriptManager(self._robot)
-        self._bg_controlled_scripts = ScriptManager(self._robot)
+        # Keeps runaway user scripts from starving the rest of the robot.
+        self._script_watchdog = ScriptWatchdog(SCRIPT_BUDGETS, LOW_PRIORITY_SCRIPT_BUDGET)
+        self._scripts = ScriptManager(self._robot, watchdog=self._script_watchdog)
+        self._bg_controlled_scripts = ScriptManager(self._robot, watchdog=self._script_watchdog)
+        self._script_errors = ScriptErrorFilter()
+        # The error signal blocks for seconds, don't play it on the script's thread
+        self._script_error_feedback = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ScriptErrorFeedback"
+        )
+        self._script_error_feedback_lock = Lock()
+        self._next_script_error_feedback = 0.0
         self._autonomous = 0
         self._config = empty_robot_config
+        self._sensor_data_filters: dict[int, SensorDataFilter] = {}
 
         self._status_code = RevvyStatusCode.OK
         self.exited = Event()
 
         self._session_id = 0
 
-        self._robot_state.on(RobotEvent.FATAL_ERROR, lambda *args: self.exit(RevvyStatusCode.ERROR))
+        self._robot_state.on(RobotEvent.FATAL_ERROR, lambda *args: self._on_fatal_error())
 
         self.on = self._robot_state.on
         self.on_all = self._robot_state.on_all
@@ -188,6 +217,16 @@ class RobotManager:
     def robot(self) -> Robot:
         return self._robot
 
+    @property
+    def telemetry_throttle(self) -> ThrottleGroup:
+        """Throttling of the values that are frequently reported to the connected interfaces."""
+        return self._robot_state.telemetry_throttle
+
+    def _on_fatal_error(self) -> None:
+        dump_binary_log("fatal_error")
+        flush_logs()
+        self.exit(RevvyStatusCode.ERROR)
+
     def exit(self, status_code: RevvyStatusCode):
         self._log(f"exit requested with code {status_code}")
         if self._status_code == RevvyStatusCode.OK:
@@ -202,9 +241,10 @@ class RobotManager:
         self.robot.sound.wait()
         return self._status_code
 
-    def robot_start(self) -> None:
+    def robot_start(self, status_poll_interval: float = STATUS_POLL_INTERVAL) -> None:
         # Start reading status from the robot.
-        self._robot_state.start_polling_mcu()
+        self._robot_state.start_polling_mcu(status_poll_interval)
+        self._script_watchdog.start()
 
         if self._robot.status.robot_status == RobotStatus.StartingUp:
             self._log("Waiting for MCU")
@@ -248,13 +288,26 @@ class RobotManager:
     def reset_configuration(self) -> None:
         """When RC disconnects"""
         self._log("Reset robot config")
+        self._reset_scripts()
+        self._reset_hardware()
+
+    def _reset_scripts(self, keep: Collection[str] = ()) -> None:
         self._robot.status.update_robot_status(RobotStatus.NotConfigured)
         self._scripts.stop_all_scripts()
         for scr in [self._scripts, self._bg_controlled_scripts]:
-            scr.reset()
+            scr.reset(keep)
             scr.assign("Motor", MotorConstants)
             scr.assign("RingLed", RingLed)
 
+    def _reset_hardware(
+        self,
+        preserved_motors: Collection[PortInstance] = (),
+        preserved_sensors: Collection[PortInstance] = (),
+    ) -> bool:
+        """
+        Resets the hardware, except the preserved ports. Returns False if the preserved ports
+        were reset too, because the MCU may have been reset.
+        """
         self._remote_controller_thread.stop()
         self.remote_controller.reset()
 
@@ -262,28 +315,59 @@ class RobotManager:
             res.reset()
 
         # ping robot, because robot may reset after stopping scripts
-        self._ping_robot()
+        mcu_may_have_reset = self._ping_robot()
+        if mcu_may_have_reset and (preserved_motors or preserved_sensors):
+            # the MCU forgets the port configuration when it resets
+            self._log("MCU did not respond, configuring every port", LogLevel.WARNING)
+            preserved_motors = preserved_sensors = ()
 
-        self._robot.reset()
+        self._robot.reset(preserved_motors, preserved_sensors)
 
         revvy_error_handler.read_mcu_errors(self._robot.robot_control)
 
+        return not mcu_may_have_reset
+
     def robot_configure(self, config: RobotConfig):
         """
         Does the bindings of ports, variables, sensors and motors
         background scripts and button scripts, starts the Remote.
+
+        Only the differences to the current configuration are applied: ports that are
+        already configured the same way are left untouched and scripts that did not change keep
+        their handles. New script handles are created in parallel with configuring the hardware.
         """
 
         log = get_logger("ApplyNewConfiguration")
+        stopwatch = Stopwatch()
+        diff = diff_configs(self._config, config)
         self._config = config
+        log(f"Unchanged scripts: {sorted(diff.unchanged_scripts)}")
 
-        self.reset_configuration()
+        unchanged_motors = [
+            port for port in self._robot.motors if port.config == config.motors[port.id]
+        ]
+        unchanged_sensors = [
+            port for port in self._robot.sensors if port.config == config.sensors[port.id]
+        ]
+
+        self._log("Reset robot config")
+        self._reset_scripts(keep=diff.unchanged_scripts)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ScriptSetup") as executor:
+            scripts = executor.submit(self._create_scripts, config)
+
+            if not self._reset_hardware(unchanged_motors, unchanged_sensors):
+                unchanged_motors = unchanged_sensors = []
+            self._configure_ports(config, unchanged_motors, unchanged_sensors)
+
+            analog_scripts, button_scripts = scripts.result()
 
         self._session_id += 1
         self.trigger(RobotEvent.SESSION_ID_CHANGE, self._session_id)
         log(f"New Configuration with session ID: {self._session_id}")
 
-        # Initialize variable slots from config
+        # Initialize variable slots from config. Slots are reset with the robot, so this must
+        # happen after the hardware is reset.
         scriptvars = []
         for varconf in config.controller.variable_slots:
             v = self._robot.script_variables.slot(varconf.slot)
@@ -292,8 +376,51 @@ class RobotManager:
 
         self._bg_controlled_scripts.assign("list_slots", scriptvars)
 
+        # set up remote controller
+        for channels, script_handle in analog_scripts:
+            self.remote_controller.on_analog_values(channels, script_handle)
+
+        # Set up all the bound buttons to run the stored scripts.
+        for button, script_handle in button_scripts:
+            script_handle.assign("list_slots", scriptvars)
+            self.remote_controller.link_button_to_runner(button, script_handle)
+
+        self._autonomous = config.background_initial_state
+
+        self.remote_controller.reset_background_control_state()
+        if config.background_initial_state == "running":
+            self._bg_controlled_scripts.start_all_scripts()
+
+        self._robot.status.update_robot_status(RobotStatus.Configured)
+
+        # Starts the listening for the messages.
+        self._remote_controller_thread.start()
+
+        # When configuration is done, in order to signal the app to enable
+        # the play button in autonomous mode, we need to indicate it
+        # with sending a status update.
+        self.trigger(
+            RobotEvent.BACKGROUND_CONTROL_STATE_CHANGE,
+            self.remote_controller.background_control_state,
+        )
+
+        log(
+            f"Configured in {stopwatch.elapsed:.3f}s, kept {len(unchanged_motors)} motor and "
+            f"{len(unchanged_sensors)} sensor ports"
+        )
+
+    def _configure_ports(
+        self,
+        config: RobotConfig,
+        unchanged_motors: Collection[PortInstance],
+        unchanged_sensors: Collection[PortInstance],
+    ) -> None:
+        log = get_logger("ApplyNewConfiguration")
+
         # set up motors
         for motor_port in self._robot.motors:
+            if motor_port in unchanged_motors:
+                continue
             motor_config = config.motors[motor_port.id]
             log(f"Configuring motor {motor_port.id} {motor_config}", LogLevel.DEBUG)
             motor_port.configure(motor_config)
@@ -306,10 +433,15 @@ class RobotManager:
 
         # configure sensors, attach filters to their data change.
         for sensor_port in self._robot.sensors:
-            sensor_config = config.sensors[sensor_port.id]
-            log(f"Configuring sensor {sensor_port.id} {sensor_config}", LogLevel.DEBUG)
-
-            sensor_port.configure(sensor_config)
+            previous_filter = self._sensor_data_filters.pop(sensor_port.id, None)
+            if sensor_port in unchanged_sensors:
+                # The driver is kept, only replace its filter to start the session from scratch
+                if previous_filter:
+                    sensor_port.driver.on_status_changed.remove(previous_filter.update)
+            else:
+                sensor_config = config.sensors[sensor_port.id]
+                log(f"Configuring sensor {sensor_port.id} {sensor_config}", LogLevel.DEBUG)
+                sensor_port.configure(sensor_config)
 
             # Create a data wrapper that exposes sensor data to the mobile app.
             filter = self._create_sensor_data_filter(sensor_port)
@@ -317,31 +449,51 @@ class RobotManager:
             if filter:
                 # Pipe the data changes into the filter.
                 sensor_port.driver.on_status_changed.add(filter.update)
+                self._sensor_data_filters[sensor_port.id] = filter
+                self.telemetry_throttle.add(filter.observable)
 
-        # set up remote controller
+    def _create_scripts(
+        self, config: RobotConfig
+    ) -> tuple[list[tuple[list[int], ScriptHandle]], list[tuple[int, ScriptHandle]]]:
+        """
+        Creates the script handles of the configuration. Handles that were kept from the previous
+        configuration are reused.
+
+        Returns the analog (channels, handle) and button (button index, handle) bindings, which are
+        applied when the hardware is ready.
+        """
+        log = get_logger("ApplyNewConfiguration")
+
+        analog_scripts = []
         for analog in config.controller.analog:
-            script_handle = self._scripts.add_script(analog["script"], config)
-            script_handle.on(ScriptEvent.ERROR, self._on_analog_script_error)
-            self.remote_controller.on_analog_values(analog["channels"], script_handle)
+            script = analog["script"]
+            if script.name in self._scripts:
+                script_handle = self._scripts[script.name]
+            else:
+                script_handle = self._scripts.add_script(script, config)
+                script_handle.on(ScriptEvent.ERROR, self._on_analog_script_error)
+            analog_scripts.append((analog["channels"], script_handle))
 
-        # Set up all the bound buttons to run the stored scripts.
+        button_scripts = []
         for button, script in enumerate(config.controller.buttons):
-            if script:
+            if script and script.name in self._scripts:
+                button_scripts.append((button, self._scripts[script.name]))
+            elif script:
                 log(
                     f"Binding button {button} to script {script.name} with source: \n\n{script.source}\n\n",
                     LogLevel.DEBUG,
                 )
                 script_handle = self._scripts.add_script(script, config)
-                script_handle.assign("list_slots", scriptvars)
-                self.remote_controller.link_button_to_runner(button, script_handle)
 
                 script_handle.on(ScriptEvent.START, self._on_button_script_running)
                 script_handle.on(ScriptEvent.STOP, self._on_button_script_stopped)
                 script_handle.on(ScriptEvent.ERROR, self._on_button_script_error)
-
-        self._autonomous = config.background_initial_state
+                button_scripts.append((button, script_handle))
 
         for script in config.background_scripts:
+            if script.name in self._bg_controlled_scripts:
+                continue
+
             bg_script_handle = self._bg_controlled_scripts.add_script(script, config)
 
             # For background scripts, now we do not send up program running states, as
@@ -355,22 +507,7 @@ class RobotManager:
             # I did not touch that for now, but this yells for some legwork in design.
             bg_script_handle.on(ScriptEvent.ERROR, self._on_bg_script_error)
 
-        self.remote_controller.reset_background_control_state()
-        if config.background_initial_state == "running":
-            self._bg_controlled_scripts.start_all_scripts()
-
-        self._robot.status.update_robot_status(RobotStatus.Configured)
-
-        # Starts the listening for the messages.
-        self._remote_controller_thread.start()
-
-        # When configuration is done, in order to signal the app to enable
-        # the play button in autonomous mode, we need to indicate it
-        # with sending a status update.
-        self.trigger(
-            RobotEvent.BACKGROUND_CONTROL_STATE_CHANGE,
-            self.remote_controller.background_control_state,
-        )
+        return analog_scripts, button_scripts
 
     def _create_sensor_data_filter(
         self,
@@ -416,38 +553,74 @@ class RobotManager:
                 )
             )
 
-    def _show_script_error(self, script_handle: ScriptHandle, exception: Exception):
+    def _format_script_error(self, script_handle: ScriptHandle, exception: Exception) -> str:
         """
-        Blocks thread for 2 seconds!
-        On code execution error, do send visible signals
-        to the user about the code being broken.
+        Formats the traceback of the first occurrence of an error. Repeated errors are only
+        logged in debug level, their formatted traceback is reused.
         """
-        self._log(f"ERROR in user script: {script_handle.descriptor.name}", LogLevel.ERROR)
-        self._log(f"ERROR: {str(exception)}", LogLevel.ERROR)
-        self._log(
-            f"Source that caused the error: \n\n{script_handle.descriptor.source}\n", LogLevel.ERROR
-        )
-        self._log(f"{traceback.format_exc()}", LogLevel.ERROR)
+        formatted, first = self._script_errors.format(script_handle.descriptor, exception)
+        if first:
+            self._log(f"ERROR in user script: {script_handle.descriptor.name}", LogLevel.ERROR)
+            self._log(f"ERROR: {str(exception)}", LogLevel.ERROR)
+            self._log(
+                f"Source that caused the error: \n\n{script_handle.descriptor.source}\n",
+                LogLevel.ERROR,
+            )
+            self._log(formatted, LogLevel.ERROR)
+        else:
+            self._log(
+                lambda: f"Repeated error in user script: {script_handle.descriptor.name}",
+                LogLevel.DEBUG,
+            )
 
-        # Brain bug LED effect with "uh oh" sound.
-        self._robot.led.start_animation(RingLed.Bug)
-        self._robot.sound.play_tune_blocking("s_bug")
-        self._robot.led.start_animation(RingLed.Off)
+        return formatted
+
+    def _show_script_error(self) -> None:
+        """
+        On code execution error, do send visible signals to the user about the code being broken.
+        The signal is played in the background, at most once in SCRIPT_ERROR_FEEDBACK_INTERVAL.
+        """
+        if not self._script_error_feedback_lock.acquire(blocking=False):
+            # already playing
+            return
+
+        if time.monotonic() < self._next_script_error_feedback:
+            self._script_error_feedback_lock.release()
+            return
+
+        try:
+            self._script_error_feedback.submit(self._play_script_error_feedback)
+        except Exception:
+            # e.g. the executor is shut down, don't block the feedback forever
+            self._script_error_feedback_lock.release()
+            raise
+
+    def _play_script_error_feedback(self) -> None:
+        """Blocks thread for 2 seconds!"""
+        try:
+            # Brain bug LED effect with "uh oh" sound.
+            self._robot.led.start_animation(RingLed.Bug)
+            self._robot.sound.play_tune_blocking("s_bug")
+            self._robot.led.start_animation(RingLed.Off)
+        finally:
+            self._next_script_error_feedback = time.monotonic() + SCRIPT_ERROR_FEEDBACK_INTERVAL
+            self._script_error_feedback_lock.release()
 
     def _on_analog_script_error(self, script_handle: ScriptHandle, exception: Exception):
         """Analog script errors run in separate thread, report them as System errors."""
-        revvy_error_handler.report_error(RobotErrorType.SYSTEM, traceback.format_exc())
+        revvy_error_handler.report_error(
+            RobotErrorType.SYSTEM, self._format_script_error(script_handle, exception)
+        )
 
     def _on_bg_script_error(self, script_handle: ScriptHandle, exception: Exception):
 
         revvy_error_handler.report_error(
             RobotErrorType.BLOCKLY_BACKGROUND,
-            traceback.format_exc(),
+            self._format_script_error(script_handle, exception),
             script_handle.descriptor.ref_id,
         )
 
-        # Do it at the and as it's blocking.
-        self._show_script_error(script_handle, exception)
+        self._show_script_error()
 
     def _report_button_script_state_change(self, script_handle: ScriptHandle, state: ScriptEvent):
         assert script_handle.descriptor.ref_id is not None
@@ -468,11 +641,12 @@ class RobotManager:
         self._report_button_script_state_change(script_handle, ScriptEvent.ERROR)
 
         revvy_error_handler.report_error(
-            RobotErrorType.BLOCKLY_BUTTON, traceback.format_exc(), script_handle.descriptor.ref_id
+            RobotErrorType.BLOCKLY_BUTTON,
+            self._format_script_error(script_handle, exception),
+            script_handle.descriptor.ref_id,
         )
 
-        # Do it at the end as it's blocking.
-        self._show_script_error(script_handle, exception)
+        self._show_script_error()
 
     def _on_button_script_stopped(self, script_handle: ScriptHandle, data):
         self._report_button_script_state_change(script_handle, ScriptEvent.STOP)
@@ -485,10 +659,13 @@ class RobotManager:
         self._remote_controller_thread.exit()
         self.trigger(RobotEvent.STOPPED)
         self._scripts.reset()
+        self._script_watchdog.exit()
         self._robot.stop()
 
-    def _ping_robot(self, timeout=0) -> None:
+    def _ping_robot(self, timeout=0) -> bool:
+        """Waits for the MCU to respond. Returns True if the first ping failed."""
         stopwatch = Stopwatch()
+        retried = False
         retry_ping = True
         self._log("pinging")
         while retry_ping:
@@ -497,6 +674,9 @@ class RobotManager:
                 self._robot.ping()
             except (BrokenPipeError, IOError, OSError):
                 retry_ping = True
+                retried = True
                 time.sleep(0.1)
                 if timeout != 0 and stopwatch.elapsed > timeout:
                     raise TimeoutError
+
+        return retried
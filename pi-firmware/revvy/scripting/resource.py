@@ -1,7 +1,8 @@
 import abc
 from threading import Lock
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, NamedTuple, Optional, Union
 
+from revvy.utils.binary_log import get_binary_logger
 from revvy.utils.emitter import SimpleEventEmitter
 from revvy.utils.logger import get_logger, LogLevel
 
@@ -93,6 +94,15 @@ class ResourceHandle(BaseHandle):
         return self._is_interrupted
 
 
+class ResourceStats(NamedTuple):
+    requests: int
+    """Number of requests"""
+    taken_over: int
+    """Requests that interrupted an other owner"""
+    denied: int
+    """Requests that failed because a higher priority owner held the resource"""
+
+
 class Resource:
     """
     A global token that symbolizes some shared hardware element, implementing priority-based access.
@@ -103,8 +113,13 @@ class Resource:
     def __init__(self, name: Union[str, list[str]] = "Resource"):
         self._lock = Lock()
         self._log = get_logger(name, LogLevel.DEBUG)
+        self._trace = get_binary_logger(self._log.tag)
         self._current_priority = -1
-        self._active_handle = null_handle
+        self._active_handle: Union[ResourceHandle, NullHandle] = null_handle
+
+        self._requests = 0
+        self._taken_over = 0
+        self._denied = 0
 
     def __enter__(self) -> bool:
         return self._lock.__enter__()
@@ -123,34 +138,57 @@ class Resource:
 
             self._current_priority = -1
 
+    @property
+    def stats(self) -> ResourceStats:
+        return ResourceStats(self._requests, self._taken_over, self._denied)
+
     def request(
         self, with_priority=0, on_taken_away: Optional[Callable[[], None]] = None
     ) -> BaseHandle:
+        """
+        Requests the resource. Returns a handle that evaluates to False if the resource is held by
+        a higher priority owner.
+
+        A script that already holds the resource gets its handle from its Wrapper, without
+        calling this method.
+        """
         with self._lock:
+            self._requests += 1
+
             if not self._active_handle:
-                self._log(f"create handle for priority {with_priority}")
-                self._create_new_handle(with_priority, on_taken_away)
-                return self._active_handle
+                return self._create_new_handle(with_priority, on_taken_away)
 
             elif self._current_priority >= with_priority:
+                self._taken_over += 1
+                self._trace(
+                    "taken over (request: %d, holder: %d)", with_priority, self._current_priority
+                )
                 self._log(
-                    f"taking from lower prio owner (request: {with_priority}, holder: {self._current_priority})"
+                    lambda: f"taking from lower prio owner (request: {with_priority}, "
+                    f"holder: {self._current_priority})"
                 )
                 self._active_handle.interrupt()
-                self._create_new_handle(with_priority, on_taken_away)
-                return self._active_handle
+                return self._create_new_handle(with_priority, on_taken_away)
 
             else:
+                self._denied += 1
+                self._trace(
+                    "denied (request: %d, holder: %d)", with_priority, self._current_priority
+                )
                 self._log(
-                    f"failed to take resource (request: {with_priority}, holder: {self._current_priority})"
+                    lambda: f"failed to take resource (request: {with_priority}, "
+                    f"holder: {self._current_priority})"
                 )
                 return null_handle
 
-    def _create_new_handle(self, with_priority, on_taken_away) -> None:
-        self._current_priority = with_priority
-        self._active_handle = ResourceHandle(self)
+    def _create_new_handle(self, with_priority, on_taken_away) -> ResourceHandle:
+        handle = ResourceHandle(self)
         if on_taken_away:
-            self._active_handle.on_interrupted.add(on_taken_away)
+            handle.on_interrupted.add(on_taken_away)
+
+        self._current_priority = with_priority
+        self._active_handle = handle
+        return handle
 
     def release(self, resource_handle) -> None:
         with self._lock:
@@ -109,6 +109,8 @@ class Wrapper(ABC):
             self._script.log("Trying to take resource but script is stopping")
             raise InterruptedError
 
+        self._script.check_budget()
+
         if self._current_handle:
             return self._current_handle
 
@@ -158,6 +160,8 @@ class SensorPortWrapper(Wrapper):
         if self._script.is_stop_requested:
             raise InterruptedError
 
+        self._script.check_budget()
+
         while not self._sensor.driver.has_data:
             self._script.sleep(0.1)
 
@@ -1,6 +1,10 @@
 """ Handles blockly and analog script running lifecycle """
 
+from collections import ChainMap
+from collections.abc import Collection
 from enum import Enum
+from functools import cached_property
+import hashlib
 from threading import Event
 import time
 
@@ -13,10 +17,12 @@ if TYPE_CHECKING:
     from revvy.robot.robot import Robot
     from revvy.robot_config import RobotConfig
     from revvy.scripting.variables import Variable
+    from revvy.scripting.watchdog import ScriptWatchdog
 
 from revvy.utils.logger import get_logger
 from revvy.utils.thread_wrapper import ThreadContext, ThreadWrapper, ThreadWrapperState
 from revvy.scripting.robot_interface import RobotWrapper
+from revvy.scripting.watchdog import ScriptBudgetExceededError
 
 
 class ScriptEvent(Enum):
@@ -46,6 +52,10 @@ class ScriptDescriptor:
         self.source = source
         self.ref_id = ref_id
 
+    @cached_property
+    def source_hash(self) -> str:
+        return hashlib.md5(self.source.encode("utf-8")).hexdigest()
+
     @staticmethod
     def from_string(
         name: str, source: str, priority: int, ref_id: Optional[int] = None
@@ -60,9 +70,9 @@ class ScriptDescriptor:
 
 
 class TimeWrapper:
-    def __init__(self, ctx: ThreadContext):
+    def __init__(self, sleep: Callable[[float], None]):
         self.time = time.time
-        self.sleep = ctx.sleep
+        self.sleep = sleep
 
 
 class ScriptHandle(Emitter[ScriptEvent]):
@@ -76,13 +86,18 @@ class ScriptHandle(Emitter[ScriptEvent]):
     def __init__(self, owner: "ScriptManager", descriptor: ScriptDescriptor, name):
         super().__init__()
         self._owner = owner
-        # Copy globals from the owner. Variables assigned to the owner after this point will be
-        # propagated down, but variables assigned to this script will not be shared between scripts.
-        self._globals = owner._globals.copy()
-        self._inputs = {}
+        # Script-local variables are layered over the globals of the owner. Variables assigned to
+        # the owner are visible through the chain, but variables assigned to this script will not
+        # be shared between scripts.
+        self._globals = ChainMap({}, owner._globals)
+        # Flattened copy of `_globals`, rebuilt only when either layer changes.
+        self._namespace: dict[str, Any] = {}
+        self._namespace_version = -1
+        self._inputs: dict[str, Any] = {}
         self.name = name
         self.descriptor = descriptor
         self.sleep = self._prevent_incorrect_sleep
+        self._budget_exceeded = False
         self._thread = ThreadWrapper(self._run, name)
         self.log = get_logger(["Script", name])
         self.stop = self._thread.stop
@@ -104,20 +119,43 @@ class ScriptHandle(Emitter[ScriptEvent]):
 
     @property
     def is_stop_requested(self) -> bool:
-        return self._thread.state in [ThreadWrapperState.STOPPING, ThreadWrapperState.STOPPED]
+        return self._thread.state in (ThreadWrapperState.STOPPING, ThreadWrapperState.STOPPED)
 
     @property
     def is_running(self) -> bool:
         return self._thread.is_running
 
+    def interrupt_budget_exceeded(self) -> None:
+        """Called by the watchdog. The error is raised in the script by `check_budget`."""
+        self._budget_exceeded = True
+
+    def check_budget(self) -> None:
+        """
+        Raises ScriptBudgetExceededError if the watchdog interrupted the script. Must only be
+        called from the script's thread, at points where it holds no locks of the robot.
+        """
+        if self._budget_exceeded:
+            self._budget_exceeded = False
+            raise ScriptBudgetExceededError
+
     @property
     def priority(self) -> int:
         return self.descriptor.priority
 
     def assign(self, name: str, value):
         self._globals[name] = value
+        self._namespace_version = -1
+
+    def _get_namespace(self) -> dict[str, Any]:
+        version = self._owner._globals_version
+        if self._namespace_version != version:
+            self._namespace = dict(self._globals)
+            self._namespace_version = version
+
+        return self._namespace
 
     def _run(self, ctx: ThreadContext):
+        watchdog = None
         try:
             # script control interface
             def _terminate() -> None:
@@ -131,14 +169,29 @@ class ScriptHandle(Emitter[ScriptEvent]):
             # We provide a custom sleep implementation to the scripts, so they can be interrupted
             # Using the default `time.sleep` would make it impossible to stop the script in a timely
             # manner
-            self.sleep = ctx.sleep
+            def _sleep(seconds: float) -> None:
+                self.check_budget()
+                ctx.sleep(seconds)
+
+            self.sleep = _sleep
+            self._budget_exceeded = False
+            watchdog = self._owner.watchdog
+            if watchdog:
+                watchdog.watch(self)
             self.log("Starting script")
             self.trigger(ScriptEvent.START)
-            self.descriptor.runnable(Control=ctx, ctx=ctx, time=TimeWrapper(ctx), **self._inputs)
+
+            namespace = self._get_namespace()
+            if self._inputs:
+                namespace = {**namespace, **self._inputs}
+
+            self.descriptor.runnable(Control=ctx, ctx=ctx, time=TimeWrapper(_sleep), **namespace)
         except InterruptedError:
             self.log("Interrupted")
             raise
         finally:
+            if watchdog:
+                watchdog.unwatch()
             # restore to release reference on context
             self.log("Script finished")
             self.sleep = self._prevent_incorrect_sleep
@@ -150,36 +203,39 @@ class ScriptHandle(Emitter[ScriptEvent]):
             var.reset_value()
 
     def start(self, **kwargs) -> None:
-        if not kwargs:
-            self._inputs = self._globals
-        else:
-            self._inputs = {**self._globals, **kwargs}
-
+        self._inputs = kwargs
         self._thread.start()
 
 
 class ScriptManager:
-    def __init__(self, robot: "Robot", wrapper=RobotWrapper):
+    def __init__(
+        self, robot: "Robot", wrapper=RobotWrapper, watchdog: Optional["ScriptWatchdog"] = None
+    ):
         self._robot = robot
+        self.watchdog = watchdog
         self._globals: dict[str, Any] = {}
+        # Incremented when `_globals` changes so scripts know to refresh their namespace.
+        self._globals_version = 0
         self._scripts: dict[str, ScriptHandle] = {}
         self._log = get_logger("ScriptManager")
         self._wrapper = wrapper
 
-    def reset(self) -> None:
+    def reset(self, keep: Collection[str] = ()) -> None:
+        """Stops all scripts and removes them, except the ones named in `keep`."""
         self.stop_all_scripts()
-        for script in self._scripts.values():
-            script.cleanup()
+        for name, script in list(self._scripts.items()):
+            if name not in keep:
+                script.cleanup()
+                del self._scripts[name]
 
         self._globals.clear()
-        self._scripts.clear()
+        self._globals_version += 1
 
-        self._log("stop all scripts and reset state")
+        self._log(f"stop all scripts and reset state, kept {len(self._scripts)} scripts")
 
     def assign(self, name: str, value):
         self._globals[name] = value
-        for script in self._scripts.values():
-            script.assign(name, value)
+        self._globals_version += 1
 
     def add_script(
         self,
@@ -218,6 +274,9 @@ class ScriptManager:
     def __getitem__(self, name: str) -> ScriptHandle:
         return self._scripts[name]
 
+    def __contains__(self, name: str) -> bool:
+        return name in self._scripts
+
     def stop_all_scripts(self, wait: bool = True):
         events: list[Event] = []
         for script in self._scripts.values():
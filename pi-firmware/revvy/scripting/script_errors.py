@@ -0,0 +1,65 @@
+"""
+Deduplication of user script errors.
+
+A script that fails on every remote controller message raises the same exception many times per
+second. Formatting the traceback on every occurrence is expensive, so errors are identified by the
+script, the code location that raised them and the message, and only the first occurrence is
+formatted. The repeated occurrences reuse the formatted text, so the ErrorHandler can count them.
+"""
+
+from collections import OrderedDict
+import traceback
+from threading import Lock
+from typing import Hashable
+
+from revvy.scripting.runtime import ScriptDescriptor
+
+# Number of distinct script errors whose formatted traceback is kept
+MAX_SCRIPT_ERRORS = 32
+
+
+def error_location(exception: BaseException) -> tuple[str, int]:
+    """Returns the file and line of the innermost frame that raised the exception"""
+    tb = exception.__traceback__
+    if tb is None:
+        return "", 0
+
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+
+    return tb.tb_frame.f_code.co_filename, tb.tb_lineno
+
+
+class ScriptErrorFilter:
+    def __init__(self, max_errors: int = MAX_SCRIPT_ERRORS):
+        self._max_errors = max_errors
+        self._lock = Lock()
+        # least recently seen first
+        self._errors: OrderedDict[Hashable, str] = OrderedDict()
+
+    def format(self, descriptor: ScriptDescriptor, exception: BaseException) -> tuple[str, bool]:
+        """Returns the formatted traceback, and whether this is the first occurrence of the error"""
+        key = (
+            descriptor.name,
+            descriptor.source_hash,
+            type(exception),
+            str(exception),
+            *error_location(exception),
+        )
+
+        with self._lock:
+            formatted = self._errors.get(key)
+            if formatted is not None:
+                self._errors.move_to_end(key)
+                return formatted, False
+
+        formatted = "".join(
+            traceback.format_exception(type(exception), exception, exception.__traceback__)
+        )
+
+        with self._lock:
+            self._errors[key] = formatted
+            if len(self._errors) > self._max_errors:
+                self._errors.popitem(last=False)
+
+        return formatted, True
@@ -0,0 +1,166 @@
+"""
+CPU budget enforcement for user scripts.
+
+User scripts are plain Python running in their own threads. A tight loop without `sleep` holds on
+to the GIL and starves the threads that keep the robot running (status polling, BLE). The watchdog
+samples the CPU time of every running script thread and
+- shortens the interpreter's thread switch interval while a script is over its budget, so that the
+  other threads get the GIL back quickly (a forced, cooperative yield of the script)
+- optionally raises `ScriptBudgetExceededError` in the script if it stays over its budget for too
+  long. The error can be caught by the script, otherwise it is reported like any script error.
+
+The error is not injected asynchronously: that could interrupt the script while it is inside the
+robot interface, holding the transport or resource locks. The script is only flagged, and the
+error is raised at the next safe point, see ScriptHandle.check_budget. A loop that never sleeps nor
+uses the robot is only throttled.
+"""
+
+import sys
+import time
+from threading import Lock, get_ident
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from revvy.utils.logger import LogLevel, get_logger
+from revvy.utils.thread_wrapper import periodic
+
+if TYPE_CHECKING:
+    from revvy.scripting.runtime import ScriptHandle
+
+
+class ScriptBudgetExceededError(Exception):
+    """Raised in a script that used more CPU time than its budget allows."""
+
+
+class ScriptBudget(NamedTuple):
+    cpu_share: float
+    """Share of a CPU core (0..1) the script may use, measured over a watchdog period."""
+
+    raise_after: Optional[float] = None
+    """Seconds of continuous overuse after which the script is interrupted. None to only yield."""
+
+
+DEFAULT_SCRIPT_BUDGET = ScriptBudget(cpu_share=0.5)
+
+# Switch interval used while a script is over its budget. The default of the interpreter is 5ms.
+THROTTLED_SWITCH_INTERVAL = 0.0005
+
+
+def _thread_cpu_clock(thread_id: int) -> Optional[int]:
+    try:
+        return time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError):
+        # Not supported on this platform
+        return None
+
+
+class _WatchedScript:
+    def __init__(self, script: "ScriptHandle", thread_id: int, clock_id: int):
+        self.script = script
+        self.thread_id = thread_id
+        self.clock_id = clock_id
+        self.last_cpu_time = time.clock_gettime(clock_id)
+        self.last_wall_time = time.monotonic()
+        self.over_budget_since: Optional[float] = None
+        self.interrupted = False
+
+
+class ScriptWatchdog:
+    """Samples the CPU time of running scripts and throttles or interrupts the ones over budget."""
+
+    def __init__(
+        self,
+        budgets: Optional[dict[int, ScriptBudget]] = None,
+        default_budget: ScriptBudget = DEFAULT_SCRIPT_BUDGET,
+        period: float = 0.5,
+    ):
+        self._log = get_logger("ScriptWatchdog")
+        self._budgets = budgets or {}
+        self._default_budget = default_budget
+        self._lock = Lock()
+        self._scripts: dict[int, _WatchedScript] = {}
+        self._normal_switch_interval = sys.getswitchinterval()
+        self._is_throttling = False
+        self._thread = periodic(self.check, period, "ScriptWatchdog")
+
+    def budget(self, priority: int) -> ScriptBudget:
+        return self._budgets.get(priority, self._default_budget)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def exit(self) -> None:
+        self._thread.exit()
+        self._set_throttling(False)
+
+    def watch(self, script: "ScriptHandle") -> None:
+        """Start watching the calling thread. Called by the script thread itself."""
+        thread_id = get_ident()
+        clock_id = _thread_cpu_clock(thread_id)
+        if clock_id is None:
+            return
+
+        with self._lock:
+            self._scripts[thread_id] = _WatchedScript(script, thread_id, clock_id)
+
+    def unwatch(self) -> None:
+        """Stop watching the calling thread. Called by the script thread itself."""
+        with self._lock:
+            self._scripts.pop(get_ident(), None)
+
+    def check(self) -> None:
+        """Sample CPU usage of the watched scripts and enforce their budgets."""
+        any_over_budget = False
+
+        with self._lock:
+            for watched in self._scripts.values():
+                now = time.monotonic()
+                try:
+                    cpu_time = time.clock_gettime(watched.clock_id)
+                except OSError:
+                    # thread exited in the meantime
+                    continue
+
+                elapsed = now - watched.last_wall_time
+                if elapsed <= 0:
+                    continue
+
+                cpu_share = (cpu_time - watched.last_cpu_time) / elapsed
+                watched.last_cpu_time = cpu_time
+                watched.last_wall_time = now
+
+                budget = self.budget(watched.script.priority)
+                if cpu_share <= budget.cpu_share:
+                    watched.over_budget_since = None
+                    continue
+
+                any_over_budget = True
+                if watched.over_budget_since is None:
+                    watched.over_budget_since = now
+                    self._log(
+                        f"{watched.script.name} is over its CPU budget ({cpu_share:.0%})",
+                        LogLevel.WARNING,
+                    )
+
+                if (
+                    budget.raise_after is not None
+                    and not watched.interrupted
+                    and now - watched.over_budget_since >= budget.raise_after
+                ):
+                    self._interrupt(watched)
+
+        self._set_throttling(any_over_budget)
+
+    def _interrupt(self, watched: _WatchedScript) -> None:
+        self._log(f"Interrupting {watched.script.name}", LogLevel.WARNING)
+        watched.interrupted = True
+        watched.script.interrupt_budget_exceeded()
+
+    def _set_throttling(self, throttle: bool) -> None:
+        if throttle == self._is_throttling:
+            return
+
+        self._is_throttling = throttle
+        if throttle:
+            sys.setswitchinterval(THROTTLED_SWITCH_INTERVAL)
+        else:
+            sys.setswitchinterval(self._normal_switch_interval)
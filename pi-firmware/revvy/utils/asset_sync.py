@@ -0,0 +1,146 @@
+"""
+Incremental extraction of asset archives.
+
+The assets uploaded by the app are a tar.gz archive. Usually only a few files change between two
+uploads, so instead of deleting and extracting everything, the archive is streamed and only the
+files that differ from the already extracted ones are written. The checksums of the extracted
+files are kept in a manifest file in the destination directory. Files that are not in the archive
+are removed, even if they were not extracted by an earlier sync (e.g. the directory was created
+by an older firmware that did not write a manifest).
+
+Changed files are written to a temporary file first and renamed into place, so a file is either
+the old or the new version, even if the extraction is interrupted.
+"""
+
+import hashlib
+import json
+import os
+import tarfile
+from typing import IO, NamedTuple
+
+from revvy.utils.functions import read_json
+from revvy.utils.logger import get_logger
+
+MANIFEST_FILE = ".manifest.json"
+
+# the checksum of the whole archive, written by the caller to skip syncing the same archive again
+HASH_FILE = ".hash"
+
+# files in the destination directory that are not part of the archive, but must not be removed
+_METADATA_FILES = {MANIFEST_FILE, HASH_FILE}
+
+log = get_logger("AssetSync")
+
+
+class AssetSyncResult(NamedTuple):
+    written: int
+    """Number of files that were new or changed"""
+
+    unchanged: int
+    """Number of files that were skipped because they did not change"""
+
+    removed: int
+    """Number of files removed because they are no longer in the archive"""
+
+    @property
+    def changed(self) -> bool:
+        return self.written > 0 or self.removed > 0
+
+
+def _read_manifest(directory: str) -> dict[str, str]:
+    try:
+        return read_json(os.path.join(directory, MANIFEST_FILE))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_file_atomic(path: str, data: bytes) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _member_path(directory: str, name: str) -> str:
+    """Returns where an archive member should be extracted. Refuses paths outside `directory`."""
+    path = os.path.normpath(os.path.join(directory, name))
+    if os.path.commonpath([directory, path]) != directory or path == directory:
+        raise ValueError(f"Invalid path in archive: {name}")
+    return path
+
+
+def _remove_stale_files(directory: str, keep: set[str], keep_directories: set[str]) -> int:
+    """Removes the files and empty directories that are not in the archive"""
+    removed = 0
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for file in files:
+            path = os.path.join(root, file)
+            name = os.path.relpath(path, directory)
+            if name not in keep and name not in _METADATA_FILES:
+                os.unlink(path)
+                removed += 1
+
+        for subdirectory in dirs:
+            path = os.path.join(root, subdirectory)
+            if os.path.relpath(path, directory) not in keep_directories and not os.listdir(path):
+                os.rmdir(path)
+
+    return removed
+
+
+def sync_tar_archive(archive: IO[bytes], directory: str) -> AssetSyncResult:
+    """
+    Extracts the changed files of a gzipped tar archive into `directory`, and removes the files
+    that are no longer in the archive.
+
+    @param archive: the archive, it is read as a stream
+    @param directory: the destination directory
+    """
+    directory = os.path.realpath(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    old_manifest = _read_manifest(directory)
+    manifest: dict[str, str] = {}
+    directories: set[str] = set()
+    written = 0
+    unchanged = 0
+
+    with tarfile.open(fileobj=archive, mode="r|gz") as tar:
+        for member in tar:
+            path = _member_path(directory, member.name)
+
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+                directories.add(os.path.relpath(path, directory))
+                continue
+
+            if not member.isfile():
+                log(f"Skipping {member.name}, only regular files are extracted")
+                continue
+
+            source = tar.extractfile(member)
+            assert source is not None
+            data = source.read()
+
+            name = os.path.relpath(path, directory)
+            checksum = hashlib.md5(data).hexdigest()
+            manifest[name] = checksum
+
+            if old_manifest.get(name) == checksum and os.path.isfile(path):
+                unchanged += 1
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_file_atomic(path, data)
+            written += 1
+
+    removed = _remove_stale_files(directory, set(manifest), directories)
+
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    _write_file_atomic(manifest_path, json.dumps(manifest, sort_keys=True).encode())
+
+    result = AssetSyncResult(written, unchanged, removed)
+    log(f"Synced {directory}: {result}")
+    return result
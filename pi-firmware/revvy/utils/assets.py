@@ -9,7 +9,8 @@ from revvy.utils.logger import get_logger, LogLevel
 class Assets:
     def __init__(self) -> None:
         self._log = get_logger("Assets")
-        self._files = defaultdict(dict)
+        self._files: defaultdict[str, dict[str, str]] = defaultdict(dict)
+        self._sources: list[str] = []
 
     def add_source(self, path: str):
         """
@@ -17,6 +18,19 @@ class Assets:
 
         @param path: the asset folder with an assets.json file inside
         """
+        self._sources.append(path)
+        self._load_source(path, self._files)
+
+    def reload(self) -> None:
+        """Loads the asset sources again, e.g. after their contents were updated."""
+        files: defaultdict[str, dict[str, str]] = defaultdict(dict)
+        for path in self._sources:
+            self._load_source(path, files)
+
+        # replace the whole collection at once, so readers never see a partially loaded one
+        self._files = files
+
+    def _load_source(self, path: str, into: defaultdict[str, dict[str, str]]):
         assets_json = os.path.join(path, "assets.json")
         try:
             manifest = read_json(assets_json)
@@ -24,11 +38,11 @@ class Assets:
             files: dict[str, dict[str, str]] = manifest["files"]
             for category, assets in files.items():
                 for asset_name, asset_path in assets.items():
-                    if asset_name in self._files[category]:
+                    if asset_name in into[category]:
                         self._log(f"{path} shadows asset {asset_name}")
 
                     # self._log(f'New asset: ({category}) {asset_name}', LogLevel.DEBUG)
-                    self._files[category][asset_name] = os.path.join(path, asset_path)
+                    into[category][asset_name] = os.path.join(path, asset_path)
         except FileNotFoundError:
             self._log(f"Asset source does not exist: {path}", LogLevel.WARNING)
         except Exception:
@@ -0,0 +1,187 @@
+"""
+In-memory binary log, for high volume debug logging that can be inspected after something went
+wrong.
+
+Writing a message only packs its numeric arguments into a fixed size record of a preallocated
+ring buffer, the format string is stored once and referenced by its index. The messages are
+formatted when the log is dumped: on an uncaught exception, on a fatal MCU communication error
+or when requested through the WebSocket API (see tools/read_errors.py). The oldest records are
+overwritten, so the log always contains the last `capacity` messages.
+
+    trace = get_binary_logger("[Motor]")
+    trace("set_power %d on port %d", power, port_id)
+
+Dump file format (little endian):
+    HEADER              magic (DUMP_MAGIC), record size, number of records, length of the table
+    table               JSON object with the "loggers" and "formats" lists, UTF-8
+    records             RECORD, oldest first
+"""
+
+import json
+import os
+import struct
+import time
+from threading import Lock
+from typing import Optional, Union
+
+from revvy.utils.directories import LOG_DUMPS_DIR
+from revvy.utils.logger import START_TIME, LogLevel, get_logger
+
+DUMP_MAGIC = b"RVYLOG01"
+
+MAX_ARGS = 4
+
+HEADER = struct.Struct("<8sIII")
+# timestamp, logger id, format id, level, number of arguments, arguments
+RECORD = struct.Struct(f"<dHHBB{MAX_ARGS}d")
+
+LEVEL_NAMES = ("Debug", "Info", "Warning", "Error")
+
+# number of dump files kept in LOG_DUMPS_DIR
+MAX_DUMPS = 10
+
+_padding = (0.0,) * MAX_ARGS
+
+Number = Union[int, float]
+
+log = get_logger("BinaryLog")
+
+
+class BinaryLog:
+    def __init__(self, capacity: int = 8192):
+        self._capacity = capacity
+        self._ring = bytearray(capacity * RECORD.size)
+        self._written = 0
+        self._lock = Lock()
+
+        self._loggers: list[str] = []
+        self._logger_ids: dict[str, int] = {}
+        self._formats: list[str] = []
+        self._format_ids: dict[str, int] = {}
+
+    def register_logger(self, tag: str) -> int:
+        with self._lock:
+            if tag not in self._logger_ids:
+                self._logger_ids[tag] = len(self._loggers)
+                self._loggers.append(tag)
+            return self._logger_ids[tag]
+
+    def _format_id(self, fmt: str) -> int:
+        format_id = self._format_ids.get(fmt)
+        if format_id is None:
+            with self._lock:
+                format_id = self._format_ids.get(fmt)
+                if format_id is None:
+                    format_id = len(self._formats)
+                    self._formats.append(fmt)
+                    self._format_ids[fmt] = format_id
+        return format_id
+
+    def write(self, logger_id: int, level: int, fmt: str, args: tuple[Number, ...]) -> None:
+        """Stores a message. `fmt` is a %-style format string for at most MAX_ARGS numbers."""
+        format_id = self._format_id(fmt)
+        timestamp = START_TIME.elapsed
+        with self._lock:
+            offset = self._written % self._capacity * RECORD.size
+            try:
+                RECORD.pack_into(
+                    self._ring,
+                    offset,
+                    timestamp,
+                    logger_id,
+                    format_id,
+                    level,
+                    len(args),
+                    *(args + _padding[len(args) :]),
+                )
+            except struct.error:
+                # tracing must not break the caller, keep the message without the arguments
+                RECORD.pack_into(
+                    self._ring, offset, timestamp, logger_id, format_id, level, 0, *_padding
+                )
+            self._written += 1
+
+    def snapshot(self) -> bytes:
+        """Returns the contents of the log in the dump file format"""
+        with self._lock:
+            if self._written <= self._capacity:
+                count = self._written
+                records = bytes(self._ring[: count * RECORD.size])
+            else:
+                # the oldest record is the one that will be overwritten next
+                count = self._capacity
+                start = self._written % self._capacity * RECORD.size
+                records = self._ring[start:] + self._ring[:start]
+            table = json.dumps({"loggers": self._loggers, "formats": self._formats}).encode()
+
+        return HEADER.pack(DUMP_MAGIC, RECORD.size, count, len(table)) + table + records
+
+    def dump(self, reason: str) -> str:
+        """Writes the log into LOG_DUMPS_DIR and returns the path of the file"""
+        os.makedirs(LOG_DUMPS_DIR, exist_ok=True)
+
+        path = os.path.join(LOG_DUMPS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{reason}.rvylog")
+        with open(path, "wb") as f:
+            f.write(self.snapshot())
+
+        # don't fill the storage if the robot keeps crashing
+        dumps = sorted(name for name in os.listdir(LOG_DUMPS_DIR) if name.endswith(".rvylog"))
+        for name in dumps[:-MAX_DUMPS]:
+            os.remove(os.path.join(LOG_DUMPS_DIR, name))
+
+        log(f"Binary log dumped into {path}")
+        return path
+
+
+def format_dump(data: bytes) -> list[str]:
+    """Formats the messages of a dump, oldest first"""
+    magic, record_size, count, table_length = HEADER.unpack_from(data)
+    if magic != DUMP_MAGIC or record_size != RECORD.size:
+        raise ValueError("Not a binary log dump")
+
+    table = json.loads(data[HEADER.size : HEADER.size + table_length])
+    loggers, formats = table["loggers"], table["formats"]
+
+    lines = []
+    for record in RECORD.iter_unpack(data[HEADER.size + table_length :][: count * RECORD.size]):
+        timestamp, logger_id, format_id, level, arg_count, *args = record
+        fmt = formats[format_id]
+        args = tuple(int(arg) if arg.is_integer() else arg for arg in args[:arg_count])
+        try:
+            message = fmt % args
+        except (TypeError, ValueError):
+            message = f"{fmt} {args}"
+
+        lines.append(f"[{timestamp:.3f}][{LEVEL_NAMES[level]}]{loggers[logger_id]} {message}")
+
+    return lines
+
+
+def load_dump(path: str) -> list[str]:
+    with open(path, "rb") as f:
+        return format_dump(f.read())
+
+
+binary_log = BinaryLog()
+
+
+def dump_binary_log(reason: str) -> Optional[str]:
+    """Dumps the log when the robot is in trouble. Never raises, returns None on failure."""
+    try:
+        return binary_log.dump(reason)
+    except Exception as e:
+        log(f"Failed to dump the binary log: {e}", LogLevel.ERROR)
+        return None
+
+
+class BinaryLogger:
+    def __init__(self, tag: str, target: BinaryLog):
+        self._target = target
+        self._id = target.register_logger(tag)
+
+    def __call__(self, fmt: str, *args: Number, level: int = LogLevel.DEBUG) -> None:
+        self._target.write(self._id, level, fmt, args)
+
+
+def get_binary_logger(tag: str, target: BinaryLog = binary_log) -> BinaryLogger:
+    return BinaryLogger(tag, target)
@@ -20,4 +20,10 @@ WRITEABLE_ASSETS_DIR = os.path.realpath(join(WRITEABLE_DIR_ROOT, "assets"))
 
 BLE_STORAGE_DIR = os.path.realpath(join(WRITEABLE_DIR_ROOT, "ble"))
 
+CONFIG_CACHE_DIR = os.path.realpath(join(BLE_STORAGE_DIR, "config_cache"))
+
+RECORDINGS_DIR = os.path.realpath(join(WRITEABLE_DIR_ROOT, "recordings"))
+
+LOG_DUMPS_DIR = os.path.realpath(join(WRITEABLE_DIR_ROOT, "logs"))
+
 PACKAGE_ASSETS_DIR = os.path.realpath(join(CURRENT_INSTALLATION_PATH, "data", "assets"))
@@ -1,17 +1,22 @@
+from collections import OrderedDict, deque
 from enum import IntEnum
-from threading import current_thread
+from threading import Lock, current_thread
 import traceback
-from typing import Callable, Optional
+from typing import Callable, NamedTuple, Optional
 from revvy.mcu.rrrc_control import RevvyControl
 from revvy.robot.mcu_error import McuErrorReader
+from revvy.utils.binary_log import dump_binary_log
 
-from revvy.utils.logger import get_logger, LogLevel
+from revvy.utils.logger import flush_logs, get_logger, LogLevel
 
 log = get_logger("ErrorHandler")
 
 # A stack trace has to fit into this size.
 MAX_PACKET_SIZE = 500
 
+# Number of distinct errors remembered, and the number of errors waiting to be sent.
+MAX_ERRORS = 64
+
 
 class RobotErrorType(IntEnum):
     """Where does the error come from."""
@@ -29,17 +34,24 @@ class RobotError:
     stack: str
     ref: int
     """Blockly program ID. 255 if not a blockly error."""
+    count: int
+    """How many times the error happened."""
+    queued: bool
+    """The error is waiting in the ErrorHandler's queue."""
 
     def __init__(self, error_type: RobotErrorType, stack: str, ref: Optional[int]):
         self.error_type = error_type
         self.stack = stack
         self.ref = 255 if ref is None else ref
+        self.count = 1
+        self.queued = False
 
     def __json__(self) -> dict:
         return {
             "type": self.error_type,
             "stack": self.stack,
             "ref": self.ref,
+            "count": self.count,
         }
 
     def __bytes__(self) -> bytes:
@@ -50,6 +62,17 @@ class RobotError:
         return hash((self.error_type, self.stack))
 
 
+class ErrorStats(NamedTuple):
+    reported: int
+    """Number of reported errors, including the repeated ones"""
+    distinct: int
+    """Number of errors currently remembered"""
+    evicted: int
+    """Errors that were forgotten to make room for new ones"""
+    dropped: int
+    """Errors that were removed from the queue before they could be sent"""
+
+
 def compress_error(error: RobotError) -> bytes:
     """
     This will be used in the characteristic.
@@ -57,6 +80,8 @@ def compress_error(error: RobotError) -> bytes:
     1 byte: type
     1 byte: ref
     500 bytes: stack trace, that contains the error message at the end.
+
+    Repeated errors end with the number of occurrences, e.g. " [×57]".
     """
     stack = error.stack
 
@@ -64,9 +89,11 @@ def compress_error(error: RobotError) -> bytes:
     # TODO: cut version number too, as it's in the mobile already.
     if isinstance(error.stack, str):
         stack = error.stack.replace("/home/pi/RevvyFramework/user/packages/revvy-", "")
+        if error.count > 1:
+            stack += f" [×{error.count}]"
         stack = stack.encode()
 
-    stack = stack[-500:]
+    stack = stack[-MAX_PACKET_SIZE:]
 
     ret_array = error.error_type.value.to_bytes(1, "big")
     ret_array += error.ref.to_bytes(1, "big")
@@ -87,14 +114,24 @@ class ErrorHandler:
             - on every "reset configuration" this should be called to clear the error queue
 
     The list of errors gather in the error_queue that is being sent to the app.
-    Errors that are already in the map, are not added to the queue again.
+    Errors that are already known are not added to the queue again, only their counter is
+    incremented. The counter is sent again when it reaches a power of two, so the app can see how
+    often an error happens without being flooded. Only the last MAX_ERRORS distinct errors are
+    remembered, and at most MAX_ERRORS errors wait to be sent.
     They also need to be truncated to 500 bytes to go through a single BLE packet.
     """
 
-    def __init__(self) -> None:
-        self._error_queue: list[RobotError] = []
-        self._error_map: dict[int, RobotError] = {}
+    def __init__(self, max_errors: int = MAX_ERRORS) -> None:
+        self._max_errors = max_errors
+        self._lock = Lock()
+        self._error_queue: deque[RobotError] = deque()
+        # least recently reported first
+        self._error_map: OrderedDict[int, RobotError] = OrderedDict()
         self._on_error_callback: Optional[Callable] = None
+
+        self._reported = 0
+        self._evicted = 0
+        self._dropped = 0
         # self.register_uncaught_exception_handler()
 
     def register_on_error_callback(self, callback: Callable):
@@ -108,6 +145,8 @@ class ErrorHandler:
         self.report_error(RobotErrorType.SYSTEM, trace)
 
         log(log_message, LogLevel.ERROR)
+        dump_binary_log("crash")
+        flush_logs()
 
     def register_uncaught_exception_handler(self) -> None:
         import sys
@@ -116,29 +155,60 @@ class ErrorHandler:
         log("Uncaught exception handler registered")
 
     def pop_error(self) -> RobotError:
-        """Remove and return the last element of the array"""
-        return self._error_queue.pop()
+        """Remove and return the oldest queued error"""
+        with self._lock:
+            error = self._error_queue.popleft()
+            error.queued = False
+            return error
 
     def has_error(self) -> bool:
         """True if error queue not empty"""
         return len(self._error_queue) > 0
 
+    @property
+    def stats(self) -> ErrorStats:
+        return ErrorStats(self._reported, len(self._error_map), self._evicted, self._dropped)
+
     def report_error(self, error_type: RobotErrorType, trace: str, ref: Optional[int] = None):
         """Send error to the queue up if it hasn't been posted already."""
         new_robot_error = RobotError(error_type, f"{trace} [{current_thread().name}]", ref)
         error_hash = new_robot_error.hash()
-        if error_hash not in self._error_map:
-            self._error_map[error_hash] = new_robot_error
-
-            # Insert at the beginning of the list. (FIFO)
-            self._error_queue.insert(0, new_robot_error)
-            log("Error QUEUED")
-        else:
-            log("Caught error reported already, not reporting again.")
+
+        with self._lock:
+            self._reported += 1
+
+            known_error = self._error_map.get(error_hash)
+            if known_error is None:
+                self._error_map[error_hash] = new_robot_error
+                if len(self._error_map) > self._max_errors:
+                    self._error_map.popitem(last=False)
+                    self._evicted += 1
+                self._enqueue(new_robot_error)
+                log("Error QUEUED")
+            else:
+                self._error_map.move_to_end(error_hash)
+                known_error.count += 1
+                new_robot_error = known_error
+
+                # a queued error is sent with its current count, no need to queue it again
+                if not known_error.queued and known_error.count & (known_error.count - 1) == 0:
+                    self._enqueue(known_error)
+                    log(lambda: f"Error reported {known_error.count} times, QUEUED again")
+                else:
+                    log("Caught error reported already, not reporting again.")
+
         if self._on_error_callback:
             self._on_error_callback(new_robot_error)
         return new_robot_error
 
+    def _enqueue(self, error: RobotError) -> None:
+        if len(self._error_queue) >= self._max_errors:
+            self._error_queue.popleft().queued = False
+            self._dropped += 1
+
+        error.queued = True
+        self._error_queue.append(error)
+
     def read_mcu_errors(self, robot_control: RevvyControl):
         """Also clears the error queue on the MCU."""
         error_reader = McuErrorReader(robot_control)
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from contextlib import suppress
+import hashlib
 import os
 import json
 from json import JSONDecodeError
@@ -19,6 +21,44 @@ class IntegrityError(StorageError):
     pass
 
 
+class StorageWriter(ABC):
+    """
+    Streams data into a storage element. The element is replaced when the data is committed.
+
+    An unfinished writer can be suspended with some state, to be resumed later by
+    `StorageInterface.resume_writer`.
+    """
+
+    def write(self, data: bytes) -> None:
+        self.write_at(self.length, data)
+
+    @property
+    @abstractmethod
+    def length(self) -> int:
+        """Offset of the end of the written data"""
+
+    @abstractmethod
+    def write_at(self, offset: int, data: bytes) -> None: ...
+
+    @abstractmethod
+    def md5(self) -> str:
+        """Calculates the checksum of the written data"""
+
+    @abstractmethod
+    def checkpoint(self, state: dict) -> None:
+        """Makes sure the data written so far, and the given state, survive a restart."""
+
+    @abstractmethod
+    def suspend(self, state: dict) -> None:
+        """Saves the state and closes the writer. The data is kept so the writer can be resumed."""
+
+    @abstractmethod
+    def commit(self, md5: str, metadata: Optional[dict] = None) -> None: ...
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+
 class StorageInterface(ABC):
     @abstractmethod
     def read_metadata(self, filename: str) -> dict: ...
@@ -29,6 +69,22 @@ class StorageInterface(ABC):
     @abstractmethod
     def read(self, filename: str) -> bytes: ...
 
+    @abstractmethod
+    def delete(self, filename: str) -> None:
+        """Removes a stored element. Does nothing if the element does not exist."""
+
+    @abstractmethod
+    def open_writer(self, filename: str) -> StorageWriter:
+        """Opens a new writer. Suspended data of the same element is thrown away."""
+
+    @abstractmethod
+    def resume_writer(self, filename: str) -> Optional[tuple[StorageWriter, dict]]:
+        """Returns the suspended writer of an element and its state, or None."""
+
+    def path(self, filename: str) -> Optional[str]:
+        """Returns the path of the stored data, or None if the storage is not backed by files."""
+        return None
+
 
 class MemoryStorageItem(NamedTuple):
     md5: str
@@ -36,9 +92,42 @@ class MemoryStorageItem(NamedTuple):
     meta: dict
 
 
+class MemoryStorageWriter(StorageWriter):
+    def __init__(self, storage: "MemoryStorage", filename: str):
+        self._storage = storage
+        self._filename = filename
+        self._data = bytearray()
+
+    @property
+    def length(self) -> int:
+        return len(self._data)
+
+    def write_at(self, offset: int, data: bytes) -> None:
+        if offset > len(self._data):
+            self._data.extend(bytes(offset - len(self._data)))
+        self._data[offset : offset + len(data)] = data
+
+    def md5(self) -> str:
+        return bytestr_hash(self._data)
+
+    def checkpoint(self, state: dict) -> None:
+        # memory does not survive a restart anyway
+        pass
+
+    def suspend(self, state: dict) -> None:
+        self._storage._suspended[self._filename] = (self, state)
+
+    def commit(self, md5: str, metadata: Optional[dict] = None) -> None:
+        self._storage.write(self._filename, bytes(self._data), metadata, md5)
+
+    def abort(self) -> None:
+        self._data = bytearray()
+
+
 class MemoryStorage(StorageInterface):
     def __init__(self) -> None:
         self._entries: dict[str, MemoryStorageItem] = {}
+        self._suspended: dict[str, tuple[MemoryStorageWriter, dict]] = {}
 
     def read_metadata(self, filename: str) -> dict:
         if filename not in self._entries:
@@ -66,6 +155,98 @@ class MemoryStorage(StorageInterface):
             raise IntegrityError("Checksum")
         return data
 
+    def delete(self, filename: str) -> None:
+        self._entries.pop(filename, None)
+
+    def open_writer(self, filename: str) -> StorageWriter:
+        self._suspended.pop(filename, None)
+        return MemoryStorageWriter(self, filename)
+
+    def resume_writer(self, filename: str) -> Optional[tuple[StorageWriter, dict]]:
+        return self._suspended.pop(filename, None)
+
+
+class FileStorageWriter(StorageWriter):
+    """
+    Writes data into a temporary file that replaces the stored file when committed.
+
+    The metadata is written last, so an interrupted commit never leaves the new data behind with the
+    metadata of the old one. The state of a suspended writer is stored next to the temporary file.
+    """
+
+    def __init__(self, storage: "FileStorage", filename: str, resume: bool = False):
+        self._storage = storage
+        self._filename = filename
+        self._temp_path = storage._temp_file(filename)
+        self._state_path = storage._state_file(filename)
+        if resume:
+            self._file = open(self._temp_path, "r+b")
+            self._length = os.path.getsize(self._temp_path)
+        else:
+            with suppress(FileNotFoundError):
+                os.unlink(self._state_path)
+            self._file = open(self._temp_path, "wb")
+            self._length = 0
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    def write_at(self, offset: int, data: bytes) -> None:
+        if offset != self._file.tell():
+            self._file.seek(offset)
+        self._file.write(data)
+        self._length = max(self._length, offset + len(data))
+
+    def md5(self) -> str:
+        self._file.flush()
+        hash_fn = hashlib.md5()
+        with open(self._temp_path, "rb") as data_file:
+            while chunk := data_file.read(64 * 1024):
+                hash_fn.update(chunk)
+        return hash_fn.hexdigest()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def checkpoint(self, state: dict) -> None:
+        # the data must be on the disk before the state can refer to it
+        self._sync()
+        _write_json_atomic(self._state_path, state)
+
+    def suspend(self, state: dict) -> None:
+        self.checkpoint(state)
+        self._file.close()
+
+    def commit(self, md5: str, metadata: Optional[dict] = None) -> None:
+        self._sync()
+        self._file.close()
+
+        meta_file_path = self._storage._meta_file(self._filename)
+        with suppress(FileNotFoundError):
+            os.unlink(meta_file_path)
+
+        os.replace(self._temp_path, self._storage._storage_file(self._filename))
+        with suppress(FileNotFoundError):
+            os.unlink(self._state_path)
+
+        metadata = {**(metadata or {}), "md5": md5, "length": self._length}
+        _write_json_atomic(meta_file_path, metadata)
+
+    def abort(self) -> None:
+        self._file.close()
+        for path in (self._temp_path, self._state_path):
+            with suppress(FileNotFoundError):
+                os.unlink(path)
+
+
+def _write_json_atomic(path: str, data: dict) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as fp:
+        json.dump(data, fp)
+    os.replace(temp_path, path)
+
 
 class FileStorage(StorageInterface):
     """
@@ -74,6 +255,9 @@ class FileStorage(StorageInterface):
     Stores 2 files for each stored file:
       x.meta: stores md5 and length in json format for the data
       x.data: stores the actual data
+
+    Data that is streamed into the storage is written into x.data.tmp first. The state of a
+    suspended stream is stored in x.state.
     """
 
     def __init__(self, storage_dir: str):
@@ -97,6 +281,12 @@ class FileStorage(StorageInterface):
     def _meta_file(self, filename: str) -> str:
         return self._path(f"{filename}.meta")
 
+    def _temp_file(self, filename: str) -> str:
+        return self._path(f"{filename}.data.tmp")
+
+    def _state_file(self, filename: str) -> str:
+        return self._path(f"{filename}.state")
+
     def read_metadata(self, filename: str) -> dict:
         try:
             return read_json(self._meta_file(filename))
@@ -137,3 +327,38 @@ class FileStorage(StorageInterface):
 
         except JSONDecodeError as e:
             raise IntegrityError("Metadata") from e
+
+    def delete(self, filename: str) -> None:
+        # remove the metadata first, so a partially deleted element is not valid
+        for path in (self._meta_file(filename), self._storage_file(filename)):
+            with suppress(FileNotFoundError):
+                os.unlink(path)
+
+    def open_writer(self, filename: str) -> StorageWriter:
+        try:
+            return FileStorageWriter(self, filename)
+        except IOError as e:
+            raise StorageError(f"Can not write {filename}") from e
+
+    def resume_writer(self, filename: str) -> Optional[tuple[StorageWriter, dict]]:
+        try:
+            state = read_json(self._state_file(filename))
+            return FileStorageWriter(self, filename, resume=True), state
+        except (IOError, JSONDecodeError):
+            return None
+
+    def path(self, filename: str) -> Optional[str]:
+        """
+        Returns the path of the stored data without reading it.
+
+        Only the length of the data is checked, the checksum is verified when the data is stored.
+        """
+        metadata = self.read_metadata(filename)
+        data_file_path = self._storage_file(filename)
+        try:
+            if os.path.getsize(data_file_path) != metadata["length"]:
+                raise IntegrityError("Length")
+        except OSError as e:
+            raise StorageElementNotFoundError from e
+
+        return data_file_path
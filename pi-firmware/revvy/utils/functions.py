@@ -2,7 +2,8 @@ import hashlib
 import json
 import traceback
 from binascii import b2a_base64, a2b_base64
-from typing import Callable, Optional, TypeVar, TYPE_CHECKING
+from types import CodeType
+from typing import Callable, Optional, TypeVar, TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
     from revvy.scripting.variables import Variable
@@ -155,7 +156,7 @@ def bits_to_bool_list(byte_list) -> list[bool]:
     return [is_bit_set(b, bit) for b in byte_list for bit in range(8)]
 
 
-def bytestr_hash(byte_str: bytes) -> str:
+def bytestr_hash(byte_str: Union[bytes, bytearray]) -> str:
     """
     >>> bytestr_hash(b'hello')
     '5d41402abc4b2a76b9719d911017c592'
@@ -179,30 +180,66 @@ def str_to_func(code: str, script_id: Optional[int] = None) -> Callable:
     """Take python code as string and create a callable functions
     The function arguments will be injected into the code as global variables
 
+    The code is compiled on the first call, and the variable lookup used by
+    ReportVariableChanged is only rebuilt when the script receives a new list of variable slots.
+
     >>> code='print(f"Called with {input}")'
     >>> func=str_to_func(code)
     >>> func(input='something')
     Called with something
     """
 
+    compiled: Optional[CodeType] = None
+
+    # (variable slots, ReportVariableChanged) of the configuration the script last ran with
+    reporter: tuple[Optional[list["Variable"]], Callable] = (None, _ignore_variable_change)
+
     def wrapper(**kwargs) -> None:
-        kwargs["script_id"] = script_id
+        nonlocal compiled, reporter
+
+        if compiled is None:
+            # Compiling lazily keeps syntax errors reported as script errors, when the script runs.
+            compiled = compile(code, "<string>", "exec")
 
         # This list is assembled in `robot_configure`. The mobile app will
         # send a list of variables that we should track.
         # This list is then passed to both background as well as button scripts.
-        variable_slots: list["Variable"] = kwargs.get("list_slots", [])
+        variable_slots: Optional[list["Variable"]] = kwargs.get("list_slots")
 
-        def ReportVariableChanged(name: str, value):
-            # When a variable is changed, update the value in the variable_slots.
-            for variable_slot in variable_slots:
-                if variable_slot.script == script_id:
-                    if variable_slot.name == name:
-                        variable_slot.set_value(value)
-                        return
+        slots, report_variable_changed = reporter
+        if slots is not variable_slots:
+            report_variable_changed = _make_variable_reporter(variable_slots, script_id)
+            reporter = (variable_slots, report_variable_changed)
 
-        kwargs["ReportVariableChanged"] = ReportVariableChanged
+        kwargs["script_id"] = script_id
+        kwargs["ReportVariableChanged"] = report_variable_changed
 
-        exec(code, kwargs)
+        exec(compiled, kwargs)
 
     return wrapper
+
+
+def _ignore_variable_change(name: str, value) -> None:
+    pass
+
+
+def _make_variable_reporter(
+    variable_slots: Optional[list["Variable"]], script_id: Optional[int]
+) -> Callable:
+    """Create a ReportVariableChanged function that updates the tracked variables of a script."""
+    if not variable_slots:
+        return _ignore_variable_change
+
+    # name -> Variable, if multiple slots track the same name, the first one wins
+    variables: dict[str, "Variable"] = {}
+    for variable_slot in variable_slots:
+        if variable_slot.script == script_id and variable_slot.name is not None:
+            variables.setdefault(variable_slot.name, variable_slot)
+
+    def ReportVariableChanged(name: str, value):
+        # When a variable is changed, update the value in the variable_slots.
+        variable = variables.get(name)
+        if variable is not None:
+            variable.set_value(value)
+
+    return ReportVariableChanged
@@ -2,11 +2,21 @@
 Colorful revvy logger.
 Configure it with log_config.json in the data/config directory.
 @see: /docs/pi/configuration.md
+
+Messages are written to stdout by a background thread, so a slow console or journald never blocks
+the thread that logs. Messages below the minimum level are discarded before they are formatted,
+and a message may be given as a function that is only called if the message is logged:
+
+    log(lambda: f"expensive {value}", LogLevel.DEBUG)
 """
 
+import atexit
+from collections import deque
+from functools import lru_cache
 import os
-from threading import current_thread
-from typing import Optional, Union
+import sys
+from threading import Event, Lock, Thread, current_thread
+from typing import Callable, NamedTuple, Optional, Union
 from revvy.utils.directories import WRITEABLE_DATA_DIR
 from revvy.utils.functions import read_json
 
@@ -43,9 +53,11 @@ color_mapping = (
 )
 
 
+@lru_cache(maxsize=256)
 def hash_to_color(text: str) -> str:
     """
-    Simple text hasher for easy module identification on the debug logs
+    Simple text hasher for easy module identification on the debug logs. The results are cached,
+    because the thread name is colored for every message.
     """
     # Quickly turn the string into a somewhat random, but deterministic number
     hash_value = sum(text.encode())
@@ -61,6 +73,103 @@ def hash_to_color(text: str) -> str:
 
 START_TIME = Stopwatch()
 
+Message = Union[str, Callable[[], str]]
+
+
+class LogRecord(NamedTuple):
+    timestamp: float
+    level: int
+    thread_name: str
+    colored_tag: str
+    message: str
+
+    def format(self) -> str:
+        thread_name = hash_to_color(self.thread_name)
+        return (
+            f"[{self.timestamp:.2f}][{LEVELS[self.level]}][{thread_name}]{self.colored_tag}"
+            f" {self.message}\n"
+        )
+
+
+class LogWriter:
+    """
+    Formats and prints the log records in batches, from a background thread. If the buffer is
+    full, the oldest records are dropped instead of waiting for the output.
+    """
+
+    def __init__(self, buffer_size: int):
+        self._records: deque[LogRecord] = deque(maxlen=buffer_size)
+        self._lock = Lock()
+        self._output_lock = Lock()
+        self._has_records = Event()
+        self._dropped = 0
+
+    def start(self) -> None:
+        Thread(target=self._run, name="LogWriter", daemon=True).start()
+
+    def write(self, record: LogRecord) -> None:
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._dropped += 1
+            self._records.append(record)
+        self._has_records.set()
+
+    def flush(self) -> None:
+        """Prints the buffered records on the calling thread"""
+        with self._output_lock:
+            with self._lock:
+                records = list(self._records)
+                self._records.clear()
+                dropped, self._dropped = self._dropped, 0
+
+            if not records and not dropped:
+                return
+
+            lines = [record.format() for record in records]
+            if dropped:
+                lines.insert(0, f"[Logger] {dropped} messages were dropped\n")
+
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+
+    def _run(self) -> None:
+        while True:
+            self._has_records.wait()
+            self._has_records.clear()
+            try:
+                self.flush()
+            except Exception:
+                # there is nowhere to report output errors, keep the thread alive
+                pass
+
+
+_log_writer: Optional[LogWriter] = None
+_log_writer_lock = Lock()
+
+
+def get_log_writer() -> Optional[LogWriter]:
+    """Returns the background writer, or None if messages should be printed immediately"""
+    global _log_writer
+    if _log_writer is None:
+        buffer_size = get_log_config()["buffer_size"]
+        if not isinstance(buffer_size, int) or buffer_size <= 0:
+            return None
+
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = LogWriter(buffer_size)
+                _log_writer.start()
+                atexit.register(_log_writer.flush)
+
+    return _log_writer
+
+
+def flush_logs() -> None:
+    """Prints the buffered messages, e.g. before the process exits or crashes"""
+    writer = _log_writer
+    if writer:
+        writer.flush()
+
 
 class Logger:
     def __init__(
@@ -75,18 +184,32 @@ class Logger:
         self.tag = tag
         self.colored_tag = colored_tag
 
-    def log(self, message: str, level=None):
+    def enabled_for(self, level: int) -> bool:
+        """Returns whether messages of the given level are logged"""
+        return self._min_log_level <= level < LogLevel.OFF
+
+    def log(self, message: Message, level=None):
         """Print to log if level is higher than the minimum log level."""
         if level is None:
             level = self._default_log_level
 
-        if level >= self._min_log_level and level < LogLevel.OFF:
-            thread_name = hash_to_color(current_thread().name)
+        if not self._min_log_level <= level < LogLevel.OFF:
+            return
+
+        if callable(message):
+            message = message()
+
+        record = LogRecord(
+            START_TIME.elapsed, level, current_thread().name, self.colored_tag, message
+        )
 
+        writer = get_log_writer()
+        if writer:
+            writer.write(record)
+        else:
             # Print the newline ourselves.
             # This removes the possibility of racy threads to mess up the output.
-            message = f"[{START_TIME.elapsed:.2f}][{LEVELS[level]}][{thread_name}]{self.colored_tag} {message}\n"
-            print(message, end="")
+            print(record.format(), end="")
 
     __call__ = log
 
@@ -100,6 +223,8 @@ Keys:
 - default_log_level: default log level.
                      Logging calls without an explicit level will emit at this level.
 - min_log_level: minimum log level. Logging calls with a level below this will be ignored.
+- buffer_size: number of messages waiting for the background writer. 0 prints the messages
+               immediately, on the thread that logs them.
 """
 
 
@@ -121,6 +246,7 @@ def get_log_config() -> dict:
             "modules": {},
             "min_log_level": LogLevel.INFO,
             "default_log_level": LogLevel.INFO,
+            "buffer_size": 1024,
         }
         log_config = {**default_log_config, **log_config}
 
@@ -0,0 +1,158 @@
+"""
+Bounded FIFO queue for messages that are sent to a slow consumer.
+
+- Messages are taken out in the order they were added, higher priority (lower number) first.
+- Adding a message with the key of a message that is still queued replaces the queued message,
+  without changing its place in the queue.
+- When the queue is full, the oldest message with the lowest priority is dropped. A new message
+  is dropped instead if everything in the queue is more important.
+"""
+
+from collections import deque
+from threading import Lock
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class QueuedMessage(Generic[T]):
+    def __init__(self, value: T, priority: int, key: Optional[Hashable]):
+        self.value = value
+        self.priority = priority
+        self.key = key
+        self.callbacks: list[Callable[[], None]] = []
+
+    def on_done(self) -> None:
+        for callback in self.callbacks:
+            callback()
+
+
+class MessageQueueStats(NamedTuple):
+    queued: int
+    """Number of messages added to the queue"""
+
+    coalesced: int
+    """Number of messages that replaced a queued message with the same key"""
+
+    dropped: int
+    """Number of messages dropped because the queue was full"""
+
+    depth: int
+    """Number of messages currently in the queue"""
+
+    max_depth: int
+    """Highest number of messages that were in the queue at the same time"""
+
+
+class MessageQueue(Generic[T]):
+    """Thread safe, bounded, coalescing priority queue. See the module documentation."""
+
+    def __init__(self, max_size: int):
+        assert max_size > 0
+        self._max_size = max_size
+        self._lock = Lock()
+        self._queues: dict[int, deque[QueuedMessage[T]]] = {}
+        self._by_key: dict[Hashable, QueuedMessage[T]] = {}
+        self._depth = 0
+
+        self._queued = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._max_depth = 0
+
+    def __len__(self) -> int:
+        return self._depth
+
+    @property
+    def stats(self) -> MessageQueueStats:
+        return MessageQueueStats(
+            self._queued, self._coalesced, self._dropped, self._depth, self._max_depth
+        )
+
+    def put(
+        self,
+        value: T,
+        on_done: Optional[Callable[[], None]] = None,
+        key: Optional[Hashable] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> bool:
+        """
+        Adds a message to the queue. `on_done` is called when the message is processed, or when
+        it is dropped. Returns False if the message was dropped.
+        """
+        with self._lock:
+            accepted, dropped = self._put(value, on_done, key, priority)
+
+        # not called under the lock, the callbacks may put new messages
+        if dropped is not None:
+            dropped.on_done()
+        if not accepted and on_done:
+            on_done()
+
+        return accepted
+
+    def _put(
+        self,
+        value: T,
+        on_done: Optional[Callable[[], None]],
+        key: Optional[Hashable],
+        priority: int,
+    ) -> tuple[bool, Optional[QueuedMessage[T]]]:
+        """Returns whether the message was queued, and the message dropped to make room for it"""
+        self._queued += 1
+
+        if key is not None and key in self._by_key:
+            message = self._by_key[key]
+            message.value = value
+            if on_done:
+                message.callbacks.append(on_done)
+            self._coalesced += 1
+            return True, None
+
+        dropped = None
+        if self._depth >= self._max_size:
+            dropped = self._drop_one(priority)
+            if dropped is None:
+                self._dropped += 1
+                return False, None
+
+        message = QueuedMessage(value, priority, key)
+        if on_done:
+            message.callbacks.append(on_done)
+        if key is not None:
+            self._by_key[key] = message
+
+        self._queues.setdefault(priority, deque()).append(message)
+        self._depth += 1
+        self._max_depth = max(self._max_depth, self._depth)
+        return True, dropped
+
+    def get(self) -> Optional[QueuedMessage[T]]:
+        """Removes and returns the next message, or None if the queue is empty."""
+        with self._lock:
+            for priority in sorted(self._queues):
+                queue = self._queues[priority]
+                if queue:
+                    return self._remove(queue.popleft())
+            return None
+
+    def _drop_one(self, priority: int) -> Optional[QueuedMessage[T]]:
+        """
+        Drops and returns the oldest of the least important messages, unless they are all more
+        important
+        """
+        lowest_priority = max(p for p, q in self._queues.items() if q)
+        if lowest_priority < priority:
+            return None
+
+        self._dropped += 1
+        return self._remove(self._queues[lowest_priority].popleft())
+
+    def _remove(self, message: QueuedMessage[T]) -> QueuedMessage[T]:
+        self._depth -= 1
+        if message.key is not None:
+            del self._by_key[message.key]
+        return message
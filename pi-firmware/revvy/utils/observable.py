@@ -9,6 +9,7 @@ import copy
 import threading
 from time import time
 import traceback
+import weakref
 
 from typing import Generic, Optional, TypeVar, Callable
 
@@ -35,6 +36,14 @@ class Observable(Generic[VariableType]):
         self._last_update_time = 0
         self._update_pending = False
 
+    @property
+    def throttle_interval(self) -> Optional[float]:
+        return self._throttle_interval
+
+    @throttle_interval.setter
+    def throttle_interval(self, interval: Optional[float]):
+        self._throttle_interval = interval
+
     def subscribe(self, observer: Callable):
         self._on_value_changed.add(observer)
 
@@ -80,6 +89,42 @@ class Observable(Generic[VariableType]):
         return self._data
 
 
+class ThrottleGroup:
+    """
+    A group of throttled observables whose throttle intervals can be scaled together, e.g. to
+    lower the rate of notifications when the receiver can not keep up.
+
+    Observables are referenced weakly, they don't need to be removed from the group.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._base_intervals: weakref.WeakKeyDictionary[Observable, float] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._scale = 1.0
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale: float):
+        with self._lock:
+            self._scale = scale
+            for observable, interval in self._base_intervals.items():
+                observable.throttle_interval = interval * scale
+
+    def add(self, observable: Observable) -> None:
+        interval = observable.throttle_interval
+        if interval is None:
+            return
+
+        with self._lock:
+            self._base_intervals[observable] = interval
+            observable.throttle_interval = interval * self._scale
+
+
 def simple_average(data_history: list[int]) -> int:
     new_value = sum(data_history) / len(data_history)
     return round(new_value)
@@ -3,7 +3,7 @@ from threading import Lock
 
 import sys
 from typing import Optional, Union
-from revvy.utils.logger import LogLevel, hash_to_color, LEVELS
+from revvy.utils.logger import LogLevel, Message, hash_to_color, LEVELS
 from revvy.utils.stopwatch import Stopwatch
 
 messages = []
@@ -24,12 +24,18 @@ class BufferingLogger:
         self.tag = tag
         self.colored_tag = colored_tag
 
-    def __call__(self, message: str, level=None):
+    def enabled_for(self, level: int) -> bool:
+        return self._min_log_level <= level < LogLevel.OFF
+
+    def __call__(self, message: Message, level=None):
         """Print to log if level is higher than the minimum log level."""
         if level is None:
             level = self._default_log_level
 
         if level >= self._min_log_level and level < LogLevel.OFF:
+            if callable(message):
+                message = message()
+
             thread_name = hash_to_color(current_thread().name)
 
             # Print the newline ourselves.
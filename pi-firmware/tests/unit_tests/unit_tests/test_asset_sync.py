@@ -0,0 +1,82 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+from revvy.utils.asset_sync import HASH_FILE, sync_tar_archive
+
+
+def make_archive(files: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    buffer.seek(0)
+    return buffer
+
+
+class TestAssetSync(unittest.TestCase):
+    def test_only_changed_files_are_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = {"sounds/a.mp3": b"a", "sounds/b.mp3": b"b", "c.txt": b"c"}
+
+            result = sync_tar_archive(make_archive(files), directory)
+            self.assertEqual((3, 0, 0), result)
+            self.assertTrue(result.changed)
+
+            result = sync_tar_archive(make_archive(files), directory)
+            self.assertEqual((0, 3, 0), result)
+            self.assertFalse(result.changed)
+
+            files = {"sounds/a.mp3": b"new a", "sounds/b.mp3": b"b"}
+            result = sync_tar_archive(make_archive(files), directory)
+            self.assertEqual((1, 1, 1), result)
+
+            with open(os.path.join(directory, "sounds", "a.mp3"), "rb") as f:
+                self.assertEqual(b"new a", f.read())
+            self.assertFalse(os.path.exists(os.path.join(directory, "c.txt")))
+
+    def test_missing_file_is_extracted_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = {"a.txt": b"a"}
+            sync_tar_archive(make_archive(files), directory)
+            os.unlink(os.path.join(directory, "a.txt"))
+
+            result = sync_tar_archive(make_archive(files), directory)
+            self.assertEqual((1, 0, 0), result)
+
+    def test_files_without_manifest_are_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "old"))
+            with open(os.path.join(directory, "old", "stale.txt"), "wb") as f:
+                f.write(b"stale")
+
+            result = sync_tar_archive(make_archive({"a.txt": b"a"}), directory)
+
+            self.assertEqual((1, 0, 1), result)
+            self.assertFalse(os.path.exists(os.path.join(directory, "old")))
+            self.assertTrue(os.path.exists(os.path.join(directory, "a.txt")))
+
+    def test_archive_hash_file_is_kept(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = {"a.txt": b"a"}
+            sync_tar_archive(make_archive(files), directory)
+            with open(os.path.join(directory, HASH_FILE), "w") as f:
+                f.write("0123")
+
+            result = sync_tar_archive(make_archive(files), directory)
+
+            self.assertEqual((0, 1, 0), result)
+            self.assertFalse(result.changed)
+            self.assertTrue(os.path.exists(os.path.join(directory, HASH_FILE)))
+
+    def test_paths_outside_the_directory_are_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, "assets")
+            with self.assertRaises(ValueError):
+                sync_tar_archive(make_archive({"../evil.txt": b"x"}), destination)
+
+            self.assertFalse(os.path.exists(os.path.join(directory, "evil.txt")))
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from mock import patch
+
+from revvy.utils import binary_log
+from revvy.utils.binary_log import BinaryLog, format_dump, get_binary_logger
+from revvy.utils.logger import LogLevel
+
+
+class TestBinaryLog(unittest.TestCase):
+    def test_messages_are_formatted_when_dumped(self):
+        log = BinaryLog(capacity=4)
+        trace = get_binary_logger("[Test]", log)
+
+        trace("port %d: set_speed %.1f", 2, 12.5)
+        trace("done", level=LogLevel.ERROR)
+
+        lines = format_dump(log.snapshot())
+
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].endswith("[Debug][Test] port 2: set_speed 12.5"))
+        self.assertTrue(lines[1].endswith("[Error][Test] done"))
+
+    def test_oldest_records_are_overwritten(self):
+        log = BinaryLog(capacity=3)
+        trace = get_binary_logger("[Test]", log)
+
+        for i in range(5):
+            trace("message %d", i)
+
+        lines = format_dump(log.snapshot())
+
+        self.assertEqual(["message 2", "message 3", "message 4"], [l[-9:] for l in lines])
+
+    def test_invalid_arguments_do_not_raise(self):
+        log = BinaryLog(capacity=2)
+        trace = get_binary_logger("[Test]", log)
+
+        trace("value %d", "not a number")
+
+        self.assertTrue(format_dump(log.snapshot())[0].endswith("[Test] value %d ()"))
+
+    def test_old_dumps_are_removed(self):
+        log = BinaryLog(capacity=2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with patch.object(binary_log, "LOG_DUMPS_DIR", directory):
+                for i in range(binary_log.MAX_DUMPS + 2):
+                    log.dump(f"test{i:02}")
+
+            self.assertEqual(binary_log.MAX_DUMPS, len(os.listdir(directory)))
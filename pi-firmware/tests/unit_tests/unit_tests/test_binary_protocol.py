@@ -0,0 +1,78 @@
+import struct
+import time
+import unittest
+
+from revvy.api.binary_protocol import (
+    BinaryMessageError,
+    BinaryMessageType,
+    ClientTelemetry,
+    ProgramStatusTracker,
+    decode_message,
+    decode_telemetry_interval,
+    telemetry_value,
+)
+from revvy.bluetooth.data_types import BumperSensorData, GyroData, ScriptVariables
+from revvy.bluetooth.telemetry import TelemetryField
+from revvy.robot.robot_events import ProgramStatusChange, RobotEvent
+from revvy.scripting.runtime import ScriptEvent
+
+
+class TestBinaryMessages(unittest.TestCase):
+    def test_invalid_messages_are_rejected(self):
+        self.assertRaises(BinaryMessageError, lambda: decode_message(b""))
+        self.assertRaises(BinaryMessageError, lambda: decode_message(b"\xff\x00"))
+        self.assertRaises(BinaryMessageError, lambda: decode_telemetry_interval(b"\x01"))
+
+    def test_telemetry_values_are_encoded_like_ble_characteristics(self):
+        program_status = ProgramStatusTracker()
+
+        field, value = telemetry_value(
+            RobotEvent.ORIENTATION_CHANGE, GyroData(1, 2, 3), program_status
+        )
+        self.assertEqual(TelemetryField.ORIENTATION, field)
+        self.assertEqual(struct.pack("fff", 1, 2, 3), value)
+
+        field, value = telemetry_value(
+            RobotEvent.SENSOR_VALUE_CHANGE, BumperSensorData(2, True), program_status
+        )
+        self.assertEqual(TelemetryField.SENSOR_3, field)
+        self.assertEqual(b"\x01\x01", value)
+
+        field, value = telemetry_value(
+            RobotEvent.PROGRAM_STATUS_CHANGE,
+            ProgramStatusChange(1, ScriptEvent.START),
+            program_status,
+        )
+        self.assertEqual(TelemetryField.PROGRAM_STATUS, field)
+        self.assertEqual(8, len(value))
+
+        self.assertIsNone(telemetry_value(RobotEvent.BATTERY_CHANGE, None, program_status))
+
+
+class TestClientTelemetry(unittest.TestCase):
+    def test_frames_are_only_sent_when_enabled(self):
+        telemetry = ClientTelemetry()
+        telemetry.update(TelemetryField.TIMER, b"\x01")
+
+        self.assertFalse(telemetry.enabled)
+        self.assertIsNone(telemetry.next_frame())
+
+        telemetry.set_interval(0.001)
+        time.sleep(0.002)
+        frame = telemetry.next_frame()
+
+        self.assertTrue(telemetry.enabled)
+        self.assertEqual(BinaryMessageType.TELEMETRY, frame[0])
+
+    def test_script_variables_fit_into_a_frame(self):
+        telemetry = ClientTelemetry()
+        telemetry.set_interval(0.001)
+
+        value = bytes(ScriptVariables([1.0, None, 2.0, None]))
+        self.assertTrue(telemetry.update(TelemetryField.SCRIPT_VARIABLES, value))
+
+        time.sleep(0.002)
+        frame = telemetry.next_frame()
+
+        self.assertEqual(BinaryMessageType.TELEMETRY, frame[0])
+        self.assertIn(value, frame)
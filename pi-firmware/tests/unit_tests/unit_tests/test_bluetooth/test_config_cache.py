@@ -0,0 +1,85 @@
+import unittest
+
+from revvy.bluetooth.config_cache import ConfigurationCache
+from revvy.bluetooth.longmessage import (
+    LongMessageHandler,
+    LongMessageStatus,
+    LongMessageStorage,
+    LongMessageType,
+)
+from revvy.utils.file_storage import MemoryStorage, StorageError
+from revvy.utils.functions import bytestr_hash
+
+
+def config_json(n: int) -> bytes:
+    return f'{{"robotConfig": {{}}, "blocklyList": [], "n": {n}}}'.encode()
+
+
+class TestConfigurationCache(unittest.TestCase):
+    def test_least_recently_used_configuration_is_evicted(self):
+        storage = MemoryStorage()
+        cache = ConfigurationCache(storage, capacity=2)
+        configs = [config_json(i) for i in range(3)]
+        hashes = [bytestr_hash(c) for c in configs]
+
+        cache.add(hashes[0], configs[0])
+        cache.add(hashes[1], configs[1])
+        cache.read(hashes[0])
+        cache.add(hashes[2], configs[2])
+
+        self.assertIn(hashes[0], cache)
+        self.assertNotIn(hashes[1], cache)
+        self.assertIn(hashes[2], cache)
+        self.assertRaises(StorageError, lambda: storage.read(hashes[1]))
+        self.assertRaises(StorageError, lambda: cache.read(hashes[1]))
+
+    def test_index_is_persisted(self):
+        storage = MemoryStorage()
+        data = config_json(0)
+        ConfigurationCache(storage).add(bytestr_hash(data), data)
+
+        cache = ConfigurationCache(storage)
+
+        self.assertEqual(bytestr_hash(data), cache.most_recent)
+        self.assertEqual(data, cache.read(bytestr_hash(data)))
+
+    def test_parsed_configuration_is_reused(self):
+        cache = ConfigurationCache(MemoryStorage())
+        data = config_json(0)
+        cache.add(bytestr_hash(data), data)
+
+        config = cache.get_config(bytestr_hash(data))
+
+        self.assertIs(config, cache.get_config(bytestr_hash(data)))
+
+
+class TestCachedConfigurationUpload(unittest.TestCase):
+    def test_cached_configuration_does_not_need_to_be_uploaded_again(self):
+        cache = ConfigurationCache(MemoryStorage())
+        data = config_json(0)
+        md5 = bytestr_hash(data)
+
+        handler = LongMessageHandler(LongMessageStorage(MemoryStorage(), MemoryStorage(), cache))
+        handler.select_long_message_type(LongMessageType.CONFIGURATION_DATA)
+        handler.init_transfer(md5)
+        handler.upload_message(data)
+        handler.finalize_message()
+
+        # robot restarted, the temporary storage is empty
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage(), cache)
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.CONFIGURATION_DATA)
+
+        status = handler.read_status()
+        self.assertEqual(LongMessageStatus.READY, status.status)
+        self.assertEqual(len(data), status.length)
+
+        updated = []
+        handler.on_message_updated.add(updated.append)
+        handler.resume_transfer(md5)
+        self.assertEqual(len(data), handler.read_status().length)
+        handler.finalize_message()
+
+        self.assertEqual(1, len(updated))
+        self.assertEqual(data, storage.get_long_message(LongMessageType.CONFIGURATION_DATA))
+        self.assertIs(cache.get_config(md5), storage.get_configuration(md5))
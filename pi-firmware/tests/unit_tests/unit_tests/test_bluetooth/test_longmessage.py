@@ -1,16 +1,22 @@
 import unittest
+import zlib
 
 from mock import Mock, patch
 
 from revvy.bluetooth.longmessage import (
     LongMessageHandler,
+    LongMessageProtocol,
+    LongMessageProtocolResult,
+    LongMessageStorage,
     LongMessageError,
     LongMessageType,
     LongMessageStatusInfo,
     LongMessageStatus,
+    MessageType,
     hexdigest2bytes,
     UnusedLongMessageStatusInfo,
 )
+from revvy.utils.file_storage import MemoryStorage
 from revvy.utils.functions import bytestr_hash
 
 
@@ -223,3 +229,159 @@ class TestLongMessageHandler(unittest.TestCase):
                 self.assertEqual(0, storage.set_long_message.call_count)
                 self.assertEqual(mt, mock_callback.call_args.args[0].message_type)
                 self.assertEqual("012345", mock_callback.call_args.args[0].md5)
+
+    def test_interrupted_upload_can_be_resumed(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+        md5 = bytestr_hash(b"1234567890")
+
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.init_transfer(md5)
+        handler.upload_message(b"12345")
+
+        # connection is lost, the app starts over by selecting the message type
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.resume_transfer(md5)
+
+        status = handler.read_status()
+        self.assertEqual(LongMessageStatus.UPLOAD, status.status)
+        self.assertEqual(5, status.length)
+
+        handler.upload_message(b"67890")
+        handler.finalize_message()
+
+        self.assertEqual(LongMessageStatus.READY, handler.read_status().status)
+        self.assertEqual(b"1234567890", storage.get_long_message(LongMessageType.FRAMEWORK_DATA))
+
+    def test_resuming_a_different_message_starts_a_new_upload(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.init_transfer(bytestr_hash(b"12345"))
+        handler.upload_message(b"123")
+
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.resume_transfer(bytestr_hash(b"other"))
+
+        self.assertEqual(0, handler.read_status().length)
+
+    def test_chunks_can_be_uploaded_out_of_order(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.init_transfer(bytestr_hash(b"1234567890"))
+
+        handler.upload_message(b"67890", offset=5)
+        # status reports the end of the data received without gaps
+        self.assertEqual(0, handler.read_status().length)
+
+        handler.upload_message(b"12345", offset=0)
+        self.assertEqual(10, handler.read_status().length)
+
+        handler.finalize_message()
+
+        self.assertEqual(LongMessageStatus.READY, handler.read_status().status)
+        self.assertEqual(b"1234567890", storage.get_long_message(LongMessageType.FRAMEWORK_DATA))
+
+    def test_out_of_order_message_is_hashed_once_when_finalized(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+
+        handler = LongMessageHandler(storage)
+        on_finished = Mock(side_effect=lambda message: message.is_valid)
+        handler.on_upload_finished.add(on_finished)
+        handler.select_long_message_type(LongMessageType.FRAMEWORK_DATA)
+        handler.init_transfer(bytestr_hash(b"1234567890"))
+        handler.upload_message(b"67890", offset=5)
+        handler.upload_message(b"12345", offset=0)
+
+        with patch("revvy.utils.file_storage.bytestr_hash", wraps=bytestr_hash) as mock_hash:
+            handler.finalize_message()
+
+        self.assertEqual(1, on_finished.call_count)
+        self.assertEqual(LongMessageStatus.READY, handler.read_status().status)
+        self.assertEqual(1, mock_hash.call_count)
+
+    def test_offset_past_the_maximum_size_is_rejected(self):
+        handler = LongMessageHandler(LongMessageStorage(MemoryStorage(), MemoryStorage()))
+        ble = LongMessageProtocol(handler)
+
+        ble.handle_write(MessageType.SELECT_LONG_MESSAGE_TYPE.value, bytes([3]))
+        ble.handle_write(MessageType.INIT_TRANSFER.value, bytes(16))
+
+        with self.assertRaises(LongMessageError):
+            ble.handle_write(MessageType.UPLOAD_MESSAGE_AT_OFFSET.value, b"\xff\xff\xff\xff" + b"x")
+
+        self.assertEqual(0, handler.read_status().length)
+
+    def test_compressed_message_is_stored_decompressed(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+        data = b"some configuration " * 100
+        compressed = zlib.compress(data)
+        md5 = hexdigest2bytes(bytestr_hash(data))
+
+        handler = LongMessageHandler(storage)
+        ble = LongMessageProtocol(handler)
+
+        ble.handle_write(MessageType.SELECT_LONG_MESSAGE_TYPE.value, bytes([3]))
+        result = ble.handle_write(
+            MessageType.INIT_TRANSFER.value, md5 + (0).to_bytes(4, "big") + bytes([1])
+        )
+        self.assertEqual(LongMessageProtocolResult.RESULT_SUCCESS, result)
+
+        for i in range(0, len(compressed), 20):
+            ble.handle_write(MessageType.UPLOAD_MESSAGE.value, compressed[i : i + 20])
+
+        # the upload progress is the compressed length
+        self.assertEqual(len(compressed), handler.read_status().length)
+
+        ble.handle_write(MessageType.FINALIZE_MESSAGE.value, b"")
+
+        status = handler.read_status()
+        self.assertEqual(LongMessageStatus.READY, status.status)
+        self.assertEqual(len(data), status.length)
+        self.assertEqual(data, storage.get_long_message(LongMessageType.CONFIGURATION_DATA))
+
+    def test_corrupted_compressed_message_is_invalid(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+        data = b"some configuration " * 100
+        compressed = zlib.compress(data)
+
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.CONFIGURATION_DATA)
+
+        with self.subTest("truncated"):
+            handler.init_transfer(bytestr_hash(data), compressed=True)
+            handler.upload_message(compressed[:-10])
+            handler.finalize_message()
+            self.assertEqual(LongMessageStatus.VALIDATION_ERROR, handler.read_status().status)
+
+        handler.select_long_message_type(LongMessageType.CONFIGURATION_DATA)
+        with self.subTest("garbage"):
+            handler.init_transfer(bytestr_hash(data), compressed=True)
+            handler.upload_message(b"not compressed data")
+            handler.finalize_message()
+            self.assertEqual(LongMessageStatus.VALIDATION_ERROR, handler.read_status().status)
+
+    def test_decompressed_message_larger_than_the_maximum_size_is_invalid(self):
+        storage = LongMessageStorage(MemoryStorage(), MemoryStorage())
+        data = bytes(LongMessageType.TEST_KIT.max_size + 1)
+        compressed = zlib.compress(data)
+
+        handler = LongMessageHandler(storage)
+        handler.select_long_message_type(LongMessageType.TEST_KIT)
+        handler.init_transfer(bytestr_hash(data), compressed=True)
+        handler.upload_message(compressed)
+        handler.finalize_message()
+
+        self.assertEqual(LongMessageStatus.VALIDATION_ERROR, handler.read_status().status)
+
+    def test_unknown_transfer_flags_are_rejected(self):
+        handler = LongMessageHandler(LongMessageStorage(MemoryStorage(), MemoryStorage()))
+        ble = LongMessageProtocol(handler)
+
+        ble.handle_write(MessageType.SELECT_LONG_MESSAGE_TYPE.value, bytes([3]))
+        result = ble.handle_write(MessageType.INIT_TRANSFER.value, bytes(20) + bytes([2]))
+
+        self.assertEqual(LongMessageProtocolResult.RESULT_UNLIKELY_ERROR, result)
@@ -0,0 +1,54 @@
+import unittest
+
+from mock import patch
+
+from revvy.bluetooth.rate_governor import NotificationRateGovernor
+from revvy.utils.observable import Observable, ThrottleGroup
+
+
+class TestNotificationRateGovernor(unittest.TestCase):
+    @patch("revvy.bluetooth.rate_governor.time.monotonic")
+    def test_throttle_is_scaled_while_notifications_block(self, mock_time):
+        mock_time.return_value = 0
+        observable = Observable(0, throttle_interval=0.2)
+        throttle = ThrottleGroup()
+        throttle.add(observable)
+        governor = NotificationRateGovernor(throttle, window=1.0, max_notify_busy=0.1)
+
+        governor.record_notify(0.3)
+        mock_time.return_value = 1
+        governor.update()
+
+        self.assertEqual(2.0, governor.scale)
+        self.assertAlmostEqual(0.4, observable.throttle_interval)
+
+        mock_time.return_value = 2
+        governor.update()
+        mock_time.return_value = 3
+        governor.update()
+
+        self.assertEqual(1.0, governor.scale)
+        self.assertAlmostEqual(0.2, observable.throttle_interval)
+
+    @patch("revvy.bluetooth.rate_governor.time.monotonic")
+    def test_late_control_messages_lower_the_rate(self, mock_time):
+        mock_time.return_value = 0
+        throttle = ThrottleGroup()
+        governor = NotificationRateGovernor(throttle, window=1.0, max_control_gap=0.3)
+
+        for t in (0, 0.1, 0.2, 0.7):
+            mock_time.return_value = t
+            governor.record_control_message()
+
+        mock_time.return_value = 1.0
+        governor.update()
+        self.assertEqual(2.0, governor.scale)
+
+        # a pause longer than the window is not a sign of congestion
+        mock_time.return_value = 5.0
+        governor.record_control_message()
+        mock_time.return_value = 5.1
+        governor.record_control_message()
+        mock_time.return_value = 6.0
+        governor.update()
+        self.assertEqual(1.5, governor.scale)
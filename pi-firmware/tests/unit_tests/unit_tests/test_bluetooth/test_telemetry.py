@@ -0,0 +1,68 @@
+import unittest
+
+from revvy.bluetooth.telemetry import FLAG_KEYFRAME, TelemetryField, TelemetryFrameEncoder
+
+
+class TestTelemetryFrameEncoder(unittest.TestCase):
+    def test_first_frame_is_a_keyframe_with_every_value(self):
+        encoder = TelemetryFrameEncoder()
+        encoder.update(TelemetryField.TIMER, b"\x01\x02")
+        encoder.update(TelemetryField.SENSOR_2, b"\x03")
+
+        frame = encoder.encode()
+
+        self.assertEqual(
+            bytes([1, FLAG_KEYFRAME, 0, 0b01000010, 0, 1, 3, 2, 1, 2]),
+            frame,
+        )
+
+    def test_only_changed_values_are_sent(self):
+        encoder = TelemetryFrameEncoder()
+        encoder.update(TelemetryField.TIMER, b"\x01")
+        encoder.update(TelemetryField.ORIENTATION, b"\x02")
+        encoder.encode()
+
+        self.assertIsNone(encoder.encode())
+
+        encoder.update(TelemetryField.TIMER, b"\x01")
+        encoder.update(TelemetryField.ORIENTATION, b"\x03")
+        self.assertEqual(bytes([1, 0, 1, 0b00010000, 0, 1, 3]), encoder.encode())
+
+    def test_keyframe_is_sent_periodically(self):
+        encoder = TelemetryFrameEncoder(keyframe_interval=2)
+        encoder.update(TelemetryField.SENSOR_1, b"\x01")
+        encoder.update(TelemetryField.TIMER, b"\x01")
+        encoder.encode()
+
+        for value in range(2, 4):
+            encoder.update(TelemetryField.TIMER, bytes([value]))
+            frame = encoder.encode()
+            self.assertEqual(0, frame[1])
+
+        encoder.update(TelemetryField.TIMER, b"\x04")
+        frame = encoder.encode()
+        self.assertEqual(FLAG_KEYFRAME, frame[1])
+        self.assertEqual(bytes([0b01000001, 0]), frame[3:5])
+
+    def test_frames_are_limited_to_the_max_frame_size(self):
+        encoder = TelemetryFrameEncoder(max_frame_size=20)
+        encoder.update(TelemetryField.SENSOR_1, bytes(8))
+        encoder.update(TelemetryField.SENSOR_2, bytes(8))
+        encoder.update(TelemetryField.TIMER, bytes(4))
+
+        first = encoder.encode()
+        second = encoder.encode()
+
+        # the split keyframe is not flagged, the remaining field follows in the next frame
+        self.assertEqual(bytes([1, 0, 0, 0b01000001, 0]), first[0:5])
+        self.assertEqual(19, len(first))
+        self.assertEqual(bytes([1, 0, 1, 0b00000010, 0]), second[0:5])
+        self.assertIsNone(encoder.encode())
+
+    def test_values_longer_than_a_frame_are_rejected(self):
+        encoder = TelemetryFrameEncoder(max_frame_size=20)
+
+        self.assertFalse(encoder.update(TelemetryField.SCRIPT_VARIABLES, bytes(17)))
+        self.assertTrue(encoder.update(TelemetryField.TIMER, bytes(4)))
+
+        self.assertEqual(bytes([1, FLAG_KEYFRAME, 0, 0b01000000, 0]), encoder.encode()[0:5])
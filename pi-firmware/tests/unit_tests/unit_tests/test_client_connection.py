@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+from websockets.exceptions import ConnectionClosedError
+
+from revvy.api.client_connection import ClientConnection
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+class ClosedWebSocket:
+    async def send(self, message):
+        raise ConnectionClosedError(None, None)
+
+
+class TestClientConnection(unittest.TestCase):
+    def test_writer_sends_queued_messages_in_order(self):
+        async def scenario():
+            websocket = RecordingWebSocket()
+            client = ClientConnection(websocket)
+            writer = asyncio.ensure_future(client.run_writer())
+
+            client.enqueue("a")
+            client.enqueue(b"b")
+            await asyncio.sleep(0)
+
+            client.close()
+            await writer
+            return websocket.sent
+
+        self.assertEqual(["a", b"b"], asyncio.run(scenario()))
+
+    def test_state_updates_are_coalesced_while_queued(self):
+        async def scenario():
+            websocket = RecordingWebSocket()
+            client = ClientConnection(websocket)
+
+            client.enqueue("orientation 1", key="orientation")
+            client.enqueue("error")
+            client.enqueue("orientation 2", key="orientation")
+
+            writer = asyncio.ensure_future(client.run_writer())
+            await asyncio.sleep(0)
+            client.close()
+            await writer
+            return websocket.sent, client.stats
+
+        sent, stats = asyncio.run(scenario())
+        self.assertEqual(["error", "orientation 2"], sent)
+        self.assertEqual(1, stats.coalesced)
+
+    def test_state_updates_are_dropped_first_when_full(self):
+        async def scenario():
+            websocket = RecordingWebSocket()
+            client = ClientConnection(websocket, max_queued=2)
+
+            client.enqueue("sensor 1", key=1)
+            client.enqueue("sensor 2", key=2)
+            client.enqueue("error")
+
+            writer = asyncio.ensure_future(client.run_writer())
+            await asyncio.sleep(0)
+            client.close()
+            await writer
+            return websocket.sent
+
+        self.assertEqual(["error", "sensor 2"], asyncio.run(scenario()))
+
+    def test_closed_connection_does_not_queue(self):
+        websocket = RecordingWebSocket()
+        client = ClientConnection(websocket)
+        client.close()
+        client.enqueue("a")
+
+        self.assertEqual(0, client.stats.depth)
+
+    def test_writer_stops_when_the_connection_is_closed(self):
+        async def scenario():
+            client = ClientConnection(ClosedWebSocket())
+            writer = asyncio.ensure_future(client.run_writer())
+
+            client.enqueue("a")
+            await asyncio.wait_for(writer, 1)
+
+            client.enqueue("b")
+            return client.stats.depth
+
+        self.assertEqual(0, asyncio.run(scenario()))
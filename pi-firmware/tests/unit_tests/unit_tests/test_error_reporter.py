@@ -0,0 +1,72 @@
+import unittest
+
+from mock import patch
+
+from revvy.utils.error_reporter import ErrorHandler, RobotErrorType, compress_error
+
+
+class TestErrorHandler(unittest.TestCase):
+    def test_errors_are_sent_in_order(self):
+        handler = ErrorHandler()
+
+        handler.report_error(RobotErrorType.SYSTEM, "first")
+        handler.report_error(RobotErrorType.MCU, "second")
+
+        self.assertTrue(handler.pop_error().stack.startswith("first"))
+        self.assertTrue(handler.pop_error().stack.startswith("second"))
+        self.assertFalse(handler.has_error())
+
+    def test_repeated_errors_are_counted(self):
+        handler = ErrorHandler()
+
+        for _ in range(3):
+            handler.report_error(RobotErrorType.BLOCKLY_BUTTON, "error", 2)
+
+        error = handler.pop_error()
+        self.assertFalse(handler.has_error())
+        self.assertEqual(3, error.count)
+        self.assertTrue(compress_error(error).endswith(" [×3]".encode()))
+
+    def test_repeated_errors_are_queued_again_at_powers_of_two(self):
+        handler = ErrorHandler()
+
+        handler.report_error(RobotErrorType.SYSTEM, "error")
+        handler.pop_error()
+
+        queued_at = []
+        for i in range(2, 10):
+            handler.report_error(RobotErrorType.SYSTEM, "error")
+            if handler.has_error():
+                queued_at.append(handler.pop_error().count)
+
+        self.assertEqual([2, 4, 8], queued_at)
+
+    def test_storage_is_bounded(self):
+        handler = ErrorHandler(max_errors=2)
+
+        for i in range(4):
+            handler.report_error(RobotErrorType.SYSTEM, f"error {i}")
+
+        stats = handler.stats
+        self.assertEqual(4, stats.reported)
+        self.assertEqual(2, stats.distinct)
+        self.assertEqual(2, stats.evicted)
+        self.assertEqual(2, stats.dropped)
+
+        # the oldest errors are dropped
+        self.assertTrue(handler.pop_error().stack.startswith("error 2"))
+        self.assertTrue(handler.pop_error().stack.startswith("error 3"))
+
+    def test_logs_are_flushed_on_uncaught_exceptions(self):
+        handler = ErrorHandler()
+
+        with patch("revvy.utils.error_reporter.dump_binary_log"), patch(
+            "revvy.utils.error_reporter.flush_logs"
+        ) as flush_logs:
+            try:
+                raise ValueError("error")
+            except ValueError as e:
+                handler.handle_uncaught_system_exception(type(e), e, e.__traceback__)
+
+        flush_logs.assert_called_once()
+        self.assertEqual(RobotErrorType.SYSTEM, handler.pop_error().error_type)
@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 import unittest
 from mock.mock import patch, mock_open
 
@@ -44,6 +45,17 @@ class TestMemoryStorage(unittest.TestCase):
         storage.write("foo", b"data", md5="foobar")
         self.assertRaises(IntegrityError, lambda: storage.read("foo"))
 
+    def test_streamed_data_is_stored_when_committed(self):
+        storage = MemoryStorage()
+
+        writer = storage.open_writer("foo")
+        writer.write(b"da")
+        writer.write(b"ta")
+        self.assertRaises(StorageElementNotFoundError, lambda: storage.read("foo"))
+
+        writer.commit(md5="8d777f385d3dfec8815d20f7496026dc")
+        self.assertEqual(b"data", storage.read("foo"))
+
 
 class TestFileStorage(unittest.TestCase):
     @patch("revvy.utils.file_storage.open", new_callable=mock_open)
@@ -103,3 +115,64 @@ class TestFileStorage(unittest.TestCase):
 
         meta = storage.read_metadata("file")
         self.assertDictEqual({"md5": "md5", "length": 4}, meta)
+
+    def test_streamed_data_replaces_stored_file_when_committed(self):
+        with tempfile.TemporaryDirectory() as storage_dir:
+            storage = FileStorage(storage_dir)
+            storage.write("file", b"old data")
+
+            writer = storage.open_writer("file")
+            writer.write(b"new ")
+            writer.write(b"data")
+            self.assertEqual(b"old data", storage.read("file"))
+
+            writer.commit(md5="e83ca39a795e57283ec1d12eda0fecd3")
+
+            self.assertDictEqual(
+                {"md5": "e83ca39a795e57283ec1d12eda0fecd3", "length": 8},
+                storage.read_metadata("file"),
+            )
+            self.assertEqual(b"new data", storage.read("file"))
+            self.assertEqual(os.path.join(storage_dir, "file.data"), storage.path("file"))
+
+            self.assertListEqual(
+                ["access-test", "file.data", "file.meta"], sorted(os.listdir(storage_dir))
+            )
+
+    def test_aborted_stream_keeps_stored_file(self):
+        with tempfile.TemporaryDirectory() as storage_dir:
+            storage = FileStorage(storage_dir)
+            storage.write("file", b"old data")
+
+            writer = storage.open_writer("file")
+            writer.write(b"new data")
+            writer.abort()
+
+            self.assertEqual(b"old data", storage.read("file"))
+            self.assertListEqual(
+                ["access-test", "file.data", "file.meta"], sorted(os.listdir(storage_dir))
+            )
+
+    def test_suspended_stream_can_be_resumed(self):
+        with tempfile.TemporaryDirectory() as storage_dir:
+            storage = FileStorage(storage_dir)
+            self.assertIsNone(storage.resume_writer("file"))
+
+            writer = storage.open_writer("file")
+            writer.write(b"new ")
+            writer.suspend({"foo": "bar"})
+
+            # a new storage instance, as if the robot was restarted
+            storage = FileStorage(storage_dir)
+            resumed = storage.resume_writer("file")
+            assert resumed is not None
+
+            writer, state = resumed
+            self.assertDictEqual({"foo": "bar"}, state)
+            self.assertEqual(4, writer.length)
+
+            writer.write(b"data")
+            writer.commit(md5=writer.md5())
+
+            self.assertEqual(b"new data", storage.read("file"))
+            self.assertIsNone(storage.resume_writer("file"))
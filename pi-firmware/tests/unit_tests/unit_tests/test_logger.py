@@ -0,0 +1,48 @@
+import io
+import unittest
+
+from mock import Mock, patch
+
+from revvy.utils import logger
+from revvy.utils.logger import LogLevel, LogRecord, LogWriter, Logger
+
+
+class TestLogger(unittest.TestCase):
+    def test_filtered_messages_are_not_formatted(self):
+        log = Logger("[Test]", "[Test]", LogLevel.INFO, LogLevel.INFO)
+        message = Mock(return_value="message")
+        writer = Mock()
+
+        with patch.object(logger, "get_log_writer", return_value=writer):
+            log(message, LogLevel.DEBUG)
+            self.assertEqual(0, message.call_count)
+            self.assertEqual(0, writer.write.call_count)
+
+            log(message, LogLevel.WARNING)
+            self.assertEqual(1, message.call_count)
+            self.assertEqual("message", writer.write.call_args[0][0].message)
+
+    def test_enabled_for(self):
+        log = Logger("[Test]", "[Test]", LogLevel.INFO, LogLevel.WARNING)
+
+        self.assertFalse(log.enabled_for(LogLevel.INFO))
+        self.assertTrue(log.enabled_for(LogLevel.ERROR))
+        self.assertFalse(log.enabled_for(LogLevel.OFF))
+
+
+class TestLogWriter(unittest.TestCase):
+    def test_oldest_records_are_dropped_when_full(self):
+        writer = LogWriter(2)
+        output = io.StringIO()
+
+        for i in range(4):
+            writer.write(LogRecord(0, LogLevel.INFO, "MainThread", "[Test]", f"message {i}"))
+
+        with patch("sys.stdout", output):
+            writer.flush()
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual("[Logger] 2 messages were dropped", lines[0])
+        self.assertTrue(lines[1].endswith("[Test] message 2"))
+        self.assertTrue(lines[2].endswith("[Test] message 3"))
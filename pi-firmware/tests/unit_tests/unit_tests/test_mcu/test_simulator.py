@@ -0,0 +1,162 @@
+import struct
+import unittest
+
+from revvy.mcu.rrrc_control import RevvyControl
+from revvy.mcu.simulator import SimulatedMcu, SimulatorTransport
+from revvy.robot.status_updater import StatusSlot, iter_slots
+
+motor_config = bytes(81)
+motor_status = struct.Struct("<bblfB")
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def create_control(**kwargs) -> tuple[RevvyControl, SimulatedMcu, FakeClock]:
+    clock = FakeClock()
+    mcu = SimulatedMcu(clock=clock, pending_polls=kwargs.pop("pending_polls", 0))
+    transport = SimulatorTransport(mcu, **kwargs)
+    return transport.create_application_control(), mcu, clock
+
+
+def read_motor_status(control: RevvyControl, port: int):
+    slots = dict(iter_slots(control.status_updater_read()))
+    return motor_status.unpack(slots[StatusSlot.motor_slot(port)])
+
+
+class TestSimulatedMcu(unittest.TestCase):
+    def test_robot_description_is_reported(self):
+        control, mcu, _ = create_control()
+
+        control.ping()
+        self.assertEqual(6, control.get_motor_port_amount())
+        self.assertEqual(4, control.get_sensor_port_amount())
+        self.assertEqual(12, control.ring_led_get_led_amount())
+        self.assertEqual(
+            {"NotConfigured": 0, "DcMotor": 1, "DcMotorEmulator": 2},
+            control.get_motor_port_types(),
+        )
+        self.assertEqual(5, control.ring_led_get_scenario_types()["BreathingGreen"])
+        self.assertEqual("2.0.0", str(control.get_hardware_version()))
+
+        control.ring_led_set_scenario(5)
+        self.assertEqual(5, mcu.ring_led_scenario)
+
+    def test_only_changed_slots_are_read(self):
+        control, _, _ = create_control()
+
+        control.status_updater_control(StatusSlot.BATTERY, True)
+        control.status_updater_control(StatusSlot.RESET, True)
+
+        self.assertEqual(
+            [(StatusSlot.BATTERY, bytes([0, 100, 1, 100])), (StatusSlot.RESET, b"\x5a")],
+            list(iter_slots(control.status_updater_read())),
+        )
+        self.assertEqual(b"", control.status_updater_read())
+
+    def test_motor_reaches_requested_speed(self):
+        control, _, clock = create_control()
+
+        self.assertTrue(control.set_motor_port_type(0, 1))
+        control.set_motor_port_config(0, motor_config)
+        control.status_updater_control(StatusSlot.motor_slot(0), True)
+
+        # port 0, speed request of 60rpm
+        versions = control.set_motor_port_control_value(bytes([5 << 3, 1, *struct.pack("<f", 60)]))
+        self.assertEqual(1, len(versions))
+
+        clock.time = 1.0
+        status, power, pos, speed, version = read_motor_status(control, 0)
+
+        self.assertEqual(versions[0], version)
+        self.assertAlmostEqual(60, speed, delta=1)
+        self.assertGreater(power, 0)
+        self.assertGreater(pos, 300)
+
+    def test_motor_reaches_requested_position(self):
+        control, _, clock = create_control()
+
+        control.set_motor_port_type(0, 1)
+        control.set_motor_port_config(0, motor_config)
+        control.status_updater_control(StatusSlot.motor_slot(0), True)
+
+        # port 0, relative position request of 90 degrees
+        control.set_motor_port_control_value(bytes([5 << 3, 3, *struct.pack("<l", 90)]))
+
+        clock.time = 2.0
+        status, _, pos, _, _ = read_motor_status(control, 0)
+
+        self.assertEqual(2, status)
+        self.assertAlmostEqual(90, pos, delta=1)
+
+    def test_blocked_motor_is_reported(self):
+        control, mcu, clock = create_control()
+
+        control.set_motor_port_type(0, 1)
+        control.set_motor_port_config(0, motor_config)
+        control.status_updater_control(StatusSlot.motor_slot(0), True)
+        mcu.motors[0].blocked = True
+
+        control.set_motor_port_control_value(bytes([5 << 3, 3, *struct.pack("<l", 90)]))
+
+        clock.time = 1.0
+        status, _, pos, _, _ = read_motor_status(control, 0)
+
+        self.assertEqual(1, status)
+        self.assertEqual(0, pos)
+
+    def test_pending_commands_are_polled(self):
+        control, mcu, _ = create_control(pending_polls=3)
+
+        self.assertTrue(control.set_motor_port_type(2, 1))
+        self.assertEqual(1, mcu.motor_port_types[2])
+
+    def test_error_memory(self):
+        control, _, _ = create_control()
+
+        control.error_memory_test()
+        control.error_memory_test()
+
+        self.assertEqual(2, control.error_memory_read_count())
+        errors = control.error_memory_read_errors(1)
+        self.assertEqual(1, len(errors))
+        self.assertEqual(3, errors[0][0])
+
+        control.error_memory_clear()
+        self.assertEqual(0, control.error_memory_read_count())
+
+
+class TestSimulatorTransport(unittest.TestCase):
+    def test_busy_responses_are_retried(self):
+        mcu = SimulatedMcu(clock=FakeClock())
+        transport = SimulatorTransport(mcu, busy_probability=0.5, seed=1)
+        control = transport.create_application_control()
+
+        for _ in range(20):
+            self.assertEqual(6, control.get_motor_port_amount())
+
+        self.assertGreater(transport.stats.busy_responses, 0)
+
+    def test_corrupted_data_is_not_accepted(self):
+        mcu = SimulatedMcu(clock=FakeClock())
+        transport = SimulatorTransport(mcu, bit_error_rate=0.005, seed=2)
+        control = transport.create_application_control()
+
+        succeeded = 0
+        for _ in range(50):
+            try:
+                port_types = control.get_motor_port_types()
+            except ValueError:
+                # a corrupted length field is reported as an error, like on the real MCU
+                continue
+
+            self.assertEqual({"NotConfigured": 0, "DcMotor": 1, "DcMotorEmulator": 2}, port_types)
+            succeeded += 1
+
+        self.assertGreater(transport.stats.corrupted_frames, 0)
+        self.assertGreater(succeeded, 0)
@@ -0,0 +1,77 @@
+import binascii
+import os
+import tempfile
+import unittest
+
+from revvy.mcu.rrrc_control import DeviceTransportBase
+from revvy.mcu.rrrc_transport import (
+    RevvyTransport,
+    RevvyTransportInterface,
+    ResponseStatus,
+    TransportException,
+    crc7,
+)
+from revvy.mcu.transport_recording import (
+    RecordingTransport,
+    ReplayTransport,
+    TransportRecorder,
+    read_frames,
+)
+from revvy.utils.version import Version
+
+
+def response(payload: bytes) -> bytes:
+    checksum = binascii.crc_hqx(payload, 0xFFFF)
+    header = bytes([ResponseStatus.Ok.value, len(payload), checksum & 0xFF, checksum >> 8])
+    return header + bytes([crc7(header)]) + payload
+
+
+class FakeDevice(RevvyTransportInterface):
+    """Responds to every command with its command id, increased by a counter"""
+
+    def __init__(self):
+        self._response = b""
+        self._counter = 0
+
+    def write(self, data: bytes):
+        self._counter += 1
+        self._response = response(bytes([data[1], self._counter]))
+
+    def read(self, length: int) -> bytes:
+        return self._response[:length]
+
+
+class FakeTransport(DeviceTransportBase):
+    def create_device(self, address: int) -> RevvyTransportInterface:
+        return FakeDevice()
+
+
+class TestTransportRecording(unittest.TestCase):
+    def test_recording_is_replayed_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.i2c")
+
+            recorder = TransportRecorder(path, Version("2.0"))
+            recording = RecordingTransport(FakeTransport(), recorder)
+            transport = RevvyTransport(recording.create_device(0x2D))
+            recorded = [transport.send_command(command) for command in (1, 2, 1)]
+            recorder.close()
+
+            # write, read header, read header and payload for each command
+            self.assertEqual(9, len(read_frames(path)))
+
+            replay = ReplayTransport(path)
+            self.assertEqual(Version("2.0"), replay.hw_version)
+            transport = RevvyTransport(replay.create_device(0x2D))
+
+            self.assertEqual(recorded[1], transport.send_command(2))
+            self.assertEqual(recorded[0], transport.send_command(1))
+            self.assertEqual(recorded[2], transport.send_command(1))
+            self.assertEqual((3, 3), replay.progress)
+            self.assertFalse(replay.finished.is_set())
+
+            # the last response is repeated when the recording runs out
+            self.assertEqual(recorded[2], transport.send_command(1))
+            self.assertTrue(replay.finished.is_set())
+
+            self.assertRaises(TransportException, lambda: transport.send_command(3))
@@ -0,0 +1,68 @@
+import unittest
+
+from mock import Mock
+
+from revvy.utils.message_queue import PRIORITY_HIGH, PRIORITY_NORMAL, MessageQueue
+
+
+class TestMessageQueue(unittest.TestCase):
+    def test_messages_are_returned_in_order(self):
+        queue = MessageQueue(4)
+        queue.put(1)
+        queue.put(2)
+        queue.put(3)
+
+        self.assertEqual([1, 2, 3], [queue.get().value for _ in range(3)])
+        self.assertIsNone(queue.get())
+
+    def test_higher_priority_messages_are_returned_first(self):
+        queue = MessageQueue(4)
+        queue.put(1)
+        queue.put(2, priority=PRIORITY_HIGH)
+
+        self.assertEqual(2, queue.get().value)
+        self.assertEqual(1, queue.get().value)
+
+    def test_messages_with_the_same_key_are_coalesced(self):
+        queue = MessageQueue(4)
+        first = Mock()
+        second = Mock()
+        queue.put(1, first, key="a")
+        queue.put(2)
+        queue.put(3, second, key="a")
+
+        self.assertEqual(2, len(queue))
+
+        message = queue.get()
+        self.assertEqual(3, message.value)
+        message.on_done()
+        self.assertEqual(1, first.call_count)
+        self.assertEqual(1, second.call_count)
+
+        # the key can be used again once the message is taken out
+        queue.put(4, key="a")
+        self.assertEqual(2, len(queue))
+
+    def test_oldest_least_important_message_is_dropped_when_full(self):
+        queue = MessageQueue(2)
+        self.assertTrue(queue.put(1, priority=PRIORITY_HIGH))
+        self.assertTrue(queue.put(2))
+        self.assertTrue(queue.put(3))
+        self.assertTrue(queue.put(4, priority=PRIORITY_HIGH))
+        self.assertFalse(queue.put(5))
+
+        self.assertEqual([1, 4], [queue.get().value for _ in range(2)])
+        self.assertEqual((5, 0, 3, 0, 2), queue.stats)
+
+    def test_callbacks_of_dropped_messages_are_called(self):
+        queue = MessageQueue(1)
+        dropped = Mock()
+        rejected = Mock()
+        queued = Mock()
+        self.assertTrue(queue.put(1, dropped))
+        self.assertTrue(queue.put(2, queued, priority=PRIORITY_HIGH))
+        self.assertFalse(queue.put(3, rejected))
+
+        self.assertEqual(1, dropped.call_count)
+        self.assertEqual(1, rejected.call_count)
+        self.assertEqual(0, queued.call_count)
@@ -1,13 +1,26 @@
 import unittest
 from unittest.mock import Mock
 
+from revvy.robot.rc_message_parser import parse_control_message
 from revvy.robot.remote_controller import (
     BleAutonomousCmd,
+    ControlMessageQueue,
     RemoteController,
     RemoteControllerCommand,
 )
 
 
+def command(
+    buttons: int, analog=b"\x7f\x7f", background_command=BleAutonomousCmd.NONE
+) -> RemoteControllerCommand:
+    return RemoteControllerCommand(
+        buttons=buttons,
+        analog=analog,
+        background_command=background_command,
+        next_deadline=0,
+    )
+
+
 class TestRemoteController(unittest.TestCase):
     # This tests manually properly, I will rewrite this, until then, the function
     # became more self explanatory.
@@ -52,7 +65,7 @@ class TestRemoteController(unittest.TestCase):
 
         rc.process_control_message(
             RemoteControllerCommand(
-                buttons=[False] * 4,
+                buttons=0,
                 analog=bytearray([255, 254, 253, 123, 43, 65, 45, 42]),
                 background_command=BleAutonomousCmd.NONE,
                 next_deadline=0,
@@ -67,3 +80,71 @@ class TestRemoteController(unittest.TestCase):
 
         self.assertEqual(mock24.start.call_args.kwargs["channels"], [253, 43])
         self.assertEqual(mock3.start.call_args.kwargs["channels"], [123])
+
+    def test_button_press_starts_and_second_press_stops_script(self) -> None:
+        button3 = Mock()
+        button3.is_running = False
+        button5 = Mock()
+        button5.is_running = False
+
+        rc = RemoteController()
+        rc.link_button_to_runner(3, button3)
+        rc.link_button_to_runner(5, button5)
+
+        rc.process_control_message(command(1 << 3))
+        self.assertEqual(1, button3.start.call_count)
+        button3.is_running = True
+
+        # holding the button does nothing while the script runs
+        rc.process_control_message(command(1 << 3))
+        rc.process_control_message(command(0))
+        self.assertEqual(0, button3.stop.call_count)
+
+        rc.process_control_message(command(1 << 3))
+        self.assertEqual(1, button3.stop.call_count)
+        self.assertEqual(1, button3.start.call_count)
+
+        self.assertEqual(0, button5.start.call_count)
+
+
+class TestControlMessageQueue(unittest.TestCase):
+    def test_waiting_messages_are_merged(self) -> None:
+        queue = ControlMessageQueue()
+        queue.put(command(0b01, b"\x01", BleAutonomousCmd.START))
+        queue.put(command(0b10, b"\x02"))
+        queue.put(command(0b00, b"\x03"))
+
+        message = queue.get(0)
+
+        self.assertEqual(0b11, message.buttons)
+        self.assertEqual(b"\x03", message.analog)
+        self.assertEqual(BleAutonomousCmd.START, message.background_command)
+        self.assertEqual(2, queue.stats.merged)
+
+    def test_get_returns_none_on_timeout(self) -> None:
+        queue = ControlMessageQueue()
+
+        self.assertIsNone(queue.get(0.01))
+
+    def test_dropped_messages_are_counted(self) -> None:
+        queue = ControlMessageQueue(capacity=2)
+        for i in range(5):
+            queue.put(command(1 << i))
+
+        self.assertEqual(0b11000, queue.get(0).buttons)
+        self.assertEqual((5, 1, 3), queue.stats[0:3])
+
+
+class TestParseControlMessage(unittest.TestCase):
+    def test_short_message_has_no_deadline_and_buttons(self) -> None:
+        message = parse_control_message(b"\x00\x7f\x7f")
+
+        self.assertEqual(b"\x7f\x7f", message.analog)
+        self.assertEqual(0, message.next_deadline)
+        self.assertEqual(0, message.buttons)
+
+    def test_partial_button_bytes_are_parsed(self) -> None:
+        message = parse_control_message(bytearray([0, 1, 2, 3, 4, 5, 6, 100, 0, 0, 0, 0x05]))
+
+        self.assertEqual(100, message.next_deadline)
+        self.assertEqual(0x05, message.buttons)
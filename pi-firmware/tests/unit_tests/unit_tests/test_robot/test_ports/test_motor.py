@@ -102,6 +102,27 @@ class TestMotorPortHandler(unittest.TestCase):
         )
         self.assertEqual(6, mock_control.set_motor_port_type.call_count)
 
+    def test_reset_keeps_preserved_ports_configured(self):
+        mock_control = Mock()
+        mock_control.get_motor_port_amount = Mock(return_value=6)
+        mock_control.get_motor_port_types = Mock(return_value={"NotConfigured": 0, "Test": 1})
+        mock_control.set_motor_port_type = Mock()
+
+        ports = MotorPortHandler(mock_control)
+        config = DriverConfig(driver=TestDriver, config={})
+
+        self.assertIsNone(ports[1].config)
+        ports[1].configure(config)
+        ports[2].configure(config)
+        self.assertEqual(config, ports[1].config)
+
+        driver = ports[1].driver
+        ports.reset(preserved=[ports[1]])
+
+        self.assertIs(driver, ports[1].driver)
+        self.assertEqual(config, ports[1].config)
+        self.assertIsNone(ports[2].config)
+
 
 class TestDcMotorDriver(unittest.TestCase):
     config = Motors.RevvyMotor.config
@@ -0,0 +1,91 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from mock import Mock, patch
+
+from revvy.robot.status_updater import StatusSlot
+from revvy.robot.telemetry_recorder import (
+    HEADER,
+    RECORD,
+    RECORDING_MAGIC,
+    RecorderError,
+    TelemetryRecorder,
+)
+
+
+def slot(slot_id: int, data: bytes) -> bytes:
+    return bytes([slot_id, len(data)]) + data
+
+
+def status_read(motor_pos: int, yaw: float) -> bytes:
+    return slot(StatusSlot.MOTOR_2, struct.pack("<bblfB", 0, 50, motor_pos, 12.5, 0)) + slot(
+        StatusSlot.ORIENTATION, struct.pack("<3f", 0, 0, yaw)
+    )
+
+
+def read_records(path: str) -> list:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, record_size, count = HEADER.unpack_from(data)
+    assert magic == RECORDING_MAGIC
+    assert record_size == RECORD.size
+    assert len(data) == HEADER.size + count * RECORD.size
+
+    return [RECORD.unpack_from(data, HEADER.size + i * RECORD.size) for i in range(count)]
+
+
+@patch("revvy.robot.telemetry_recorder.periodic", Mock())
+class TestTelemetryRecorder(unittest.TestCase):
+    def test_records_are_saved_to_the_file(self):
+        status_updater = Mock()
+        recorder = TelemetryRecorder(status_updater)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recordings", "test.rec")
+            recorder.start(path)
+            self.assertTrue(recorder.is_recording)
+            self.assertRaises(RecorderError, lambda: recorder.start(path))
+
+            tap = status_updater.set_tap.call_args[0][0]
+            tap(status_read(10, 1.5))
+            tap(b"")
+
+            stats = recorder.stop()
+            self.assertFalse(recorder.is_recording)
+            status_updater.set_tap.assert_called_with(None)
+
+            records = read_records(path)
+
+        self.assertEqual((2, 0), stats)
+        self.assertEqual(2, len(records))
+
+        first = records[0]
+        self.assertEqual((1 << StatusSlot.MOTOR_2) | (1 << StatusSlot.ORIENTATION), first[1])
+        power, pos, speed, yaw = first[3], first[9], first[15], first[22]
+        self.assertEqual((50, 10, 12.5, 1.5), (power, pos, speed, yaw))
+
+        # values that were not updated are repeated
+        self.assertEqual(0, records[1][1])
+        self.assertEqual(first[2:], records[1][2:])
+
+    def test_ring_buffer_overflow_and_full_file_drop_records(self):
+        status_updater = Mock()
+        recorder = TelemetryRecorder(status_updater, ring_size=4)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test.rec")
+            recorder.start(path, max_records=3)
+
+            tap = status_updater.set_tap.call_args[0][0]
+            for i in range(6):
+                tap(status_read(i, 0))
+
+            stats = recorder.stop()
+            records = read_records(path)
+
+        # 2 records were overwritten in the ring buffer, 1 did not fit into the file
+        self.assertEqual((3, 3), stats)
+        self.assertEqual([2, 3, 4], [record[9] for record in records])
@@ -3,7 +3,7 @@ import unittest
 from revvy.robot.configurations import Sensors, Motors, ccw_motor
 from revvy.scripting.builtin_scripts import drive_2sticks
 from revvy.utils.functions import b64_encode_str
-from revvy.robot_config import RobotConfig, ConfigError
+from revvy.robot_config import RobotConfig, ConfigError, diff_configs
 
 
 class TestRobotConfig(unittest.TestCase):
@@ -497,3 +497,62 @@ class TestRobotConfig(unittest.TestCase):
 
         config = RobotConfig.from_string(json)
         self.assertIsNotNone(config)
+
+
+class TestConfigDiff(unittest.TestCase):
+    @staticmethod
+    def create_config(source: str, motors: str) -> RobotConfig:
+        json = """
+        {
+            "robotConfig": {
+                "motors": MOTORS
+            },
+            "blocklyList": [
+                {
+                    "pythonCode": "SOURCE",
+                    "assignments": {
+                        "buttons": [{"id": 0, "priority": 2}],
+                        "background": 1
+                    }
+                },
+                {
+                    "builtinScriptName": "drive_2sticks",
+                    "assignments": {
+                        "analog": [{"channels": [0, 1], "priority": 0}]
+                    }
+                }
+            ]
+        }"""
+        return RobotConfig.from_string(
+            json.replace("SOURCE", b64_encode_str(source)).replace("MOTORS", motors)
+        )
+
+    def test_identical_configs_have_no_changes(self):
+        motors = '[{"type": 1, "name": "M1"}]'
+        diff = diff_configs(
+            self.create_config("some code", motors), self.create_config("some code", motors)
+        )
+
+        self.assertEqual(
+            {"script_0_button_0", "script_0_background_0", "script_1_analog_channels_0_1"},
+            diff.unchanged_scripts,
+        )
+
+    def test_changed_source_is_detected(self):
+        diff = diff_configs(
+            self.create_config("some code", '[{"type": 1, "name": "M1"}]'),
+            self.create_config(
+                "other code", '[{"type": 2, "side": 0, "reversed": 0, "name": "M1"}]'
+            ),
+        )
+
+        # port names did not change, so the unchanged builtin script is kept
+        self.assertEqual({"script_1_analog_channels_0_1"}, diff.unchanged_scripts)
+
+    def test_renamed_ports_invalidate_all_scripts(self):
+        diff = diff_configs(
+            self.create_config("some code", '[{"type": 1, "name": "M1"}]'),
+            self.create_config("some code", '[{"type": 1, "name": "M2"}]'),
+        )
+
+        self.assertEqual(set(), diff.unchanged_scripts)
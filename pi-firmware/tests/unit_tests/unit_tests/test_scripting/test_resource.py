@@ -81,3 +81,12 @@ class TestResource(unittest.TestCase):
 
         self.assertTrue(handle.is_interrupted)
         self.assertFalse(handle2.is_interrupted)
+
+    def test_contention_is_counted(self):
+        r = Resource()
+
+        r.request(priority_low)
+        r.request(priority_high)
+        r.request(priority_low)
+
+        self.assertEqual((3, 1, 1), r.stats)
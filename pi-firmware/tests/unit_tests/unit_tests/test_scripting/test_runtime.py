@@ -9,6 +9,8 @@ from revvy.hardware_dependent.sound import SoundControlBase
 from revvy.scripting.resource import Resource
 from revvy.scripting.robot_interface import PortCollection
 from revvy.scripting.runtime import ScriptManager, ScriptDescriptor
+from revvy.scripting.variables import Variable
+from revvy.utils.functions import str_to_func
 
 
 class mockobj:
@@ -305,6 +307,28 @@ while not ctx.stop_requested:
 
         self.assertEqual(2, stopped_mock.call_count)
 
+    def test_reset_keeps_the_requested_scripts(self):
+        robot_mock = create_robot_mock()
+
+        sm = ScriptManager(robot_mock, wrapper=RobotInterfaceMock)
+        sm.add_script(ScriptDescriptor.from_string("test", "mock()", 0))
+        sm.add_script(ScriptDescriptor.from_string("test2", "mock()", 0))
+        kept = sm["test"]
+
+        sm.reset(keep=["test"])
+
+        self.assertIn("test", sm)
+        self.assertNotIn("test2", sm)
+        self.assertIs(kept, sm["test"])
+
+        # globals are reset for kept scripts, too
+        mock = Mock()
+        sm.assign("mock", mock)
+        sm["test"].start()
+        sm["test"].cleanup()
+
+        self.assertEqual(1, mock.call_count)
+
     def test_script_can_stop_itself(self):
         robot_mock = create_robot_mock()
 
@@ -412,3 +436,32 @@ while not ctx.stop_requested:
             self.fail("Script.on_stopped handler was not called")
 
         sm.reset()
+
+    def test_script_reports_variables_bound_to_it(self):
+        robot_mock = create_robot_mock()
+
+        own_variable = Variable()
+        own_variable.bind(1, "speed")
+        other_variable = Variable()
+        other_variable.bind(2, "speed")
+
+        code = """
+ReportVariableChanged("speed", 5)
+ReportVariableChanged("unknown", 3)
+mock(own_variable.value, other_variable.value_is_set())
+"""
+        mock = Mock()
+
+        sm = ScriptManager(robot_mock, wrapper=RobotInterfaceMock)
+        sm.add_script(ScriptDescriptor("test", str_to_func(code, 1), 0, code))
+        sm.assign("list_slots", [other_variable, own_variable])
+        sm.assign("own_variable", own_variable)
+        sm.assign("other_variable", other_variable)
+        sm.assign("mock", mock)
+
+        script = sm["test"]
+        script.start()
+        script.stop().wait(2)
+        script.cleanup()
+
+        mock.assert_called_once_with(5, False)
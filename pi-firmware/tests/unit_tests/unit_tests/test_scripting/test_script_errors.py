@@ -0,0 +1,65 @@
+import unittest
+
+from mock import patch
+
+from revvy.scripting import script_errors
+from revvy.scripting.runtime import ScriptDescriptor
+from revvy.scripting.script_errors import ScriptErrorFilter
+
+
+def run_script(descriptor: ScriptDescriptor, **kwargs) -> Exception:
+    try:
+        descriptor.runnable(**kwargs)
+    except Exception as e:
+        return e
+    raise AssertionError("Script did not raise")
+
+
+class TestScriptErrorFilter(unittest.TestCase):
+    def test_repeated_errors_are_formatted_once(self):
+        descriptor = ScriptDescriptor.from_string("test", "x = 1 / value", 0)
+        errors = ScriptErrorFilter()
+
+        with patch.object(
+            script_errors.traceback, "format_exception", return_value=["formatted"]
+        ) as format_exception:
+            first = errors.format(descriptor, run_script(descriptor, value=0))
+            second = errors.format(descriptor, run_script(descriptor, value=0))
+
+        self.assertEqual(("formatted", True), first)
+        self.assertEqual(("formatted", False), second)
+        self.assertEqual(1, format_exception.call_count)
+
+    def test_errors_of_different_locations_are_formatted(self):
+        descriptor = ScriptDescriptor.from_string("test", "x = 1 / value\nundefined()", 0)
+        errors = ScriptErrorFilter()
+
+        zero_division, first = errors.format(descriptor, run_script(descriptor, value=0))
+        name_error, second = errors.format(descriptor, run_script(descriptor, value=1))
+
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertIn("ZeroDivisionError", zero_division)
+        self.assertIn("NameError", name_error)
+
+    def test_errors_with_different_messages_are_formatted(self):
+        descriptor = ScriptDescriptor.from_string("test", "{}[value]", 0)
+        errors = ScriptErrorFilter()
+
+        key_a, first = errors.format(descriptor, run_script(descriptor, value="a"))
+        key_b, second = errors.format(descriptor, run_script(descriptor, value="b"))
+
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertIn("KeyError: 'a'", key_a)
+        self.assertIn("KeyError: 'b'", key_b)
+
+    def test_oldest_errors_are_forgotten(self):
+        descriptors = [ScriptDescriptor.from_string(f"s{i}", "1 / 0", 0) for i in range(3)]
+        errors = ScriptErrorFilter(max_errors=2)
+
+        for descriptor in descriptors:
+            errors.format(descriptor, run_script(descriptor))
+
+        self.assertTrue(errors.format(descriptors[0], run_script(descriptors[0]))[1])
+        self.assertFalse(errors.format(descriptors[2], run_script(descriptors[2]))[1])
@@ -0,0 +1,162 @@
+import sys
+import unittest
+from threading import Event
+
+from mock import Mock
+
+from revvy.scripting.runtime import ScriptDescriptor, ScriptEvent, ScriptManager
+from revvy.scripting.watchdog import ScriptBudget, ScriptBudgetExceededError, ScriptWatchdog
+
+
+class TestScriptWatchdog(unittest.TestCase):
+    def test_busy_script_is_interrupted_when_over_budget(self):
+        watchdog = ScriptWatchdog(
+            budgets={0: ScriptBudget(cpu_share=0.1, raise_after=0.1)}, period=0.05
+        )
+        sm = ScriptManager(Mock(), wrapper=Mock(), watchdog=watchdog)
+        sm.add_script(
+            ScriptDescriptor.from_string(
+                "test",
+                """
+while not ctx.stop_requested:
+    time.sleep(0)
+""",
+                0,
+            )
+        )
+
+        errored = Event()
+        errors = []
+
+        def on_error(_script, error):
+            errors.append(error)
+            errored.set()
+
+        sm["test"].on(ScriptEvent.ERROR, on_error)
+
+        watchdog.start()
+        try:
+            sm["test"].start()
+            self.assertTrue(errored.wait(2))
+            self.assertIsInstance(errors[0], ScriptBudgetExceededError)
+        finally:
+            sm.reset()
+            watchdog.exit()
+
+    def test_budget_error_can_be_caught_by_the_script(self):
+        watchdog = ScriptWatchdog(
+            budgets={0: ScriptBudget(cpu_share=0.1, raise_after=0.1)}, period=0.05
+        )
+        sm = ScriptManager(Mock(), wrapper=Mock(), watchdog=watchdog)
+        sm.add_script(
+            ScriptDescriptor.from_string(
+                "test",
+                """
+try:
+    while not ctx.stop_requested:
+        time.sleep(0)
+except Exception:
+    mock()
+""",
+                0,
+            )
+        )
+        mock = Mock()
+        sm.assign("mock", mock)
+
+        stopped = Event()
+        sm["test"].on_stopped(stopped.set)
+
+        watchdog.start()
+        try:
+            sm["test"].start()
+            self.assertTrue(stopped.wait(2))
+            self.assertEqual(1, mock.call_count)
+        finally:
+            sm.reset()
+            watchdog.exit()
+
+    def test_sleeping_script_is_not_throttled(self):
+        watchdog = ScriptWatchdog(default_budget=ScriptBudget(cpu_share=0.5, raise_after=0))
+        sm = ScriptManager(Mock(), wrapper=Mock(), watchdog=watchdog)
+        sm.add_script(
+            ScriptDescriptor.from_string(
+                "test",
+                """
+running.set()
+while not ctx.stop_requested:
+    time.sleep(0.01)
+""",
+                3,
+            )
+        )
+        running = Event()
+        sm.assign("running", running)
+        error = Mock()
+        sm["test"].on(ScriptEvent.ERROR, error)
+
+        switch_interval = sys.getswitchinterval()
+        try:
+            sm["test"].start()
+            self.assertTrue(running.wait(2))
+            for _ in range(3):
+                Event().wait(0.05)
+                watchdog.check()
+
+            self.assertEqual(switch_interval, sys.getswitchinterval())
+        finally:
+            sm.reset()
+            watchdog.exit()
+
+        self.assertEqual(0, error.call_count)
+
+    def test_script_is_only_interrupted_at_a_safe_point(self):
+        watchdog = ScriptWatchdog(
+            budgets={0: ScriptBudget(cpu_share=0.1, raise_after=0.1)}, period=0.05
+        )
+        sm = ScriptManager(Mock(), wrapper=Mock(), watchdog=watchdog)
+        sm.add_script(
+            ScriptDescriptor.from_string(
+                "test",
+                """
+while not interrupted.is_set():
+    pass
+mock()
+time.sleep(0)
+mock()
+""",
+                0,
+            )
+        )
+        interrupted = Event()
+        mock = Mock()
+        sm.assign("interrupted", interrupted)
+        sm.assign("mock", mock)
+
+        script = sm["test"]
+        interrupt = script.interrupt_budget_exceeded
+
+        def _interrupt():
+            interrupt()
+            interrupted.set()
+
+        script.interrupt_budget_exceeded = _interrupt
+
+        errored = Event()
+        errors = []
+
+        def on_error(_script, error):
+            errors.append(error)
+            errored.set()
+
+        script.on(ScriptEvent.ERROR, on_error)
+
+        watchdog.start()
+        try:
+            script.start()
+            self.assertTrue(errored.wait(2))
+            self.assertIsInstance(errors[0], ScriptBudgetExceededError)
+            self.assertEqual(1, mock.call_count)
+        finally:
+            sm.reset()
+            watchdog.exit()
@@ -0,0 +1,64 @@
+import unittest
+
+from revvy.api.subscriptions import SubscriptionError, Subscriptions, parse_subscriptions
+
+
+class TestParseSubscriptions(unittest.TestCase):
+    def test_invalid_subscriptions_are_rejected(self):
+        streams = frozenset(["imu"])
+
+        self.assertRaises(SubscriptionError, lambda: parse_subscriptions([], streams))
+        self.assertRaises(SubscriptionError, lambda: parse_subscriptions({"foo": 1}, streams))
+        self.assertRaises(SubscriptionError, lambda: parse_subscriptions({"imu": 0}, streams))
+        self.assertRaises(SubscriptionError, lambda: parse_subscriptions({"imu": "1"}, streams))
+        self.assertRaises(SubscriptionError, lambda: parse_subscriptions({"imu": True}, streams))
+
+
+class TestSubscriptions(unittest.TestCase):
+    def test_unsubscribed_streams_are_not_sent(self):
+        subscriptions = Subscriptions({"imu": None})
+
+        self.assertIn("imu", subscriptions)
+        self.assertNotIn("battery_change", subscriptions)
+        self.assertFalse(subscriptions.offer("battery_change", "battery_change", "b", 0))
+
+    def test_unlimited_stream_is_not_downsampled(self):
+        subscriptions = Subscriptions({"imu": None})
+
+        self.assertTrue(subscriptions.offer("imu", "imu", "a", 0))
+        self.assertTrue(subscriptions.offer("imu", "imu", "b", 0))
+
+    def test_stream_is_downsampled_and_last_value_is_kept(self):
+        subscriptions = Subscriptions({"orientation_change": 10})
+
+        self.assertTrue(subscriptions.offer("orientation_change", "o", "a", 0.0))
+        self.assertFalse(subscriptions.offer("orientation_change", "o", "b", 0.02))
+        self.assertFalse(subscriptions.offer("orientation_change", "o", "c", 0.05))
+
+        self.assertEqual([], list(subscriptions.due_messages(0.09)))
+        self.assertEqual([("o", "c")], list(subscriptions.due_messages(0.1)))
+        self.assertEqual([], list(subscriptions.due_messages(0.3)))
+
+        self.assertTrue(subscriptions.offer("orientation_change", "o", "d", 0.3))
+
+    def test_keys_of_a_stream_are_downsampled_separately(self):
+        subscriptions = Subscriptions({"sensor_value_change": 1})
+
+        self.assertTrue(subscriptions.offer("sensor_value_change", 1, "a", 0.0))
+        self.assertTrue(subscriptions.offer("sensor_value_change", 2, "b", 0.0))
+        self.assertFalse(subscriptions.offer("sensor_value_change", 1, "c", 0.5))
+
+    def test_held_back_messages_are_pending_until_due(self):
+        subscriptions = Subscriptions({"imu": 10, "battery_change": None})
+
+        self.assertEqual(0.1, subscriptions.interval("imu"))
+        self.assertEqual(0.0, subscriptions.interval("battery_change"))
+        self.assertIsNone(subscriptions.interval("orientation_change"))
+
+        subscriptions.offer("imu", "imu", "a", 0.0)
+        self.assertFalse(subscriptions.has_pending)
+        subscriptions.offer("imu", "imu", "b", 0.05)
+        self.assertTrue(subscriptions.has_pending)
+
+        list(subscriptions.due_messages(0.1))
+        self.assertFalse(subscriptions.has_pending)
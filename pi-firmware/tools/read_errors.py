@@ -1,12 +1,14 @@
 #!/usr/bin/python3
 
 import argparse
+import asyncio
+import json
 import traceback
 
 from revvy.robot.mcu_error import ErrorType, McuErrorReader
+from revvy.utils.binary_log import load_dump
 from revvy.utils.version import Version
 from revvy.utils.functions import is_bit_set
-from revvy.hardware_dependent.rrrc_transport_i2c import RevvyTransportI2C
 
 cfsr_reasons = [
     "The processor has attempted to execute an undefined instruction",
@@ -123,6 +125,24 @@ def format_error(error, installed_fw: Version, only_current=False):
         return f"Error during processing\nRaw data: {error}"
 
 
+async def request_log_dump(host: str, port: int) -> list[str]:
+    """Asks the robot to dump its binary log, see revvy/utils/binary_log.py"""
+    import websockets
+
+    async with websockets.connect(f"ws://{host}:{port}") as websocket:
+        await websocket.send(json.dumps({"type": "dump_log"}))
+        async for message in websocket:
+            if isinstance(message, str):
+                data = json.loads(message)
+                if data["event"] == "log_dumped":
+                    print(f"Log dumped into {data['data']['path']}")
+                    return data["data"]["lines"]
+                if data["event"] == "error":
+                    raise RuntimeError(data["data"]["stack"])
+
+    raise RuntimeError("Connection closed")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--inject-test-error", help="Record an error", action="store_true")
@@ -132,9 +152,27 @@ if __name__ == "__main__":
         help="Only display errors that were recorded with the current firmware",
         action="store_true",
     )
+    parser.add_argument(
+        "--log-host", help="Dump and print the binary log of a robot, through the WebSocket API"
+    )
+    parser.add_argument("--log-port", help="WebSocket port", type=int, default=8765)
+    parser.add_argument("--log-file", help="Print a binary log dump (user/logs/*.rvylog)")
 
     args = parser.parse_args()
 
+    if args.log_host or args.log_file:
+        if args.log_host:
+            lines = asyncio.run(request_log_dump(args.log_host, args.log_port))
+        else:
+            lines = load_dump(args.log_file)
+
+        for line in lines:
+            print(line)
+        raise SystemExit(0)
+
+    # only available on the robot, the log dumps can be read anywhere
+    from revvy.hardware_dependent.rrrc_transport_i2c import RevvyTransportI2C
+
     transport = RevvyTransportI2C(bus=1)
 
     robot_control = transport.create_application_control()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+"""
+Records and loads motor and IMU data, see revvy/robot/telemetry_recorder.py
+
+Record on the robot, through the WebSocket API:
+    python3 -m tools.recording record --host 192.168.0.10 --duration 10 --name turn_kp_1
+
+Copy the recording from the robot (user/recordings/<name>.rec), then print a summary, or load it
+in a script with `load_recording`:
+    python3 -m tools.recording show turn_kp_1.rec
+"""
+
+import argparse
+import asyncio
+import json
+
+import numpy
+
+from revvy.robot.telemetry_recorder import HEADER, RECORD, RECORD_DTYPE, RECORDING_MAGIC
+
+
+def load_recording(path: str) -> numpy.ndarray:
+    """Loads a recording into a numpy structured array, with the fields of RECORD_DTYPE"""
+    with open(path, "rb") as f:
+        magic, record_size, count = HEADER.unpack(f.read(HEADER.size))
+
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"{path} is not a recording")
+    if record_size != RECORD.size:
+        raise ValueError(f"Unsupported record size: {record_size}")
+
+    return numpy.fromfile(path, dtype=numpy.dtype(RECORD_DTYPE), count=count, offset=HEADER.size)
+
+
+def show(path: str) -> None:
+    records = load_recording(path)
+    if len(records) == 0:
+        print("Empty recording")
+        return
+
+    duration = records["time"][-1] - records["time"][0]
+    intervals = numpy.diff(records["time"])
+    print(f"{len(records)} records, {duration:.2f}s")
+    if len(intervals):
+        print(f"Interval: mean {intervals.mean() * 1000:.2f}ms, max {intervals.max() * 1000:.2f}ms")
+
+    for motor in range(records["motor_pos"].shape[1]):
+        speed = records["motor_speed"][:, motor]
+        if speed.any():
+            print(f"Motor {motor + 1}: speed {speed.min():.1f} .. {speed.max():.1f}")
+
+    yaw = records["orientation"][:, 2]
+    print(f"Yaw: {yaw.min():.1f} .. {yaw.max():.1f}")
+
+
+async def record(host: str, port: int, name: str, duration: float) -> None:
+    import websockets
+
+    async with websockets.connect(f"ws://{host}:{port}") as websocket:
+
+        async def wait_for(event: str):
+            async for message in websocket:
+                if isinstance(message, str):
+                    data = json.loads(message)
+                    if data["event"] == event:
+                        return data["data"]
+                    if data["event"] == "error":
+                        raise RuntimeError(data["data"]["stack"])
+
+        await websocket.send(json.dumps({"type": "record_start", "body": {"name": name}}))
+        print(f"Recording into {await wait_for('recording_started')}")
+
+        await asyncio.sleep(duration)
+
+        await websocket.send(json.dumps({"type": "record_stop"}))
+        print(f"Recording stopped: {await wait_for('recording_stopped')}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record on a robot")
+    record_parser.add_argument("--host", help="Address of the robot", required=True)
+    record_parser.add_argument("--port", help="WebSocket port", type=int, default=8765)
+    record_parser.add_argument("--name", help="Name of the recording", default=None)
+    record_parser.add_argument("--duration", help="Length in seconds", type=float, default=10)
+
+    show_parser = subparsers.add_parser("show", help="Print a summary of a recording")
+    show_parser.add_argument("path", help="The recording file")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args.host, args.port, args.name, args.duration))
+    else:
+        show(args.path)
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+"""
+Replays a recording of the MCU communication, and measures how fast the Python side processes it.
+Sounds are not played, so the replay runs on any machine.
+
+Record on the robot with:
+    python3 revvy.py --record-transport /tmp/session.i2c
+
+Then, on any machine:
+    python3 -m tools.replay /tmp/session.i2c
+"""
+
+import argparse
+import time
+
+from revvy.hardware_dependent.sound import SoundControlNull
+from revvy.mcu.transport_recording import ReplayTransport
+from revvy.robot.robot_events import RobotEvent
+from revvy.robot.robot_state import STATUS_POLL_INTERVAL
+from revvy.robot_manager import RobotManager
+from revvy.utils.version import VERSION
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="Recording made with --record-transport")
+    parser.add_argument(
+        "--realtime", help="Replay with the recorded timing", action="store_true", default=False
+    )
+    parser.add_argument("--timeout", help="Stop after this many seconds", type=float, default=60)
+
+    args = parser.parse_args()
+
+    interface = ReplayTransport(args.recording, realtime=args.realtime)
+
+    # normally set by the firmware updater, whose communication is not recorded
+    VERSION.set(None, interface.hw_version, None)
+
+    robot_manager = RobotManager(interface, SoundControlNull())
+
+    ticks = 0
+
+    def _count_tick(*args):
+        global ticks
+        ticks += 1
+
+    robot_manager.on(RobotEvent.MCU_TICK, _count_tick)
+
+    start = time.perf_counter()
+    start_cpu = time.process_time()
+    # without the recorded timing, the status is read again as soon as it was processed
+    robot_manager.robot_start(STATUS_POLL_INTERVAL if args.realtime else 0)
+    interface.finished.wait(args.timeout)
+    elapsed = time.perf_counter() - start
+    cpu_time = time.process_time() - start_cpu
+    replayed_ticks = ticks
+    robot_manager.robot_stop()
+
+    replayed, recorded = interface.progress
+    print(f"Replayed {replayed} of {recorded} exchanges in {elapsed:.3f}s")
+    print(f"{replayed_ticks} status updates, {replayed_ticks / elapsed:.1f} per second")
+    print(
+        f"CPU time: {cpu_time:.3f}s, "
+        f"{cpu_time / max(replayed_ticks, 1) * 1000:.3f}ms per status update"
+    )
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+"""
+Runs the robot on a simulated MCU, and measures how the Python side copes with the given timing
+and transmission errors. Sounds are not played, so the simulation runs on any machine.
+
+    python3 -m tools.simulate --config robot.json --latency 0.002 --busy 0.1 --bit-errors 1e-4
+"""
+
+import argparse
+import time
+
+from revvy.hardware_dependent.sound import SoundControlNull
+from revvy.mcu.simulator import SimulatedMcu, SimulatorTransport
+from revvy.robot.robot_events import RobotEvent
+from revvy.robot_config import RobotConfig
+from revvy.robot_manager import RobotManager
+from revvy.utils.version import VERSION
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", help="Robot configuration (JSON) to load")
+    parser.add_argument("--duration", help="Run for this many seconds", type=float, default=10)
+    parser.add_argument("--latency", help="Command processing time [s]", type=float, default=0)
+    parser.add_argument("--busy", help="Probability of a Busy response", type=float, default=0)
+    parser.add_argument(
+        "--pending", help="Pending responses of asynchronous commands", type=int, default=0
+    )
+    parser.add_argument("--bit-errors", help="Bit error probability", type=float, default=0)
+    parser.add_argument("--byte-time", help="Transfer time of a byte [s]", type=float, default=0)
+    parser.add_argument("--seed", help="Seed of the injected errors", type=int, default=None)
+
+    args = parser.parse_args()
+
+    interface = SimulatorTransport(
+        SimulatedMcu(pending_polls=args.pending),
+        latency=args.latency,
+        busy_probability=args.busy,
+        bit_error_rate=args.bit_errors,
+        byte_time=args.byte_time,
+        seed=args.seed,
+    )
+
+    # normally set by the firmware updater
+    control = interface.create_application_control()
+    VERSION.set(None, control.get_hardware_version(), control.get_firmware_version())
+
+    robot_manager = RobotManager(interface, SoundControlNull())
+
+    ticks = 0
+
+    def _count_tick(*args):
+        global ticks
+        ticks += 1
+
+    robot_manager.on(RobotEvent.MCU_TICK, _count_tick)
+
+    start = time.perf_counter()
+    start_cpu = time.process_time()
+    robot_manager.robot_start()
+
+    if args.config:
+        with open(args.config, "r") as f:
+            robot_manager.robot_configure(RobotConfig.from_string(f.read()))
+
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+    cpu_time = time.process_time() - start_cpu
+    robot_manager.robot_stop()
+
+    stats = interface.stats
+    print(f"{ticks} status updates in {elapsed:.3f}s, {ticks / elapsed:.1f} per second")
+    print(f"CPU time: {cpu_time:.3f}s, {cpu_time / max(ticks, 1) * 1000:.3f}ms per status update")
+    print(
+        f"{stats.commands} commands, {stats.busy_responses} busy responses, "
+        f"{stats.corrupted_frames} corrupted frames"
+    )
@@ -7,6 +7,14 @@ import { conn, endpoint, setConn } from "../settings";
 
 const PORT = 8765
 
+// Binary frames for the frequent messages, see revvy/api/binary_protocol.py in pi-firmware
+const BINARY_SUBPROTOCOL = 'revvy.binary.v1'
+
+enum BinaryMessageType {
+    control = 0x01,
+    controlConfirm = 0x02,
+}
+
 export const [connLoading, setConnLoading] = createSignal<boolean>(false)
 
 export function connectOrDisconnect() {
@@ -43,7 +51,8 @@ export type WSEventCallback = (e: WSEventResult) => void
 export function connectSocket(ip: string): SocketWrapper {
     const emitter = createEmitter<Record<WSEventType, WSEventResult>>()
 
-    let socket: WebSocket = new WebSocket(`ws://${ip}:${PORT}`);
+    let socket: WebSocket = new WebSocket(`ws://${ip}:${PORT}`, [BINARY_SUBPROTOCOL]);
+    socket.binaryType = 'arraybuffer'
 
     socket.onopen = function (e) {
         console.warn("[open] Connection established");
@@ -52,6 +61,13 @@ export function connectSocket(ip: string): SocketWrapper {
     };
 
     socket.onmessage = function (event) {
+        if (event.data instanceof ArrayBuffer) {
+            const bytes = new Uint8Array(event.data)
+            if (bytes[0] === BinaryMessageType.controlConfirm) {
+                emitter.emit(WSEventType.onMessage, { event: 'control_confirm', data: bytes[1] })
+            }
+            return
+        }
         const data = JSON.parse(event.data)
         emitter.emit(WSEventType.onMessage, data)
     };
@@ -75,6 +91,8 @@ export function connectSocket(ip: string): SocketWrapper {
         send: (type: RobotMessage, msg: any) => {
             if (type !== RobotMessage.control) {
                 console.warn('send', type, msg)
+            } else if (socket.protocol === BINARY_SUBPROTOCOL) {
+                return socket.send(Uint8Array.of(BinaryMessageType.control, ...msg))
             }
             return socket.send(JSON.stringify({ type, body: msg }))
         },